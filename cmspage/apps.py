@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CmsPageConfig(AppConfig):
     name = "cmspage"
     default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self):
+        from cmspage import dependencies  # noqa: F401 connects the dependency index receivers
+        from cmspage.template_manifest import load_manifest
+
+        # Load any template manifest at startup rather than on the first request
+        load_manifest()
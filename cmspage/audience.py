@@ -0,0 +1,54 @@
+"""
+Who a CMS page is rendered for, found without touching the session where possible.
+
+Reading `request.user` or the messages of a request loads its session, which makes
+Django's session middleware add `Vary: Cookie` to the response even when the session is
+empty, and keeps the page out of shared caches. A request that carries no session cookie
+has no session state to find, so its visitor is anonymous and, unless a messages cookie
+was sent, it has no messages: these helpers answer that without loading the session, and
+only load it for requests that carry a session cookie.
+"""
+
+from django.contrib.messages import get_messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.utils.functional import empty
+
+__all__ = (
+    "has_pending_messages",
+    "has_session",
+    "is_authenticated",
+    "request_user",
+)
+
+
+def has_session(request) -> bool:
+    """Whether the request may have session state: False if it has a session without a key"""
+    if (session := getattr(request, "session", None)) is None:
+        return True
+    return bool(getattr(session, "session_key", True))
+
+
+def request_user(request):
+    """
+    Return the request's logged in user, or None, without loading the user (or the session)
+    of a request without a session cookie
+    """
+    if (user := getattr(request, "user", None)) is None:
+        return None
+    # A user that is not loaded yet is loaded from the session
+    if getattr(user, "_wrapped", None) is empty and not has_session(request):
+        return None
+    return user if user.is_authenticated else None
+
+
+def is_authenticated(request) -> bool:
+    return request_user(request) is not None
+
+
+def has_pending_messages(request) -> bool:
+    """Whether the request has messages to show"""
+    if not hasattr(request, "_messages"):
+        return False
+    if not has_session(request) and CookieStorage.cookie_name not in request.COOKIES:
+        return False
+    return bool(len(get_messages(request)))
@@ -1,14 +1,18 @@
 # -*- coding: utf-8 -*-
 
 from .cards import Card, CardsBlock
+from .choosers import DocumentChooserBlock, ImageChooserBlock, PageChooserBlock, PrefetchedChooserMixin
 from .copy import CopyrightBlock
 from .cta import CallToActionBlock
 from .custom_table import CustomTableBlock
+from .embed import EmbedBlock
 from .hero import HeroImageBlock
 from .image_and_text import ImageAndTextBlock, SmallImageAndTextBlock, LargeImageBlock
 from .lines import AbstractLinesBlock, LinesBlock, LineItemBlock
 from .new_section import NewSectionBlock
 from .radio import RadioSelectBlock
+from .renditions import ImageRenditionsMixin
+from .rich_text import RichTextBlock
 from .links import LinkBlock, LinksBlock
 from .carousel import CarouselImageBlock
 from .social import SocialsBlock, SocialLinkBlock
@@ -23,6 +27,9 @@ __all__ = (
     "Insets",
     "SocialIcon",
     "IconColorChoices",
+    # mixins
+    "ImageRenditionsMixin",
+    "PrefetchedChooserMixin",
     # blocks
     "AbstractLinesBlock",
     "CallToActionBlock",
@@ -31,7 +38,10 @@ __all__ = (
     "CarouselImageBlock",
     "CopyrightBlock",
     "CustomTableBlock",
+    "DocumentChooserBlock",
+    "EmbedBlock",
     "HeroImageBlock",
+    "ImageChooserBlock",
     "ImageAndTextBlock",
     "LargeImageBlock",
     "LineItemBlock",
@@ -39,7 +49,9 @@ __all__ = (
     "LinkBlock",
     "LinksBlock",
     "NewSectionBlock",
+    "PageChooserBlock",
     "RadioSelectBlock",
+    "RichTextBlock",
     "RichTextWithTitleBlock",
     "SmallImageAndTextBlock",
     "SocialLinkBlock",
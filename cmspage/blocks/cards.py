@@ -1,12 +1,16 @@
 from wagtail import blocks
-from wagtail.images import blocks as image_blocks
 
 from .links import LinkBlock
-from .themes import Palette, Insets, Justifications, Orientations, ImageSizes, CropPercentage, ImageRounding
+from .choosers import ImageChooserBlock
+from .renditions import ImageRenditionsMixin
+from .themes import (
+    Palette, Insets, Justifications, Orientations, ImageSizes, CropPercentage, ImageRounding, ImageLoading
+)
 from .. import DEFAULT_RICHTEXTBLOCK_FEATURES
+from .rich_text import RichTextBlock
 
 
-class Card(blocks.StructBlock):
+class Card(ImageRenditionsMixin, blocks.StructBlock):
     title = blocks.CharBlock(
         blank=True,
         null=True,
@@ -15,7 +19,7 @@ class Card(blocks.StructBlock):
         label="Card Title",
         help_text="Bold title text for this card (len=255)",
     )
-    text = blocks.RichTextBlock(
+    text = RichTextBlock(
         required=False,
         blank=True,
         null=True,
@@ -26,7 +30,7 @@ class Card(blocks.StructBlock):
     justify = blocks.ChoiceBlock(
         required=False, choices=Justifications.choices, default=Justifications.LEFT, help_text="Text alignment"
     )
-    image = image_blocks.ImageChooserBlock(required=False, blank=True, null=True, label="Card Image")
+    image = ImageChooserBlock(required=False, blank=True, null=True, label="Card Image")
     orientation = blocks.ChoiceBlock(choices=Orientations.choices, default=Orientations.LANDSCAPE, help_text="Image orientation")
     size = blocks.ChoiceBlock(choices=ImageSizes.choices, default=ImageSizes.MEDIUM, help_text="Image size")
     crop = blocks.ChoiceBlock(choices=CropPercentage.choices, default=CropPercentage.FULL, help_text="Crop percentage")
@@ -45,10 +49,15 @@ class Card(blocks.StructBlock):
         label_format = "Card {title}"
 
 
-class CardsBlock(blocks.StructBlock):
+class CardsBlock(ImageRenditionsMixin, blocks.StructBlock):
+    priority_candidate = False
+
     cards = blocks.ListBlock(Card())
     cursive = blocks.BooleanBlock(required=False, default=False, help_text="Use the cursive font in titles?")
     rounded = blocks.ChoiceBlock(required=False, choices=ImageRounding.choices, default=ImageRounding.NONE, help_text="Image rounding")
+    loading = blocks.ChoiceBlock(
+        required=False, choices=ImageLoading.choices, default=ImageLoading.AUTO, help_text="Image loading"
+    )
     palette = blocks.ChoiceBlock(
         choices=Palette.choices, default=Palette.WARNING, help_text="Palette"
     )
@@ -56,6 +65,11 @@ class CardsBlock(blocks.StructBlock):
         choices=Insets.choices, default=Insets.SMALL, help_text="Padding around the block"
     )
 
+    def get_image_options(self, value):
+        card_block = self.child_blocks["cards"].child_block
+        for card in value["cards"]:
+            yield from card_block.get_image_options(card)
+
     def get_context(self, value, parent_context=None):
         context = super().get_context(value, parent_context)
         numcards = len(value["cards"])
@@ -69,6 +83,7 @@ class CardsBlock(blocks.StructBlock):
 
     class Meta:
         template = "blocks/cards_block.html"
+        cache_fragment = True
         icon = "image"
         label = "Set of Cards"
         label_format = "Cards Block"
@@ -1,8 +1,10 @@
 from wagtail import blocks
 from wagtail.blocks import ListBlock
-from wagtail.images.blocks import ImageChooserBlock
 
-from .themes import Insets, Justifications, Palette
+from .choosers import ImageChooserBlock
+from .renditions import ImageRenditionsMixin
+from .themes import Insets, Justifications, Palette, ImageLoading
+from .rich_text import RichTextBlock
 
 
 class CarouselImageStructBlock(blocks.StructBlock):
@@ -29,7 +31,7 @@ class CarouselImageStructBlock(blocks.StructBlock):
     carousel_justify = blocks.ChoiceBlock(
         required=False, choices=Justifications.choices, default=Justifications.LEFT, help_text="Text alignment"
     )
-    carousel_content = blocks.RichTextBlock(
+    carousel_content = RichTextBlock(
         required=False, features=RICHTEXTBLOCK_FEATURES, max_length=256, help_text="Short description"
     )
     carousel_attribution = blocks.CharBlock(
@@ -37,7 +39,7 @@ class CarouselImageStructBlock(blocks.StructBlock):
     )
 
 
-class CarouselImageBlock(blocks.StructBlock):
+class CarouselImageBlock(ImageRenditionsMixin, blocks.StructBlock):
     carousel = ListBlock(CarouselImageStructBlock())
     carousel_interval = blocks.IntegerBlock(
         default=12000,
@@ -45,8 +47,24 @@ class CarouselImageBlock(blocks.StructBlock):
     )
     palette = blocks.ChoiceBlock(choices=Palette.choices, default=Palette.WARNING, help_text="Palette")
     inset = blocks.ChoiceBlock(choices=Insets.choices, default=Insets.SMALL, help_text="Padding around the block")
+    loading = blocks.ChoiceBlock(
+        required=False,
+        choices=ImageLoading.choices,
+        default=ImageLoading.AUTO,
+        help_text="First slide image loading (other slides load lazily)",
+    )
+
+    # rendition size and crop used by the carousel template's render_image
+    image_size = "800x450"
+    image_crop = 75
+
+    def get_image_options(self, value):
+        for item in value["carousel"]:
+            if image := item["carousel_image"]:
+                yield image, {"size": self.image_size, "crop": self.image_crop, "sizes": "100vw"}
 
     class Meta:
         template = "blocks/carousel_block.html"
+        cache_fragment = True
         icon = "image"
         label = "Carousel"
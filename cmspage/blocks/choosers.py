@@ -0,0 +1,94 @@
+"""
+Chooser blocks that take their values from objects prefetched for the page.
+
+Wagtail converts chooser block values with a query per block type (and per nesting
+level) as the StreamField is first accessed. `CMSPageBase.get_context()` instead
+fetches every object the page references at once, and converts the StreamField
+values inside `use_prefetched()`, so the chooser blocks here take their instances
+from that map and only query for objects it is missing.
+
+The blocks deconstruct as the Wagtail blocks they extend, so replacing one with the
+other needs no migration.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict
+
+from wagtail import blocks
+from wagtail.documents import blocks as document_blocks
+from wagtail.images import blocks as image_blocks
+
+__all__ = (
+    "DocumentChooserBlock",
+    "ImageChooserBlock",
+    "PageChooserBlock",
+    "PrefetchedChooserMixin",
+    "prefetch_urls",
+    "prefetched_objects",
+    "use_prefetched",
+)
+
+# {model: {pk: instance}} for the StreamField values being converted
+_prefetched = ContextVar("cmspage_prefetched_objects", default=None)
+
+
+@contextmanager
+def use_prefetched(objects: Dict[type, dict]):
+    """Convert chooser block values using the prefetched instances, given by model and pk"""
+    token = _prefetched.set(objects)
+    try:
+        yield objects
+    finally:
+        _prefetched.reset(token)
+
+
+def prefetched_objects(model) -> dict | None:
+    """Return the prefetched instances of a model by pk, or None outside `use_prefetched()`"""
+    if (objects := _prefetched.get()) is None:
+        return None
+    return objects.setdefault(model, {})
+
+
+def prefetch_urls(instances, request=None):
+    """
+    Compute the URLs of prefetched pages (relative to the request's site) and documents once,
+    as `prefetched_url`, for LinkValue
+    """
+    for instance in instances:
+        if instance is not None:
+            get_url = getattr(instance, "get_url", None)
+            instance.prefetched_url = get_url(request) if get_url else instance.url
+
+
+class PrefetchedChooserMixin:
+    """
+    Mixin for ChooserBlocks that converts values from the prefetched instances.
+    A prefetched instance is shared by every use of it on the page, so data attached
+    to it (such as prefetched renditions) serves each of them.
+    """
+
+    def to_python(self, value):
+        if prefetched_objects(self.model_class) is None:
+            return super().to_python(value)
+        return self.bulk_to_python([value])[0]
+
+    def bulk_to_python(self, values):
+        if (objects := prefetched_objects(self.model_class)) is None:
+            return super().bulk_to_python(values)
+        if missing := [value for value in dict.fromkeys(values) if value is not None and value not in objects]:
+            fetched = self.model_class.objects.in_bulk(missing)
+            objects.update((value, fetched.get(value)) for value in missing)
+        return [None if value is None else objects.get(value) for value in values]
+
+
+class ImageChooserBlock(PrefetchedChooserMixin, image_blocks.ImageChooserBlock):
+    canonical_module_path = "wagtail.images.blocks.ImageChooserBlock"
+
+
+class PageChooserBlock(PrefetchedChooserMixin, blocks.PageChooserBlock):
+    canonical_module_path = "wagtail.blocks.PageChooserBlock"
+
+
+class DocumentChooserBlock(PrefetchedChooserMixin, document_blocks.DocumentChooserBlock):
+    canonical_module_path = "wagtail.documents.blocks.DocumentChooserBlock"
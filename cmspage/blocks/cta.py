@@ -3,6 +3,7 @@ from wagtail import blocks
 from cmspage import DEFAULT_RICHTEXTBLOCK_FEATURES
 from .links import LinkBlock
 from .themes import Insets, Palette, Justifications
+from .rich_text import RichTextBlock
 
 
 class CallToActionBlock(blocks.StructBlock):
@@ -14,7 +15,7 @@ class CallToActionBlock(blocks.StructBlock):
         help_text="Max length of 60 characters, optional",
     )
     cursive = blocks.BooleanBlock(required=False, default=False, help_text="Use the cursive font?")
-    text = blocks.RichTextBlock(
+    text = RichTextBlock(
         required=False,
         blank=True,
         features=DEFAULT_RICHTEXTBLOCK_FEATURES,
@@ -32,6 +33,7 @@ class CallToActionBlock(blocks.StructBlock):
 
     class Meta:
         template = "blocks/call_to_action_block.html"
+        cache_fragment = True
         icon = "warning"
         label = "Call to Action"
         label_format = "Call to Action {title}"
@@ -14,6 +14,7 @@ class CustomTableBlock(table_blocks.TableBlock):
 
     class Meta:
         template = "blocks/custom_table_block.html"
+        cache_fragment = True
         label = "Table"
         icon = "table"
         help_text = "Tabular data"
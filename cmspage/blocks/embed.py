@@ -0,0 +1,46 @@
+"""
+Embeds that take their embed from those prefetched for the page.
+
+Wagtail's EmbedBlock looks up its embed with a query as it is rendered. Values
+converted inside `use_prefetched()` (see cmspage.blocks.choosers) whose embed was
+prefetched with the page's other objects (mapped by its hash) render from it instead,
+and the rest, such as embeds not fetched from the provider yet, are looked up as usual.
+
+EmbedBlock deconstructs as Wagtail's block, so replacing one with the other needs no
+migration.
+"""
+
+from django.template.loader import render_to_string
+from django.utils.functional import cached_property
+from wagtail.embeds import blocks as embed_blocks
+from wagtail.embeds.embeds import get_embed_hash
+from wagtail.embeds.models import Embed
+
+from cmspage.blocks.choosers import prefetched_objects
+
+__all__ = (
+    "EmbedBlock",
+    "PrefetchedEmbedValue",
+)
+
+
+class PrefetchedEmbedValue(embed_blocks.EmbedValue):
+    def __init__(self, url, max_width=None, max_height=None, embed=None):
+        super().__init__(url, max_width, max_height)
+        self.embed = embed
+
+    @cached_property
+    def html(self):
+        if self.embed is None:
+            return super().html
+        return render_to_string("wagtailembeds/embed_frontend.html", {"embed": self.embed})
+
+
+class EmbedBlock(embed_blocks.EmbedBlock):
+    canonical_module_path = "wagtail.embeds.blocks.EmbedBlock"
+
+    def to_python(self, value):
+        if not (value := super().to_python(value)) or (embeds := prefetched_objects(Embed)) is None:
+            return value
+        embed = embeds.get(get_embed_hash(value.url, value.max_width, value.max_height))
+        return PrefetchedEmbedValue(value.url, value.max_width, value.max_height, embed)
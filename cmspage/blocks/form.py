@@ -33,3 +33,5 @@ class FormBlock(StructBlock):
         icon = "form"
         label = "Form"
         template = "blocks/form_block.html"
+        # the form carries a CSRF token, so it is rendered for every request
+        cache_fragment = False
@@ -1,16 +1,20 @@
 from wagtail import blocks
-from wagtail.images import blocks as image_blocks
 
-from .themes import Insets, Orientations, ImageSizes, CropPercentage, ImageRounding, Palette
+from .choosers import ImageChooserBlock
+from .renditions import ImageRenditionsMixin
+from .themes import Insets, Orientations, ImageSizes, CropPercentage, ImageRounding, ImageLoading, Palette
 
 
-class HeroImageBlock(blocks.StructBlock):
-    image = image_blocks.ImageChooserBlock()
+class HeroImageBlock(ImageRenditionsMixin, blocks.StructBlock):
+    image = ImageChooserBlock()
     orientation = blocks.ChoiceBlock(choices=Orientations.choices, default=Orientations.LANDSCAPE, help_text="Image orientation")
     size = blocks.ChoiceBlock(choices=ImageSizes.choices, default=ImageSizes.MEDIUM, help_text="Image size")
     crop = blocks.ChoiceBlock(choices=CropPercentage.choices, default=CropPercentage.FULL, help_text="Crop percentage")
     rounded = blocks.ChoiceBlock(choices=ImageRounding.choices, default=ImageRounding.NONE, help_text="Image rounding")
     responsive = blocks.BooleanBlock(required=False, default=False, help_text="Image responsive")
+    loading = blocks.ChoiceBlock(
+        required=False, choices=ImageLoading.choices, default=ImageLoading.AUTO, help_text="Image loading"
+    )
     palette = blocks.ChoiceBlock(
         choices=Palette.choices, default=Palette.WARNING, help_text="Palette"
     )
@@ -20,4 +24,5 @@ class HeroImageBlock(blocks.StructBlock):
 
     class Meta:
         template = "blocks/hero_block.html"
+        cache_fragment = True
         label_format = "Hero Image {image}"
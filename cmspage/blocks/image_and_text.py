@@ -1,28 +1,35 @@
 from wagtail import blocks
-from wagtail.images import blocks as image_blocks
 
 from cmspage import DEFAULT_RICHTEXTBLOCK_FEATURES
 from .radio import RadioSelectBlock
 from .themes import Palette, Insets, Justifications, ImageAlignment, Orientations, ImageSizes, CropPercentage, \
-    ImageRounding
+    ImageRounding, ImageLoading
 from .links import LinkBlock
+from .choosers import ImageChooserBlock
+from .renditions import ImageRenditionsMixin
+from .rich_text import RichTextBlock
 
 
-class SmallImageAndTextBlock(blocks.StructBlock):
+class SmallImageAndTextBlock(ImageRenditionsMixin, blocks.StructBlock):
+    priority_candidate = False
+
     title = blocks.CharBlock(max_length=60, required=False, blank=True, null=True)
     cursive = blocks.BooleanBlock(required=False, default=False, help_text="Use the cursive font on title?")
-    text = blocks.RichTextBlock(
+    text = RichTextBlock(
         blank=True,
         required=False,
         features=DEFAULT_RICHTEXTBLOCK_FEATURES,
     )
     justify = blocks.ChoiceBlock(required=False, choices=Justifications.choices, default=Justifications.LEFT, help_text="Text alignment")
-    image = image_blocks.ImageChooserBlock(blank=True, null=True)
+    image = ImageChooserBlock(blank=True, null=True)
     orientation = blocks.ChoiceBlock(choices=Orientations.choices, default=Orientations.LANDSCAPE, help_text="Image orientation")
     size = blocks.ChoiceBlock(choices=ImageSizes.choices, default=ImageSizes.MEDIUM, help_text="Image size")
     crop = blocks.ChoiceBlock(choices=CropPercentage.choices, default=CropPercentage.FULL, help_text="Crop percentage")
     rounded = blocks.ChoiceBlock(choices=ImageRounding.choices, default=ImageRounding.NONE, help_text="Image rounding")
     responsive = blocks.BooleanBlock(required=False, default=False, help_text="Image responsive")
+    loading = blocks.ChoiceBlock(
+        required=False, choices=ImageLoading.choices, default=ImageLoading.AUTO, help_text="Image loading"
+    )
     image_alignment = RadioSelectBlock(
         choices=ImageAlignment.choices,
         default="left",
@@ -43,17 +50,17 @@ class SmallImageAndTextBlock(blocks.StructBlock):
         label_format = "Small Image & Text {title}"
 
 
-class ImageAndTextBlock(blocks.StructBlock):
+class ImageAndTextBlock(ImageRenditionsMixin, blocks.StructBlock):
     title = blocks.CharBlock(max_length=60, required=False, blank=True, null=True)
     cursive = blocks.BooleanBlock(required=False, default=False, help_text="Use the cursive font on title?")
-    text = blocks.RichTextBlock(
+    text = RichTextBlock(
         blank=True,
         required=False,
         features=DEFAULT_RICHTEXTBLOCK_FEATURES,
     )
     overlay = blocks.BooleanBlock(default=False, required=False, blank=True, help_text="Overlay text on image")
     justify = blocks.ChoiceBlock(required=False, choices=Justifications.choices, default=Justifications.LEFT, help_text="Block text alignment")
-    image = image_blocks.ImageChooserBlock(blank=True, null=True)
+    image = ImageChooserBlock(blank=True, null=True)
     image_alignment = RadioSelectBlock(
         choices=ImageAlignment.choices,
         default="left",
@@ -64,6 +71,9 @@ class ImageAndTextBlock(blocks.StructBlock):
     crop = blocks.ChoiceBlock(choices=CropPercentage.choices, default=CropPercentage.FULL, help_text="Crop percentage")
     rounded = blocks.ChoiceBlock(choices=ImageRounding.choices, default=ImageRounding.NONE, help_text="Image rounding")
     responsive = blocks.BooleanBlock(required=False, default=False, help_text="Image responsive")
+    loading = blocks.ChoiceBlock(
+        required=False, choices=ImageLoading.choices, default=ImageLoading.AUTO, help_text="Image loading"
+    )
     palette = blocks.ChoiceBlock(
         choices=Palette.choices, default=Palette.WARNING, help_text="Palette"
     )
@@ -74,18 +84,22 @@ class ImageAndTextBlock(blocks.StructBlock):
 
     class Meta:
         template = "blocks/image_and_text_block.html"
+        cache_fragment = True
         icon = "image"
         label = "Image & Text"
         label_format = "Image & Text {title}"
 
 
-class LargeImageBlock(blocks.StructBlock):
-    image = image_blocks.ImageChooserBlock(blank=True, null=True)
+class LargeImageBlock(ImageRenditionsMixin, blocks.StructBlock):
+    image = ImageChooserBlock(blank=True, null=True)
     orientation = blocks.ChoiceBlock(choices=Orientations.choices, default=Orientations.LANDSCAPE, help_text="Image orientation")
     size = blocks.ChoiceBlock(choices=ImageSizes.choices, default=ImageSizes.FULL_WIDTH, help_text="Image size")
     crop = blocks.ChoiceBlock(choices=CropPercentage.choices, default=CropPercentage.FULL, help_text="Crop percentage")
     rounded = blocks.ChoiceBlock(choices=ImageRounding.choices, default=ImageRounding.NONE, help_text="Image rounding")
     responsive = blocks.BooleanBlock(required=False, default=False, help_text="Image responsive")
+    loading = blocks.ChoiceBlock(
+        required=False, choices=ImageLoading.choices, default=ImageLoading.AUTO, help_text="Image loading"
+    )
     palette = blocks.ChoiceBlock(
         choices=Palette.choices, default=Palette.WARNING, help_text="Palette"
     )
@@ -96,6 +110,7 @@ class LargeImageBlock(blocks.StructBlock):
 
     class Meta:
         template = "blocks/large_image_block.html"
+        cache_fragment = True
         icon = "image"
         label = "Large Image"
         label_format = "Large Image {image}"
@@ -2,10 +2,11 @@ from wagtail import blocks
 
 from cmspage import DEFAULT_RICHTEXTBLOCK_FEATURES
 from .themes import Palette, Insets
+from .rich_text import RichTextBlock
 
 class LineItemBlock(blocks.StructBlock):
     heading = blocks.CharBlock(max_length=120, help_text="Line text (max len=120)")
-    content = blocks.RichTextBlock(required=False, features=DEFAULT_RICHTEXTBLOCK_FEATURES, help_text="Dropdown text block, optional")
+    content = RichTextBlock(required=False, features=DEFAULT_RICHTEXTBLOCK_FEATURES, help_text="Dropdown text block, optional")
 
     class Meta:
         template = "blocks/lineitem_block.html"
@@ -38,5 +39,6 @@ class LinesBlock(AbstractLinesBlock):
 
     class Meta:
         template = "blocks/lines_block.html"
+        cache_fragment = True
         icon = "bars"
         label = "List of Lines"
@@ -1,8 +1,8 @@
 from django.core.exceptions import ValidationError
 from django.forms.utils import ErrorList
 from wagtail import blocks
-from wagtail.documents import blocks as document_blocks
 
+from .choosers import DocumentChooserBlock, PageChooserBlock
 from .themes import Palette, Insets
 
 
@@ -20,10 +20,18 @@ class LinkValue(blocks.StructValue):
                         title = self.get("extra_link").title
         return title
 
+    @staticmethod
+    def object_url(instance):
+        """Return the URL prefetched for a page or document with the page, or else its URL"""
+        try:
+            return instance.prefetched_url
+        except AttributeError:
+            return instance.url
+
     @property
     def link_url(self):
-        page_url = self.get("page_link").url if self.get("page_link") else None
-        doc_url = self.get("doc_link").url if self.get("doc_link") else None
+        page_url = self.object_url(self.get("page_link")) if self.get("page_link") else None
+        doc_url = self.object_url(self.get("doc_link")) if self.get("doc_link") else None
         extra_link = self.get("extra_link")
         if page_url and extra_link:
             return f"{page_url}{extra_link}"
@@ -40,11 +48,11 @@ class LinkBlock(blocks.StructBlock):
         max_length=255,
         label="Button Title (use hyphen for special link button)",
     )
-    page_link = blocks.PageChooserBlock(
+    page_link = PageChooserBlock(
         required=False,
         label="Page link",
     )
-    doc_link = document_blocks.DocumentChooserBlock(
+    doc_link = DocumentChooserBlock(
         required=False,
         label="Document link",
     )
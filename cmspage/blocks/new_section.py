@@ -16,6 +16,7 @@ class NewSectionBlock(blocks.StructBlock):
 
     class Meta:
         template = "blocks/new_section.html"
+        cache_fragment = True
         icon = "collapse-down"
         label = "Vertical space"
         label_format = "Vertical space {height}"
@@ -0,0 +1,38 @@
+from cmspage.renditions import image_loading, image_specs, ladder_options
+
+
+class ImageRenditionsMixin:
+    """
+    Mixin for StructBlocks that render images with `render_image`.
+
+    - `get_image_options(value)` yields each image with the `render_image` options
+      used for it, read from the `orientation`, `size` and `crop` fields by default.
+    - `get_rendition_specs(value)` declares the renditions the template will request,
+      so that the page can prefetch them.
+    - `get_context()` adds `image_loading`, the loading attributes for the block's
+      images, from the block's `loading` field and its position on the page.
+    """
+
+    image_field = "image"
+    # whether the block's image may be the page's largest contentful paint
+    priority_candidate = True
+
+    def get_image_options(self, value):
+        if image := value.get(self.image_field):
+            yield image, {
+                "orientation": value.get("orientation") or "landscape",
+                "size": value.get("size") or "medium",
+                "crop": value.get("crop"),
+            }
+
+    def get_rendition_specs(self, value):
+        for image, options in self.get_image_options(value):
+            yield image, image_specs(**ladder_options(options))
+
+    def get_context(self, value, parent_context=None):
+        context = super().get_context(value, parent_context)
+        parent_context = parent_context or {}
+        block_index = parent_context.get("block_index")
+        priority = block_index is not None and block_index == parent_context.get("image_priority_index")
+        context["image_loading"] = image_loading(value.get("loading"), block_index, priority)
+        return context
@@ -0,0 +1,132 @@
+"""
+Rich text whose links and embeds are expanded for the whole page at once.
+
+Each rich text value expands its page and document links and image embeds with a
+query per link type as it is rendered. `CMSPageBase.get_context()` instead passes
+every rich text value on the page to `expand_rich_text()`, which expands them in a
+single `expand_db_html()` pass, so that Wagtail's rewriters look up the references of
+all of them together, and each value renders its share of the result.
+
+The expanded HTML is also cached (in the cache named by CMSPAGE_RICH_TEXT_CACHE),
+keyed by a hash of the source and tagged with the `references` version (see
+cmspage.cache and cmspage.versions) of the objects it may refer to, so pages sharing the same text share the entry.
+
+RichTextBlock deconstructs as Wagtail's block, so replacing one with the other needs
+no migration.
+"""
+
+from hashlib import sha256
+from typing import Iterable
+
+from django.template.loader import render_to_string
+from django.utils.encoding import force_str
+from wagtail import blocks
+from wagtail.rich_text import RichText, expand_db_html
+
+from cmspage.cache import CMSCache
+from cmspage.versions import REFERENCES, bump_version
+
+__all__ = (
+    "CMSPAGE_RICH_TEXT_CACHE",
+    "PrefetchedRichText",
+    "RichTextBlock",
+    "expand_rich_text",
+    "get_rich_text_cache",
+    "invalidate_rich_text_cache",
+    "rich_text_cache_key",
+)
+
+# Settings
+CMSPAGE_RICH_TEXT_CACHE = "CMSPAGE_RICH_TEXT_CACHE"
+
+# Joins the sources expanded together; cannot appear in stored (or any valid) HTML
+SEPARATOR = "\x00"
+
+rich_text_cache = CMSCache("rich_text", CMSPAGE_RICH_TEXT_CACHE)
+
+
+class PrefetchedRichText(RichText):
+    """A RichText value that renders its expanded HTML if it has already been expanded"""
+
+    expanded = None
+
+    def __html__(self):
+        if self.expanded is None:
+            return super().__html__()
+        return render_to_string("wagtailcore/shared/richtext.html", {"html": self.expanded})
+
+
+def get_rich_text_cache() -> CMSCache | None:
+    """Return the cache for expanded rich text, or None if CMSPAGE_RICH_TEXT_CACHE disables it"""
+    return rich_text_cache if rich_text_cache.enabled else None
+
+
+def invalidate_rich_text_cache():
+    """Start a new references version, so that all rich text is expanded afresh"""
+    bump_version(REFERENCES)
+
+
+def rich_text_cache_key(prefix: str, source: str) -> str:
+    """The key for a source, under a prefix tagged with the `references` version"""
+    return f"{prefix}:{sha256(source.encode()).hexdigest()}"
+
+
+def expand_rich_text(values: Iterable) -> int:
+    """
+    Expand the sources of the PrefetchedRichText values, storing each value's expanded HTML
+    on it. Values are taken from the cache where possible, and the rest are expanded in one
+    `expand_db_html()` pass and cached. Returns the number of values expanded.
+    """
+    values = [
+        value for value in values if isinstance(value, PrefetchedRichText) and value.expanded is None and value.source
+    ]
+    if not values:
+        return 0
+    cache = get_rich_text_cache()
+    if cache is None or (prefix := cache.key(tags=[REFERENCES])) is None:
+        return _expand_together(values)
+
+    keys = [rich_text_cache_key(prefix, value.source) for value in values]
+    cached = cache.get_many(set(keys))
+    missing = {}
+    for value, key in zip(values, keys):
+        if key in cached:
+            value.expanded = cached[key]
+        else:
+            missing.setdefault(key, []).append(value)
+    # Expand each distinct source once, and share the result with the values repeating it
+    if missing and _expand_together([repeats[0] for repeats in missing.values()]):
+        cache.set_many({key: repeats[0].expanded for key, repeats in missing.items()})
+        for repeats in missing.values():
+            for value in repeats[1:]:
+                value.expanded = repeats[0].expanded
+    return sum(value.expanded is not None for value in values)
+
+
+def _expand_together(values: list) -> int:
+    """Expand the values' sources in one `expand_db_html()` pass"""
+    sources = [value.source for value in values]
+    if any(SEPARATOR in source for source in sources):
+        return 0
+    expanded = expand_db_html(SEPARATOR.join(sources)).split(SEPARATOR)
+    if len(expanded) != len(values):
+        return 0  # a rewriter introduced a separator, so the values expand themselves
+    for value, html in zip(values, expanded):
+        value.expanded = html
+    return len(values)
+
+
+class RichTextBlock(blocks.RichTextBlock):
+    canonical_module_path = "wagtail.blocks.RichTextBlock"
+
+    def to_python(self, value):
+        return PrefetchedRichText(value)
+
+    def normalize(self, value):
+        if isinstance(value, PrefetchedRichText):
+            return value
+        return PrefetchedRichText(value.source if isinstance(value, RichText) else value and force_str(value))
+
+    def value_from_form(self, value):
+        return PrefetchedRichText(value)
+
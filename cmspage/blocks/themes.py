@@ -15,6 +15,7 @@ __all__ = (
     "IconColorChoices",
     "ImageAlignment",
     "CropPercentage",
+    "ImageLoading",
 )
 
 
@@ -152,6 +153,13 @@ class CropPercentage(IntChoices):
     FULL = 100, "Full"
 
 
+class ImageLoading(Choices):
+    AUTO = "auto", "Automatic"
+    EAGER = "eager", "Eager"
+    LAZY = "lazy", "Lazy"
+    PRIORITY = "priority", "Priority"
+
+
 class ImageRounding(IntChoices):
     NONE = -1, "None"
     TINY = 0, "0"
@@ -2,6 +2,7 @@ from wagtail import blocks
 
 from cmspage import DEFAULT_RICHTEXTBLOCK_FEATURES
 from .themes import Insets, Justifications, Palette
+from .rich_text import RichTextBlock
 
 
 class TitleBlock(blocks.StructBlock):
@@ -17,6 +18,7 @@ class TitleBlock(blocks.StructBlock):
 
     class Meta:
         template = "blocks/title_block.html"
+        cache_fragment = True
         icon = "edit"
         label = "Title"
         help_text = "Centered text to display on the page"
@@ -31,7 +33,7 @@ class RichTextWithTitleBlock(blocks.StructBlock):
         help_text="Display title, optional (max len=120)",
     )
     cursive = blocks.BooleanBlock(required=False, default=False, help_text="Use the cursive font on title?")
-    content = blocks.RichTextBlock(features=DEFAULT_RICHTEXTBLOCK_FEATURES, help_text="Rich text block, required")
+    content = RichTextBlock(features=DEFAULT_RICHTEXTBLOCK_FEATURES, help_text="Rich text block, required")
     justify = blocks.ChoiceBlock(required=False, choices=Justifications.choices, default=Justifications.LEFT, help_text="Text alignment")
     palette = blocks.ChoiceBlock(
         choices=Palette.choices, default=Palette.WARNING, help_text="Palette"
@@ -42,5 +44,6 @@ class RichTextWithTitleBlock(blocks.StructBlock):
 
     class Meta:
         template = "blocks/simple_richtext_block.html"
+        cache_fragment = True
         label = "RichText with Title"
         icon = "doc-empty-inverse"
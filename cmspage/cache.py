@@ -0,0 +1,318 @@
+"""
+The caching primitive cmspage's caches are built on.
+
+Each of cmspage's caches (menu links, footers, block fragments, pages, expanded rich text,
+render manifests and resolved templates) is a CMSCache: a namespace in the Django cache
+named by its own setting, which provides
+
+- namespaced keys, `cmspage:<namespace>:<parts>`, which can be tagged. A tagged key
+  includes the current versions of its tags (see cmspage.versions), so that starting a
+  new version of a tag invalidates every entry tagged with it at once, without finding or
+  deleting them. Keys in a shared cache are also tagged with their namespace, so that
+  `CMSCache.clear()` discards every entry in it;
+- get-or-compute, computing and storing a value on a miss;
+- an optional in-process (L1) cache in front of the shared one, which keeps the most
+  recently used entries (up to CMSPAGE_CACHE_L1_SIZE) for CMSPAGE_CACHE_L1_TIMEOUT seconds,
+  sparing repeated reads the round trip and unpickling. It is disabled by default;
+- optional compression: values whose pickle is larger than CMSPAGE_CACHE_COMPRESS_THRESHOLD
+  bytes are stored zlib compressed. It is disabled by default;
+- metrics: counts of L1 hits, hits, misses, sets and compressed values for each
+  namespace in this process, returned by `cache_metrics()`.
+
+Since tagged keys are made afresh for every read, an L1 entry is never used once its
+tags change; an entry that is deleted rather than invalidated by a tag may still be read
+from the L1 cache of other processes until it expires there.
+"""
+
+import pickle
+import zlib
+from collections import Counter, OrderedDict
+from functools import wraps
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from cmspage.versions import bump_version, get_versions
+
+__all__ = (
+    "CMSCache",
+    "CMSPAGE_CACHE_COMPRESS_THRESHOLD",
+    "CMSPAGE_CACHE_L1_SIZE",
+    "CMSPAGE_CACHE_L1_TIMEOUT",
+    "cache_metrics",
+    "invalidate_tags",
+    "reset_cache_metrics",
+)
+
+# Settings
+CMSPAGE_CACHE_L1_TIMEOUT = "CMSPAGE_CACHE_L1_TIMEOUT"
+CMSPAGE_CACHE_L1_SIZE = "CMSPAGE_CACHE_L1_SIZE"
+CMSPAGE_CACHE_COMPRESS_THRESHOLD = "CMSPAGE_CACHE_COMPRESS_THRESHOLD"
+
+# Default settings
+DEFAULT_L1_TIMEOUT = 0
+DEFAULT_L1_SIZE = 1000
+
+CACHE_KEY_PREFIX = "cmspage"
+METRICS = ("l1_hits", "hits", "misses", "sets", "compressed")
+
+MISSING = object()
+
+# Every CMSCache, by namespace
+_caches: dict[str, "CMSCache"] = {}
+
+
+def invalidate_tags(*tags: str):
+    """Invalidate every entry tagged with any of the tags"""
+    bump_version(*tags)
+
+
+def cache_metrics() -> dict:
+    """Return the metrics of each cache in this process, by namespace"""
+    return {namespace: cache.metrics() for namespace, cache in _caches.items()}
+
+
+def reset_cache_metrics():
+    for cache in _caches.values():
+        cache.reset_metrics()
+
+
+class Compressed:
+    """A value stored compressed"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __getstate__(self):
+        return self.data
+
+    def __setstate__(self, state):
+        self.data = state
+
+    def value(self):
+        return pickle.loads(zlib.decompress(self.data))
+
+
+class LocalCache:
+    """The in-process entries of a cache, least recently used first"""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key: str):
+        with self.lock:
+            if (entry := self.entries.get(key)) is None:
+                return MISSING
+            if entry[0] <= monotonic():
+                del self.entries[key]
+                return MISSING
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set_many(self, values: dict, timeout: float, size: int):
+        expires = monotonic() + timeout
+        with self.lock:
+            for key, value in values.items():
+                self.entries[key] = (expires, value)
+                self.entries.move_to_end(key)
+            while len(self.entries) > size:
+                self.entries.popitem(last=False)
+
+    def delete_many(self, keys: Iterable[str]):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class CMSCache:
+    """
+    A namespace of cached values, stored in the cache named by the `setting` (by default,
+    `alias`) unless it is set to None, and in the L1 cache if enabled. The L1 timeout, L1
+    size and compression threshold default to their settings.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        setting: str | None = None,
+        alias: str | None = DEFAULT_CACHE_ALIAS,
+        timeout=DEFAULT_TIMEOUT,
+        l1_timeout: float | None = None,
+        l1_size: int | None = None,
+        compress_threshold: int | None = None,
+    ):
+        self.namespace = namespace
+        self.setting = setting
+        self.alias = alias
+        self.timeout = timeout
+        self._l1_timeout = l1_timeout
+        self._l1_size = l1_size
+        self._compress_threshold = compress_threshold
+        self.local = LocalCache()
+        self.counts = Counter()
+        self.counts_lock = Lock()
+        _caches[namespace] = self
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.namespace!r}>"
+
+    @property
+    def backend(self):
+        """The shared cache, or None if it is disabled"""
+        alias = getattr(settings, self.setting, self.alias) if self.setting else self.alias
+        return caches[alias] if alias else None
+
+    @property
+    def l1_timeout(self) -> float:
+        if self._l1_timeout is not None:
+            return self._l1_timeout
+        return getattr(settings, CMSPAGE_CACHE_L1_TIMEOUT, None) or DEFAULT_L1_TIMEOUT
+
+    @property
+    def l1_size(self) -> int:
+        if self._l1_size is not None:
+            return self._l1_size
+        return getattr(settings, CMSPAGE_CACHE_L1_SIZE, None) or DEFAULT_L1_SIZE
+
+    @property
+    def compress_threshold(self) -> int | None:
+        if self._compress_threshold is not None:
+            return self._compress_threshold
+        return getattr(settings, CMSPAGE_CACHE_COMPRESS_THRESHOLD, None)
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None or self.l1_timeout > 0
+
+    @property
+    def tag(self) -> str:
+        """The tag of every key made in a shared cache"""
+        return f"cache:{self.namespace}"
+
+    def key(self, *parts, tags: Iterable[str] = ()) -> str | None:
+        """
+        Return the key for the parts, including the current versions of the tags, or None if
+        there are none (when the version cache stores nothing)
+        """
+        key = ":".join([CACHE_KEY_PREFIX, self.namespace, *map(str, parts)])
+        if self.backend is not None:
+            tags = (*tags, self.tag)
+        if not tags:
+            return key
+        versions = get_versions(*tags)
+        if None in versions.values():
+            return None
+        return f"{key}:{sha256(':'.join(versions.values()).encode()).hexdigest()}"
+
+    def get(self, key: str | None, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys: Iterable[str | None]) -> dict:
+        """Return the values found, by key"""
+        keys = [key for key in dict.fromkeys(keys) if key is not None]
+        found = {}
+        if keys and self.l1_timeout > 0:
+            found = {key: value for key in keys if (value := self.local.get(key)) is not MISSING}
+            self.count(l1_hits=len(found))
+        if (missing := [key for key in keys if key not in found]) and (backend := self.backend) is not None:
+            values = {
+                key: value.value() if isinstance(value, Compressed) else value
+                for key, value in backend.get_many(missing).items()
+            }
+            self.count(hits=len(values))
+            if values and self.l1_timeout > 0:
+                self.local.set_many(values, self.l1_timeout, self.l1_size)
+            found |= values
+        self.count(misses=len(keys) - len(found))
+        return found
+
+    def set(self, key: str | None, value, timeout=DEFAULT_TIMEOUT):
+        self.set_many({key: value}, timeout)
+
+    def set_many(self, values: dict, timeout=DEFAULT_TIMEOUT):
+        if not (values := {key: value for key, value in values.items() if key is not None}):
+            return
+        if self.l1_timeout > 0:
+            self.local.set_many(values, self.l1_timeout, self.l1_size)
+        if (backend := self.backend) is not None:
+            backend.set_many(
+                {key: self.compress(value) for key, value in values.items()},
+                self.timeout if timeout is DEFAULT_TIMEOUT else timeout,
+            )
+        self.count(sets=len(values))
+
+    def delete_many(self, keys: Iterable[str | None]):
+        keys = [key for key in keys if key is not None]
+        self.local.delete_many(keys)
+        if keys and (backend := self.backend) is not None:
+            backend.delete_many(keys)
+
+    def get_or_compute(self, *parts, compute: Callable, tags: Iterable[str] = (), timeout=DEFAULT_TIMEOUT):
+        """Return the cached value for the parts and tags, computing and caching it on a miss"""
+        if not self.enabled or (key := self.key(*parts, tags=tags)) is None:
+            return compute()
+        if (value := self.get(key, MISSING)) is MISSING:
+            value = compute()
+            self.set(key, value, timeout)
+        return value
+
+    def clear(self):
+        """Discard the entries in this process and, by starting a new version of its tag, the shared ones"""
+        self.local.clear()
+        if self.backend is not None:
+            invalidate_tags(self.tag)
+
+    def memoize(self, func: Callable | None = None, *, condition: Callable[[], bool] | None = None):
+        """
+        Decorator caching a function's results by its arguments (which must have a stable
+        repr), while `condition()` is true. The wrapper's `cache_clear()` clears the cache.
+        """
+
+        def decorator(func):
+            name = f"{func.__module__}.{func.__qualname__}"
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if condition is not None and not condition():
+                    return func(*args, **kwargs)
+                arguments = sha256(repr((args, sorted(kwargs.items()))).encode()).hexdigest()
+                # Wrapped, so that a None result is cached too
+                return self.get_or_compute(name, arguments, compute=lambda: (func(*args, **kwargs),))[0]
+
+            wrapper.cache_clear = self.clear
+            return wrapper
+
+        return decorator if func is None else decorator(func)
+
+    def compress(self, value):
+        if (threshold := self.compress_threshold) is None:
+            return value
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) <= threshold:
+            return value
+        self.count(compressed=1)
+        return Compressed(zlib.compress(data))
+
+    def count(self, **counts: int):
+        with self.counts_lock:
+            self.counts.update(counts)
+
+    def metrics(self) -> dict:
+        with self.counts_lock:
+            return {name: self.counts[name] for name in METRICS}
+
+    def reset_metrics(self):
+        with self.counts_lock:
+            self.counts.clear()
@@ -0,0 +1,106 @@
+"""
+Conditional GET for CMS pages.
+
+Responses from `CMSPageBase.serve()` carry a strong ETag and a Last-Modified date, so that
+browsers and proxies revalidate a page rather than download it again. The ETag is a hash
+of the page's live revision, the site, the path and language, the audience (anonymous, or
+the logged in user) and the versions of the page, the sites, the menu and the footer (see
+cmspage.versions), which change when the page's dependencies, a site, the menu or the
+footer change. Last-Modified is the page's `last_published_at`.
+
+Both are computed before the page is rendered, so a request whose validators match is
+answered with 304 Not Modified without building any context or rendering. Since an ETag
+takes precedence over a date, If-Modified-Since is only used by clients that do not send
+If-None-Match. Previews, requests with messages to show and requests other than GET and
+HEAD are always rendered. Setting CMSPAGE_CONDITIONAL_GET to False disables validators.
+"""
+
+from calendar import timegm
+from hashlib import sha256
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+
+from cmspage.audience import has_pending_messages, request_user
+from cmspage.fragments import is_preview, page_site_id
+from cmspage.page_cache import CACHED_METHODS, page_cache_tags
+from cmspage.versions import get_versions
+
+__all__ = (
+    "CMSPAGE_CONDITIONAL_GET",
+    "page_audience",
+    "page_etag",
+    "page_last_modified",
+    "serve_conditional",
+)
+
+# Settings
+CMSPAGE_CONDITIONAL_GET = "CMSPAGE_CONDITIONAL_GET"
+
+VALIDATED_STATUS = (200, 304)
+
+
+def page_audience(request) -> str:
+    """Who the page is rendered for: anonymous visitors, or a logged in user"""
+    if (user := request_user(request)) is not None:
+        return f"user:{user.pk}"
+    return "anonymous"
+
+
+def page_etag(page, request) -> str | None:
+    """Return the quoted ETag of the page as served for the request, or None if it has none"""
+    if not (revision_id := getattr(page, "live_revision_id", None)):
+        return None
+    versions = get_versions(*page_cache_tags(page))
+    if None in versions.values():
+        return None
+    parts = [
+        str(revision_id),
+        str(page_site_id(page, request)),
+        request.get_full_path(),
+        get_language() or "",
+        page_audience(request),
+        *versions.values(),
+    ]
+    return quote_etag(sha256("\n".join(parts).encode()).hexdigest())
+
+
+def page_last_modified(page) -> int | None:
+    """Return when the page was last published, as a timestamp"""
+    if (published := getattr(page, "last_published_at", None)) is None:
+        return None
+    return timegm(published.utctimetuple())
+
+
+def is_conditional_request(request) -> bool:
+    return (
+        getattr(settings, CMSPAGE_CONDITIONAL_GET, True)
+        and request.method in CACHED_METHODS
+        and not is_preview(request)
+        and not has_pending_messages(request)
+    )
+
+
+def serve_conditional(page, request, serve):
+    """
+    Answer the request with 304 Not Modified if its validators match the page's, otherwise
+    `serve()` the page, adding the page's validators to a successful response
+    """
+    if not is_conditional_request(request):
+        return serve()
+    etag, last_modified = page_etag(page, request), page_last_modified(page)
+    if etag is None and last_modified is None:
+        return serve()
+    if (response := get_conditional_response(request, etag=etag, last_modified=last_modified)) is None:
+        response = serve()
+    if response.status_code in VALIDATED_STATUS:
+        # As GZipMiddleware, a compressed response is only weakly equivalent
+        if etag is not None and response.has_header("Content-Encoding"):
+            etag = f"W/{etag}"
+        if etag is not None:
+            response.headers.setdefault("ETag", etag)
+        if last_modified is not None and not response.has_header("Last-Modified"):
+            response.headers["Last-Modified"] = http_date(last_modified)
+    return response
@@ -4,8 +4,10 @@ from typing import List
 
 from django.http import HttpRequest
 from django.contrib.auth import get_user_model
+from django.utils.functional import SimpleLazyObject
 from wagtail.models import Site
 
+from .audience import request_user
 from .models import MenuLink
 
 __all__ = ("navigation", "cmspage_context", "site_variables")
@@ -43,8 +45,9 @@ def _nav_pages_for_site(site: Site | None, user: User | None, request: HttpReque
     if site is None:
         return []
 
-    user_id = user.pk if user else 0
-    cached_menu_links = MenuLink.get_cached_menu_links(site, user_id)
+    # The links are the same for every user (staff only links are left out below), and the
+    # user is only looked at if there are staff only links
+    cached_menu_links = MenuLink.get_cached_menu_links(site, 0)
 
     tree = []
     id_to_link = {}
@@ -84,10 +87,18 @@ def _nav_pages_for_site(site: Site | None, user: User | None, request: HttpReque
     return tree
 
 
+def _lazy_navigation(site: Site | None, request: HttpRequest):
+    """
+    The navigation, built when a template first uses it. The user is only loaded for staff
+    only links, so pages rendered for anonymous visitors do not load the session.
+    """
+    user = SimpleLazyObject(lambda: request_user(request))
+    return SimpleLazyObject(lambda: _nav_pages_for_site(site, user, request))
+
+
 def navigation(request: HttpRequest) -> dict:
-    user = request.user if request.user.is_authenticated else None
     site: Site = Site.find_for_request(request)
-    return {"navigation": _nav_pages_for_site(site, user, request)}
+    return {"navigation": _lazy_navigation(site, request)}
 
 
 def site_variables(request: HttpRequest) -> dict:
@@ -109,7 +120,6 @@ def cmspage_context(request: HttpRequest) -> dict:
     except Site.DoesNotExist:
         site = None
 
-    user = request.user if request.user.is_authenticated else None
-    context = {"navigation": _nav_pages_for_site(site, user, request)}
+    context = {"navigation": _lazy_navigation(site, request)}
     context.update(_site_variables(site))
     return context
@@ -0,0 +1,163 @@
+"""
+The objects each CMS page depends on, for targeted invalidation of its cached content.
+
+When a CMS page is published, the images, documents and pages chosen or linked in its
+StreamFields (including those in rich text), its media embeds and its tags are recorded
+as PageDependency rows for the page, replacing those of its previous revision. The table
+is indexed by object, so when an object changes, the pages depending on it are found in
+one query, and only their versions (see `cmspage.versions.page_version()`) are bumped,
+discarding their cached block fragments and pages. A dependent footer page discards the
+cached footers, and a page or document in the menu the cached menu links.
+
+An object changes when an image, document, embed or tag is saved or deleted, and when a
+page is published, unpublished or deleted. Moving a page or changing its slug changes the
+URLs of every page below it, so the pages depending on any of them are invalidated.
+
+Pages published before the index existed have no dependencies recorded until they are
+published again; `manage.py backfill_page_dependencies` records them for every live page.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from taggit.models import Tag
+from wagtail.blocks import RichTextBlock
+from wagtail.documents.models import AbstractDocument
+from wagtail.embeds.blocks import EmbedBlock
+from wagtail.embeds.embeds import get_embed_hash
+from wagtail.embeds.models import Embed
+from wagtail.images.models import AbstractImage
+from wagtail.models import Page
+from wagtail.rich_text import extract_references_from_rich_text
+from wagtail.rich_text.rewriters import FIND_EMBED_TAG, extract_attrs
+from wagtail.signals import page_published, page_slug_changed, page_unpublished, post_page_move
+
+from cmspage.footer import invalidate_footer_cache
+from cmspage.models import CMSFooterPage, MenuLink, PageDependency
+from cmspage.models.cms_page import AbstractCMSPage
+from cmspage.references import page_streams, stream_block_values, stream_chooser_ids
+from cmspage.versions import bump_version, page_version
+
+__all__ = (
+    "DEPENDENCY_MODELS",
+    "dependent_page_ids",
+    "invalidate_dependents",
+    "page_dependencies",
+    "record_dependencies",
+)
+
+# Models whose objects pages depend on, other than pages
+DEPENDENCY_MODELS = (AbstractImage, AbstractDocument, Embed, Tag)
+
+
+def dependency_model(model):
+    """The model a dependency is recorded against: Page for any page type"""
+    return Page if issubclass(model, Page) else model
+
+
+def menu_link_field(model) -> str | None:
+    """The MenuLink field that can link to objects of a model, if any"""
+    if issubclass(model, Page):
+        return "link_page_id"
+    if issubclass(model, AbstractDocument):
+        return "link_document_id"
+    return None
+
+
+def rich_text_embed_urls(source: str):
+    for match in FIND_EMBED_TAG.findall(source):
+        attrs = extract_attrs(match)
+        if attrs.get("embedtype") == "media" and attrs.get("url"):
+            yield attrs["url"]
+
+
+def page_dependencies(page) -> set:
+    """Return the objects the page depends on as (model, object id) pairs"""
+    streams = page_streams(page)
+    dependencies = {
+        (dependency_model(model), str(object_id))
+        for model, object_ids in stream_chooser_ids(streams).items()
+        for object_id in object_ids
+    }
+    for value in stream_block_values(streams, RichTextBlock):
+        source = getattr(value, "source", None) or ""
+        dependencies.update(
+            (dependency_model(model), str(object_id))
+            for model, object_id, *_ in extract_references_from_rich_text(source)
+        )
+        dependencies.update((Embed, get_embed_hash(url)) for url in rich_text_embed_urls(source))
+    dependencies.update(
+        (Embed, get_embed_hash(value.url)) for value in stream_block_values(streams, EmbedBlock) if value
+    )
+    if (tags := getattr(page, "tags", None)) is not None:
+        dependencies.update((Tag, str(tag.pk)) for tag in tags.all())
+    return dependencies
+
+
+def record_dependencies(page, revision_id: int | None = None) -> int:
+    """Record the objects the page depends on, replacing any previously recorded, and return their number"""
+    dependencies = page_dependencies(page)
+    content_types = ContentType.objects.get_for_models(*{model for model, _ in dependencies})
+    revision_id = revision_id or page.live_revision_id
+    with transaction.atomic():
+        PageDependency.objects.filter(page_id=page.pk).delete()
+        PageDependency.objects.bulk_create(
+            PageDependency(
+                page_id=page.pk, revision_id=revision_id, content_type=content_types[model], object_id=object_id
+            )
+            for model, object_id in dependencies
+        )
+    return len(dependencies)
+
+
+def dependent_page_ids(model, object_ids) -> set:
+    """Return the ids of the pages depending on objects of a model"""
+    return set(
+        PageDependency.objects.filter(
+            content_type=ContentType.objects.get_for_model(dependency_model(model)),
+            object_id__in=[str(object_id) for object_id in object_ids],
+        ).values_list("page_id", flat=True)
+    )
+
+
+def invalidate_dependents(model, object_ids) -> set:
+    """Invalidate the cached content of the pages depending on objects of a model, returning their ids"""
+    object_ids = list(object_ids)
+    if page_ids := dependent_page_ids(model, object_ids):
+        bump_version(*(page_version(page_id) for page_id in page_ids))
+        if CMSFooterPage.objects.filter(pk__in=page_ids).exists():
+            invalidate_footer_cache()
+    if (field := menu_link_field(model)) and MenuLink.objects.filter(**{f"{field}__in": object_ids}).exists():
+        MenuLink.clear_cached_menu_links()
+    return page_ids
+
+
+def _object_id(instance):
+    return get_embed_hash(instance.url) if isinstance(instance, Embed) else instance.pk
+
+
+@receiver([post_save, post_delete])
+def _invalidate_changed(sender, instance, **kwargs):
+    if isinstance(instance, DEPENDENCY_MODELS):
+        invalidate_dependents(type(instance), [_object_id(instance)])
+    elif isinstance(instance, Page) and kwargs.get("signal") is post_delete:
+        invalidate_dependents(Page, [instance.pk])
+
+
+@receiver(page_published)
+def _record_published(sender, instance, revision=None, **kwargs):
+    if isinstance(instance, AbstractCMSPage):
+        record_dependencies(instance, revision.pk if revision else None)
+    invalidate_dependents(Page, [instance.pk])
+
+
+@receiver(page_unpublished)
+def _invalidate_unpublished(sender, instance, **kwargs):
+    invalidate_dependents(Page, [instance.pk])
+
+
+@receiver([post_page_move, page_slug_changed])
+def _invalidate_subtree(sender, instance, **kwargs):
+    # The URLs of the page and every page below it have changed
+    invalidate_dependents(Page, Page.objects.descendant_of(instance, inclusive=True).values_list("pk", flat=True))
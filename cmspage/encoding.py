@@ -0,0 +1,89 @@
+"""
+Precompressed variants of cached pages.
+
+A page served from the page cache (see cmspage.page_cache) is the same for every anonymous
+visitor, so compressing it for each response, as GZipMiddleware does, repeats the same
+work on every hit. Instead, the first time a cached page is served to a visitor it is the
+same for (an anonymous visitor without messages), its gzip and, if the `brotli` package is
+installed, brotli variants are stored alongside it, and later hits are answered with the
+variant the client accepts. Pages whose holes (see cmspage.holes) were filled with
+something specific to the visitor are left to GZipMiddleware.
+
+The encodings stored are set by CMSPAGE_PAGE_CACHE_ENCODINGS, in order of preference
+(by default brotli, then gzip); set it to an empty list to store none.
+"""
+
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+__all__ = (
+    "CMSPAGE_PAGE_CACHE_ENCODINGS",
+    "accepted_encoding",
+    "compress",
+    "encode_response",
+    "page_encodings",
+)
+
+# Settings
+CMSPAGE_PAGE_CACHE_ENCODINGS = "CMSPAGE_PAGE_CACHE_ENCODINGS"
+
+# Default settings
+DEFAULT_ENCODINGS = ("br", "gzip")
+
+# As GZipMiddleware, shorter content is not worth compressing
+MINIMUM_LENGTH = 200
+
+ACCEPT_ENCODING = re.compile(r"^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$")
+
+
+def _gzip(content: bytes) -> bytes:
+    # No timestamp, so that the same content always compresses the same
+    return gzip.compress(content, mtime=0)
+
+
+COMPRESSORS = {
+    "gzip": _gzip,
+    "br": brotli.compress if brotli is not None else None,
+}
+
+
+def page_encodings() -> tuple[str, ...]:
+    """The encodings of cached pages stored, in order of preference, that are available"""
+    encodings = getattr(settings, CMSPAGE_PAGE_CACHE_ENCODINGS, DEFAULT_ENCODINGS) or ()
+    return tuple(encoding for encoding in encodings if COMPRESSORS.get(encoding) is not None)
+
+
+def accepted_encoding(request, encodings) -> str | None:
+    """Return the first of the encodings the request's Accept-Encoding accepts, if any"""
+    accepted = {}
+    for value in request.META.get("HTTP_ACCEPT_ENCODING", "").lower().split(","):
+        if match := ACCEPT_ENCODING.match(value):
+            try:
+                accepted[match[1]] = float(match[2] or 1)
+            except ValueError:
+                continue
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(content: bytes, encodings) -> dict[str, bytes]:
+    """Return the content compressed with each of the encodings, by encoding"""
+    return {encoding: COMPRESSORS[encoding](content) for encoding in encodings}
+
+
+def encode_response(response, encoding: str, content: bytes):
+    """Replace the response's content with the same content compressed with the encoding"""
+    response.content = content
+    response.headers["Content-Encoding"] = encoding
+    response.headers["Content-Length"] = str(len(content))
+    patch_vary_headers(response, ("Accept-Encoding",))
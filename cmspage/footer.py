@@ -0,0 +1,144 @@
+"""
+Site footers, rendered once and cached.
+
+Each site's footer is its live CMSFooterPage, or for a site without one of its own, the
+first live footer page (so that sites can share a footer). Its rendered HTML is cached
+per site (see cmspage.cache), tagged with the `footer` version and along with the footer
+revision it was rendered from, so that a page costs a single cache lookup for its footer:
+`CMSPageBase.get_context()` only loads the footer page (prefetching its images and links
+with the page's own) when the site's footer is not cached, and `{% cmspage_footer %}`
+renders the cached fragment or renders and caches it.
+
+The fragment is rendered with its own icon state, so that it defines every icon symbol
+it uses, wherever it is reused. Cached footers are discarded when a footer page is
+published, unpublished or deleted, when a page is moved or a site changes, and when an
+object a footer page depends on changes (see cmspage.dependencies). Previews are never
+cached.
+"""
+
+from functools import cached_property
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.template import Template
+from django.template.loader import get_template
+from django.utils.functional import SimpleLazyObject
+from django.utils.safestring import SafeString, mark_safe
+from wagtail.models import Site
+from wagtail.signals import page_published, page_unpublished, post_page_move
+
+from cmspage.cache import CMSCache
+from cmspage.fragments import is_preview, page_site_id, render_fragment, use_fragment
+from cmspage.versions import FOOTER, bump_version
+
+__all__ = (
+    "CMSPAGE_FOOTER_CACHE",
+    "DEFAULT_FOOTER_TEMPLATE",
+    "SiteFooter",
+    "footer_cache_key",
+    "get_footer_cache",
+    "invalidate_footer_cache",
+    "render_footer_page",
+)
+
+# Settings
+CMSPAGE_FOOTER_CACHE = "CMSPAGE_FOOTER_CACHE"
+
+# Default settings
+DEFAULT_FOOTER_TEMPLATE = "cmspage/cms_footer_page.html"
+
+footer_cache = CMSCache("footer", CMSPAGE_FOOTER_CACHE)
+
+
+def get_footer_cache() -> CMSCache | None:
+    """Return the cache for rendered footers, or None if CMSPAGE_FOOTER_CACHE disables it"""
+    return footer_cache if footer_cache.enabled else None
+
+
+def footer_cache_key(site_id: int | None) -> str | None:
+    return footer_cache.key(site_id, tags=[FOOTER])
+
+
+def invalidate_footer_cache():
+    """Discard the rendered footers of every site"""
+    bump_version(FOOTER)
+
+
+def render_footer_page(page, context, template_name: str = DEFAULT_FOOTER_TEMPLATE) -> str:
+    """Render a footer page in a layer of the current context"""
+    template = get_template(template_name)
+    if isinstance(template.template, Template):
+        with context.push(page=page):
+            return template.template.render(context)
+    return template.render(context.flatten() | {"page": page})
+
+
+class SiteFooter:
+    """
+    The footer of a site: its rendered HTML from the cache when there is one, and otherwise
+    its footer page, loaded on first use.
+    """
+
+    template_name = DEFAULT_FOOTER_TEMPLATE
+
+    def __init__(self, site_id: int | None = None, cached: dict | None = None, cacheable: bool = True):
+        self.site_id = site_id
+        self.cached = cached
+        self.cacheable = cacheable
+
+    @classmethod
+    def for_site(cls, site_id: int | None, request=None) -> "SiteFooter":
+        """Return the footer of a site, looking it up in the cache (except for previews)"""
+        cache = None if is_preview(request) else get_footer_cache()
+        if cache is None:
+            return cls(site_id, cacheable=False)
+        return cls(site_id, cache.get(footer_cache_key(site_id)))
+
+    @classmethod
+    def for_page(cls, page, request=None) -> "SiteFooter":
+        """Return the footer of the site the page is served from"""
+        return cls.for_site(page_site_id(page, request), request)
+
+    @cached_property
+    def page(self):
+        from cmspage.models import CMSFooterPage
+
+        return CMSFooterPage.for_site(self.site_id)
+
+    def get_context(self) -> dict:
+        """
+        Template context for the footer: `site_footer`, and `page_footer`, the footer page,
+        which is only loaded if it is used when the footer is cached
+        """
+        return {
+            "site_footer": self,
+            "page_footer": self.page if self.cached is None else SimpleLazyObject(lambda: self.page),
+        }
+
+    def render(self, context) -> SafeString:
+        if self.cached is None:
+            if (page := self.page) is None:
+                return mark_safe("")
+            fragment = render_fragment(context, lambda: render_footer_page(page, context, self.template_name))
+            self.cached = {"page": page.pk, "revision": page.live_revision_id, **fragment}
+            if self.cacheable and (cache := get_footer_cache()) is not None:
+                cache.set(footer_cache_key(self.site_id), self.cached)
+        return use_fragment(context, self.cached)
+
+
+@receiver([post_save, post_delete], sender=Site)
+def _invalidate_sites(sender, **kwargs):
+    invalidate_footer_cache()
+
+
+@receiver([page_published, page_unpublished, post_delete])
+def _invalidate_footer_page(sender, instance, **kwargs):
+    from cmspage.models import CMSFooterPage
+
+    if isinstance(instance, CMSFooterPage):
+        invalidate_footer_cache()
+
+
+@receiver(post_page_move)
+def _invalidate_moved(sender, **kwargs):
+    invalidate_footer_cache()
@@ -0,0 +1,113 @@
+"""
+Cached fragments of rendered StreamField blocks.
+
+Most page body blocks render the same HTML on every request, as their output depends
+only on the block value, the objects it refers to and the site. Blocks opt in to caching
+their rendered fragment with `cache_fragment = True` in their Meta, as the bundled body
+blocks do; blocks whose output varies by request (such as a form with a CSRF token) leave
+it unset or opt out with `cache_fragment = False`.
+
+`{% cmspage_blocks %}` renders a page's body with the fragments of all its cacheable
+blocks read in one cache read. Misses and blocks that are not cacheable are rendered
+normally, and the misses cached. Fragments are keyed by the site, the page's live
+revision and the block id, and tagged with the page's version and the `sites` version
+(see cmspage.cache and cmspage.versions), so they are discarded when an object the page depends on changes, and each is
+rendered with its own icon state, so that it defines the icon symbols it uses. Previews
+are rendered without the cache.
+"""
+
+from django.template import Context
+from django.utils.safestring import SafeString, mark_safe
+
+from cmspage.cache import CMSCache
+from cmspage.icons import add_icons_in_use, separate_icons
+from cmspage.versions import SITES, page_version
+
+__all__ = (
+    "CMSPAGE_FRAGMENT_CACHE",
+    "fragment_key_prefix",
+    "get_fragment_cache",
+    "is_cacheable",
+    "is_preview",
+    "page_site_id",
+    "render_blocks",
+    "render_fragment",
+    "use_fragment",
+)
+
+# Settings
+CMSPAGE_FRAGMENT_CACHE = "CMSPAGE_FRAGMENT_CACHE"
+
+fragment_cache = CMSCache("fragment", CMSPAGE_FRAGMENT_CACHE)
+
+
+def get_fragment_cache() -> CMSCache | None:
+    """Return the cache for block fragments, or None if CMSPAGE_FRAGMENT_CACHE disables it"""
+    return fragment_cache if fragment_cache.enabled else None
+
+
+def is_preview(request) -> bool:
+    return bool(getattr(request, "is_preview", False) or getattr(request, "in_preview_panel", False))
+
+
+def page_site_id(page, request=None) -> int | None:
+    """Return the id of the site the page is served from"""
+    url_parts = page.get_url_parts(request)
+    return url_parts[0] if url_parts else None
+
+
+def render_fragment(context, render) -> dict:
+    """Render markup with its own icon state, as a fragment that can be cached and reused"""
+    with separate_icons(context) as icons:
+        html = render()
+    return {"html": html, "icons": icons}
+
+
+def use_fragment(context, fragment: dict) -> SafeString:
+    """Return a fragment's markup, recording its icons as in use for the rest of the page"""
+    add_icons_in_use(context, fragment["icons"])
+    return mark_safe(fragment["html"])
+
+
+def is_cacheable(block) -> bool:
+    return bool(getattr(block.meta, "cache_fragment", False))
+
+
+def fragment_key_prefix(page, request=None) -> str | None:
+    """Return the cache key prefix for the fragments of a page, or None if they are not cached"""
+    if page is None or is_preview(request) or not (revision_id := getattr(page, "live_revision_id", None)):
+        return None
+    return fragment_cache.key(page_site_id(page, request), revision_id, tags=[page_version(page.pk), SITES])
+
+
+def render_blocks(stream, context, page=None) -> SafeString:
+    """
+    Render the blocks of a page's StreamField as `{% include_block %}` does, each with its
+    `block_index`, taking the fragments of cacheable blocks from the cache
+    """
+    bound_blocks = list(stream or ())
+    if not bound_blocks:
+        return mark_safe("")
+    cache = get_fragment_cache()
+    prefix = cache and fragment_key_prefix(page or context.get("page"), context.get("request"))
+    keys = {
+        index: f"{prefix}:{bound_block.id}"
+        for index, bound_block in enumerate(bound_blocks)
+        if prefix and bound_block.id and is_cacheable(bound_block.block)
+    }
+    cached = cache.get_many(keys.values()) if keys else {}
+
+    values = context.flatten() if isinstance(context, Context) else dict(context)
+    rendered, missed = [], {}
+    for index, bound_block in enumerate(bound_blocks):
+        block_context = values | {"block_index": index}
+        if (key := keys.get(index)) is None:
+            rendered.append(bound_block.render_as_block(context=block_context))
+            continue
+        if (fragment := cached.get(key)) is None:
+            fragment = render_fragment(context, lambda: bound_block.render_as_block(context=block_context))
+            missed[key] = fragment
+        rendered.append(use_fragment(context, fragment))
+    if missed:
+        cache.set_many(missed)
+    return mark_safe("".join(rendered))
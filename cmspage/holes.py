@@ -0,0 +1,193 @@
+"""
+Hole-punched pages: page shells shared between visitors, with fragments filled per request.
+
+A few parts of a page differ between visitors who otherwise see the same page: the
+messages shown to them, the staff only links in the navigation and the CSRF token of a
+form. Rendered in place, any of them keeps the whole page out of the page cache (see
+cmspage.page_cache). Templates instead mark them as holes, with the markup to render when
+the page is not hole-punched:
+
+    {% cmspage_hole "messages" template=include.messages %}...{% endcmspage_hole %}
+
+While a CMS page is served, each hole renders as a signed placeholder holding its name and
+arguments, so that the rendered page (the shell) can be cached, and the holes are filled
+just before the response is returned, whether the shell was rendered or read from the
+cache, with the HTML of the renderer registered for each name. Filling a page is a single
+scan of its HTML for placeholders. Outside `CMSPageBase.serve()`, or with CMSPAGE_HOLES
+set to False, the markup in the tag is rendered in place.
+
+The bundled holes are `csrf_token`, `messages` and `navigation`; `register_hole()` adds
+others. Renderers take the request and the hole's arguments (which must be JSON
+serializable) and return HTML, and each renders with its own icon state, so that it
+defines the icon symbols it uses. A renderer only has the request and its arguments, not
+the context of the page it fills (such as `page`), so a hole may also be registered with a
+condition, and is then only punched when the condition holds for the request, and otherwise
+rendered in place. The `navigation` hole is only punched in pages that are cached (see
+cmspage.page_cache) for sites whose menu has staff only links, and its renderer has only
+the request, the site variables and the navigation (see cmspage.context_processors).
+"""
+
+import re
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core import signing
+from django.middleware.csrf import get_token
+from django.template import Context
+from django.template.loader import get_template
+from django.utils.html import format_html
+from wagtail.models import Site
+
+from cmspage.audience import has_pending_messages
+from cmspage.fragments import render_fragment
+
+__all__ = (
+    "CMSPAGE_HOLES",
+    "fill_holes",
+    "fill_response",
+    "has_staff_navigation",
+    "hole_renderers",
+    "is_punching",
+    "punch_hole",
+    "punched_holes",
+    "register_hole",
+    "serve_with_holes",
+)
+
+# Settings
+CMSPAGE_HOLES = "CMSPAGE_HOLES"
+
+PLACEHOLDER_PREFIX = "<!--cmspage-hole:"
+PLACEHOLDER = re.compile(re.escape(PLACEHOLDER_PREFIX) + r"([\w:-]+)-->")
+SIGNING_SALT = "cmspage.holes"
+
+# Hole renderers, and the conditions of holes only punched when they hold, by name
+_renderers: dict[str, Callable] = {}
+_conditions: dict[str, Callable] = {}
+
+
+def register_hole(name: str, renderer: Callable | None = None, condition: Callable | None = None):
+    """
+    Register the renderer of a hole, `renderer(request, **arguments) -> str`, and optionally
+    the `condition(request) -> bool` for it to be punched. Can be used as a decorator,
+    `@register_hole("name")`.
+    """
+    if renderer is None:
+        return lambda renderer: register_hole(name, renderer, condition)
+    _renderers[name] = renderer
+    if condition is None:
+        _conditions.pop(name, None)
+    else:
+        _conditions[name] = condition
+    return renderer
+
+
+def hole_renderers() -> dict:
+    return dict(_renderers)
+
+
+def is_punching(request, name: str | None = None) -> bool:
+    """Whether holes (or the named hole) are punched in the page being rendered for the request"""
+    if getattr(request, "cmspage_holes", None) is None:
+        return False
+    return name is None or (condition := _conditions.get(name)) is None or condition(request)
+
+
+def punched_holes(request) -> set:
+    """The names of the holes punched in the page rendered for the request"""
+    return getattr(request, "cmspage_holes", None) or set()
+
+
+def punch_hole(request, name: str, arguments: dict | None = None) -> str:
+    """Return the placeholder of a hole, recording it as punched for the request"""
+    request.cmspage_holes.add(name)
+    signed = signing.dumps([name, arguments or {}], salt=SIGNING_SALT)
+    return f"{PLACEHOLDER_PREFIX}{signed}-->"
+
+
+def render_hole(request, signed: str) -> str:
+    try:
+        name, arguments = signing.loads(signed, salt=SIGNING_SALT)
+    except signing.BadSignature:
+        return ""
+    if (renderer := _renderers.get(name)) is None:
+        return ""
+    context = Context({"request": request})
+    return render_fragment(context, lambda: renderer(request, **arguments))["html"]
+
+
+def fill_holes(request, html: str) -> str:
+    """Replace the placeholders in the HTML with their holes rendered for the request"""
+    if PLACEHOLDER_PREFIX not in html:
+        return html
+    return PLACEHOLDER.sub(lambda match: str(render_hole(request, match.group(1))), html)
+
+
+def fill_response(request, response):
+    """Fill the holes in the content of a rendered response"""
+    if (
+        response.streaming
+        or response.has_header("Content-Encoding")
+        or PLACEHOLDER_PREFIX.encode() not in response.content
+    ):
+        return
+    charset = response.charset
+    response.content = fill_holes(request, response.content.decode(charset)).encode(charset)
+
+
+def serve_with_holes(request, serve):
+    """
+    `serve()` the page with holes punched in it, filling them in the response once it is
+    rendered (after the page cache has stored the shell)
+    """
+    if not getattr(settings, CMSPAGE_HOLES, True):
+        return serve()
+    request.cmspage_holes = set()
+    response = serve()
+    if hasattr(response, "add_post_render_callback"):
+        response.add_post_render_callback(lambda rendered: fill_response(request, rendered))
+    else:
+        fill_response(request, response)
+    return response
+
+
+@register_hole("csrf_token")
+def render_csrf_token(request) -> str:
+    return format_html('<input type="hidden" name="csrfmiddlewaretoken" value="{}">', get_token(request))
+
+
+@register_hole("messages")
+def render_messages(request, template: str | None = None) -> str:
+    if not template:
+        return ""
+    messages = get_messages(request) if has_pending_messages(request) else ()
+    return get_template(template).render({"messages": messages, "request": request})
+
+
+def has_staff_navigation(request) -> bool:
+    """
+    Whether the navigation of the page rendered for the request differs between the visitors
+    it is cached for: the page cache applies to the request, and the menu has staff only links
+    """
+    from cmspage.models import MenuLink
+    from cmspage.page_cache import get_page_cache, is_cacheable_request
+
+    if get_page_cache() is None or not is_cacheable_request(request):
+        return False
+    if (site := Site.find_for_request(request)) is None:
+        return False
+    return any(link.staff_only for link in MenuLink.get_cached_menu_links(site, 0))
+
+
+@register_hole("navigation", condition=has_staff_navigation)
+def render_navigation(request, item_template: str | None = None) -> str:
+    """
+    The navigation for the request's user, rendered with only the request, the site
+    variables and the navigation in the context
+    """
+    from cmspage.context_processors import cmspage_context
+    from cmspage.templatetags.cmspage_tags import cmspage_navigation
+
+    context = Context({"request": request, "include": {"navigation_item": item_template}} | cmspage_context(request))
+    return cmspage_navigation(context, item_template=item_template)
@@ -0,0 +1,173 @@
+"""
+SVG icon rendering from a sprite.
+
+Menu and social icons used to be rendered by including the icon's SVG template,
+which renders a template per icon and inlines the full SVG every time an icon is
+used. `scripts/mkicons.py` generates a sprite holding each icon as a <symbol>, and
+`{% cmspage_icon %}` renders icons as `<svg><use href="#id"></svg>` references.
+
+The first use of an icon in a request also carries its <symbol>, so each page holds
+only the icons it uses, each exactly once. Icons that are not in the sprite (such as
+project specific icons) are still rendered by including their template, once per
+request.
+"""
+
+import re
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template import Context, Template, TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.html import format_html
+from django.utils.safestring import SafeString, mark_safe
+
+from cmspage.models.functional import conditional_lru_cache
+
+__all__ = (
+    "CMSPAGE_ICON_SPRITE",
+    "DEFAULT_ICON_SPRITE",
+    "add_icons_in_use",
+    "icon_id",
+    "icon_sprite",
+    "icons_in_use",
+    "render_icon",
+    "separate_icons",
+)
+
+# Settings
+CMSPAGE_ICON_SPRITE = "CMSPAGE_ICON_SPRITE"
+
+# Default settings
+DEFAULT_ICON_SPRITE = "cmspage/icon_sprite.svg"
+
+SYMBOL = re.compile(r'<symbol id="(?P<id>[^"]+)"(?P<attrs>[^>]*)>.*?</symbol>', re.DOTALL)
+VIEWBOX = re.compile(r'viewBox="([^"]*)"')
+
+
+def icon_id(icon: str) -> str:
+    """
+    Return the sprite symbol id for an icon template path,
+    e.g. "cmspage/icons/tech/cloud.svg" -> "cmspage-icons-tech-cloud".
+    Must match mkicons.icon_id().
+    """
+    return re.sub(r"[^\w-]+", "-", icon.removesuffix(".svg")).strip("-")
+
+
+def _sprite_template_name() -> str | None:
+    sprite = getattr(settings, CMSPAGE_ICON_SPRITE, None)
+    return DEFAULT_ICON_SPRITE if sprite is None else sprite or None
+
+
+@conditional_lru_cache
+def icon_sprite(template_name: str | None = None) -> dict:
+    """
+    Return the symbols in the sprite template as {id: (viewBox, symbol markup)}.
+    Returns an empty dict when sprites are disabled (CMSPAGE_ICON_SPRITE = False) or the sprite
+    template does not exist.
+    """
+    if not (template_name := template_name or _sprite_template_name()):
+        return {}
+    try:
+        source = get_template(template_name).template.source
+    except (TemplateDoesNotExist, AttributeError):
+        return {}
+    return {
+        match["id"]: ((viewbox := VIEWBOX.search(match["attrs"])) and viewbox[1], match[0])
+        for match in SYMBOL.finditer(source)
+    }
+
+
+def icons_in_use(context) -> dict | None:
+    """
+    Return the icons already rendered for this request, holding the markup for later uses
+    of each icon and the ids of the symbols already defined.
+    Stored on the request so that it spans every template (and block) rendered for a page,
+    falling back to the render context when there is no request.
+    """
+    if context is None:
+        return None
+    if (request := context.get("request")) is not None:
+        try:
+            return request.cmspage_icons
+        except AttributeError:
+            request.cmspage_icons = {}
+            return request.cmspage_icons
+    if isinstance(context, Context):
+        return context.render_context.dicts[0].setdefault("cmspage_icons", {})
+    return None
+
+
+def _set_icons_in_use(context, icons: dict | None):
+    if (request := context.get("request")) is not None:
+        request.cmspage_icons = icons
+    elif isinstance(context, Context):
+        context.render_context.dicts[0]["cmspage_icons"] = icons
+
+
+@contextmanager
+def separate_icons(context):
+    """
+    Render icons with a separate state, so that the markup rendered within defines every
+    symbol it uses, for markup that is reused elsewhere (such as a cached fragment).
+    Yields the separate state; see `add_icons_in_use()` to merge it afterwards.
+    """
+    outer = icons_in_use(context)
+    inner = {}
+    _set_icons_in_use(context, inner)
+    try:
+        yield inner
+    finally:
+        _set_icons_in_use(context, outer)
+
+
+def add_icons_in_use(context, icons: dict):
+    """Record the icons (and symbols) rendered in separate markup as in use for this request"""
+    if (in_use := icons_in_use(context)) is not None:
+        for key, markup in icons.items():
+            in_use.setdefault(key, markup)
+
+
+def _include_icon(context, icon: str) -> str:
+    icon_template = get_template(icon)
+    if isinstance(context, Context) and isinstance(icon_template.template, Template):
+        return icon_template.template.render(context)
+    return icon_template.render(context.flatten() if isinstance(context, Context) else context)
+
+
+def render_icon(context, icon: str, css_class: str | None = None) -> SafeString:
+    """
+    Render an icon as a reference to its sprite symbol, adding the symbol itself on the
+    first use in the request, or by including the icon template if it is not in the sprite
+    """
+    if not icon:
+        return mark_safe("")
+    in_use = icons_in_use(context)
+    key = (icon, css_class)
+    if in_use is not None and (markup := in_use.get(key)) is not None:
+        return markup
+
+    if (symbol := icon_sprite().get(symbol_id := icon_id(icon))) is None:
+        markup = first_use = mark_safe(_include_icon(context, icon))
+    else:
+        viewbox, symbol_markup = symbol
+        css_classes = f"cmspage-icon {css_class}" if css_class else "cmspage-icon"
+        template = '<svg class="{}"{} aria-hidden="true">{}<use href="#{}"></use></svg>'
+        viewbox = format_html(' viewBox="{}"', viewbox) if viewbox else ""
+        markup = format_html(template, css_classes, viewbox, "", symbol_id)
+        # The symbol is defined once per request, whichever css class it is first used with
+        if in_use is not None and in_use.get(symbol_id):
+            first_use = markup
+        else:
+            first_use = format_html(template, css_classes, viewbox, mark_safe(symbol_markup), symbol_id)
+    if in_use is not None:
+        in_use[key] = markup
+        in_use[symbol_id] = True
+    return first_use
+
+
+@receiver(setting_changed)
+def _reset_icon_sprite(setting, **kwargs):
+    if setting in (CMSPAGE_ICON_SPRITE, "TEMPLATES"):
+        icon_sprite.cache_clear()
@@ -0,0 +1,68 @@
+"""
+Management command to record the dependencies of every live CMS page.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from wagtail.models import Page
+
+from cmspage.dependencies import record_dependencies
+from cmspage.models.cms_page import AbstractCMSPage
+
+
+def record_chunk(page_ids: list) -> int:
+    """Record the dependencies of a chunk of pages, returning the number of pages"""
+    for page in Page.objects.filter(pk__in=page_ids).specific():
+        record_dependencies(page)
+    return len(page_ids)
+
+
+def record_chunk_in_thread(page_ids: list) -> int:
+    try:
+        return record_chunk(page_ids)
+    finally:
+        # Close the connections opened by this worker thread
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Record the objects every live CMS page depends on, for targeted cache invalidation"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=200,
+            help="Number of pages recorded in each chunk (default 200)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of chunks recorded in parallel (default 4, 1 records them without worker threads)",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size, workers = options["chunk_size"], options["workers"]
+        if chunk_size < 1 or workers < 1:
+            raise CommandError("--chunk-size and --workers must be at least 1")
+
+        page_ids = list(Page.objects.live().type(AbstractCMSPage).order_by("pk").values_list("pk", flat=True))
+        chunks = [page_ids[start : start + chunk_size] for start in range(0, len(page_ids), chunk_size)]
+
+        if workers == 1:
+            recorded = self.report(map(record_chunk, chunks), len(page_ids))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                recorded = self.report(executor.map(record_chunk_in_thread, chunks), len(page_ids))
+
+        self.stdout.write(self.style.SUCCESS(f"Recorded the dependencies of {recorded} page(s)"))
+
+    def report(self, results, total: int) -> int:
+        recorded = 0
+        for count in results:
+            recorded += count
+            self.stdout.write(f"Recorded dependencies for {recorded} of {total} page(s)")
+        return recorded
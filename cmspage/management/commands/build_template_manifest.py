@@ -0,0 +1,54 @@
+"""
+Management command to build the template resolution manifest.
+"""
+
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from cmspage.mixins import CMSPAGE_TEMPLATE_MANIFEST, CMSTemplateMixin
+from cmspage.template_manifest import build_manifest, read_manifest, write_manifest
+
+
+class Command(BaseCommand):
+    help = "Resolve all page and include templates and write them to the template manifest"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="Manifest file to write (defaults to the CMSPAGE_TEMPLATE_MANIFEST setting)",
+        )
+        parser.add_argument(
+            "--styles",
+            help="Comma or space separated template styles to build for (defaults to CMSPAGE_TEMPLATE_STYLES)",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Do not write the manifest, fail if the existing manifest is out of date",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"] or getattr(settings, CMSPAGE_TEMPLATE_MANIFEST, None)
+        if not output:
+            raise CommandError(f"No manifest file given: use --output or set {CMSPAGE_TEMPLATE_MANIFEST}")
+
+        styles = CMSTemplateMixin.to_list(options["styles"]) if options["styles"] is not None else None
+        manifest = build_manifest(styles)
+
+        missing = sorted(path for path, template_name in manifest["templates"].items() if template_name is None)
+        for template_path in missing:
+            self.stdout.write(self.style.WARNING(f"No template found for {template_path}"))
+
+        if options["check"]:
+            existing = read_manifest(output)
+            if existing is None or json.dumps(existing, sort_keys=True) != json.dumps(manifest, sort_keys=True):
+                raise CommandError(f"Template manifest {output} is out of date")
+            self.stdout.write(self.style.SUCCESS(f"Template manifest {output} is up to date"))
+            return
+
+        write_manifest(manifest, output)
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {len(manifest['templates'])} template(s) to manifest {output}")
+        )
@@ -0,0 +1,256 @@
+"""
+Management command to export the live CMS pages of every site as static HTML.
+
+Each page is rendered as an anonymous visitor would see it, through the project's URL
+configuration, and written to `<output>/<site>/<path>/index.html`, alongside a copy of the
+static files. Pages are rendered in chunks by a pool of worker processes.
+
+Exports are incremental: the fingerprint of each exported page (its live revision, its URL
+and the versions of the objects it depends on, see cmspage.versions) is kept in the export
+state file, and only pages whose fingerprint changed are rendered again. A page that fails
+to render keeps its previous export until it renders again. Pages no longer live (or
+public) are removed. The versions are kept in the version cache, which must be
+shared with the site's processes for changes there to be seen: with a cache local to each
+process, every page is rendered on every export.
+"""
+
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import django
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from wagtail.models import Page, Site
+
+from cmspage.models.cms_page import CMSPageBase
+from cmspage.page_cache import page_cache_tags
+from cmspage.versions import get_versions
+
+STATE_FILE = ".cmspage-export.json"
+STATIC_IGNORE_PATTERNS = ["CVS", ".*", "*~"]
+
+
+def site_directory(site: Site) -> str:
+    """The directory a site's pages are exported to"""
+    return site.hostname if site.port in (80, 443) else f"{site.hostname}-{site.port}"
+
+
+def page_file(url_path: str) -> str:
+    """The file, relative to its site's directory, a page at a URL path is exported to"""
+    return str(Path(url_path.strip("/"), "index.html"))
+
+
+def page_fingerprint(page, url: str) -> str | None:
+    """Return the fingerprint of the page as exported, or None if it cannot be known"""
+    versions = get_versions(*page_cache_tags(page))
+    if None in versions.values():
+        return None
+    return sha256("\n".join([str(page.live_revision_id), url, *versions.values()]).encode()).hexdigest()
+
+
+def write_file(path: Path, content: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_bytes(content)
+    temporary.replace(path)
+
+
+def export_chunk(output: str, tasks: list) -> list:
+    """
+    Render and write a chunk of pages, each task a (page id, host, port, URL path, file)
+    tuple, returning a (page id, error or None) pair for each
+    """
+    results = []
+    for page_id, host, port, url_path, file in tasks:
+        client = Client(HTTP_HOST=host, SERVER_PORT=str(port), secure=port == 443, raise_request_exception=False)
+        response = client.get(url_path)
+        if response.status_code != 200 or response.streaming:
+            results.append((page_id, f"{url_path} returned {response.status_code}"))
+            continue
+        write_file(Path(output, file), response.content)
+        results.append((page_id, None))
+    return results
+
+
+def export_chunk_in_process(output: str, tasks: list) -> list:
+    try:
+        return export_chunk(output, tasks)
+    finally:
+        connections.close_all()
+
+
+def static_files():
+    """Yield the (relative path, source file) of each static file"""
+    if settings.STATIC_ROOT and os.path.isdir(settings.STATIC_ROOT):
+        # Collected, with the names the static tag resolves to
+        root = Path(settings.STATIC_ROOT)
+        for source in root.rglob("*"):
+            if source.is_file():
+                yield str(source.relative_to(root)), source
+        return
+    found = set()
+    for finder in get_finders():
+        for path, storage in finder.list(STATIC_IGNORE_PATTERNS):
+            if path not in found:
+                found.add(path)
+                yield path, Path(storage.path(path))
+
+
+def copy_static(directory: Path) -> int:
+    """Copy the static files that changed to the directory, returning the number copied"""
+    copied = 0
+    for path, source in static_files():
+        target = directory / path
+        stat = source.stat()
+        if target.exists() and (target.stat().st_size, target.stat().st_mtime) == (stat.st_size, stat.st_mtime):
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, target)
+        copied += 1
+    return copied
+
+
+class Command(BaseCommand):
+    help = "Export the live CMS pages of every site, with the static files, as static HTML"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Directory the sites are exported to")
+        parser.add_argument(
+            "--site-id",
+            type=int,
+            help="Export the site with this ID only",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Render every page, not only those that changed since the last export",
+        )
+        parser.add_argument(
+            "--no-static",
+            action="store_true",
+            help="Do not copy the static files",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=50,
+            help="Number of pages rendered in each chunk (default 50)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of chunks rendered in parallel (default 4, 1 renders them without worker processes)",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size, workers = options["chunk_size"], options["workers"]
+        if chunk_size < 1 or workers < 1:
+            raise CommandError("--chunk-size and --workers must be at least 1")
+
+        output = Path(options["output"]).resolve()
+        output.mkdir(parents=True, exist_ok=True)
+        state_file = output / STATE_FILE
+        state = self.read_state(state_file)
+
+        sites = Site.objects.all()
+        if options["site_id"]:
+            sites = sites.filter(pk=options["site_id"])
+        sites = {site.pk: site for site in sites}
+        if not sites:
+            raise CommandError("No sites to export")
+
+        # The pages of sites not exported are kept as they are
+        directories = {site_directory(site) for site in sites.values()}
+        exported = {pk: entry for pk, entry in state.items() if Path(entry["file"]).parts[0] not in directories}
+        tasks, unchanged = {}, 0
+        for page in Page.objects.live().public().type(CMSPageBase).order_by("path"):
+            site_id, root_url, url_path = page.get_url_parts() or (None, None, None)
+            if (site := sites.get(site_id)) is None or url_path is None:
+                continue
+            file = str(Path(site_directory(site), page_file(url_path)))
+            fingerprint = page_fingerprint(page, f"{root_url}{url_path}")
+            entry = {"file": file, "fingerprint": fingerprint}
+            current = fingerprint is not None and state.get(str(page.pk)) == entry
+            if current and not options["full"] and (output / file).exists():
+                exported[str(page.pk)] = entry
+                unchanged += 1
+                continue
+            tasks[page.pk] = (entry, (page.pk, site.hostname, site.port, url_path, file))
+
+        errors = self.render(str(output), [task for _, task in tasks.values()], chunk_size, workers)
+        for page_id, (entry, _) in tasks.items():
+            if page_id not in errors:
+                exported[str(page_id)] = entry
+            elif str(page_id) in state:
+                # The page's previous export is kept, and as its fingerprint no longer
+                # matches, the page is rendered again on the next export
+                exported[str(page_id)] = state[str(page_id)]
+
+        removed = self.remove_stale(output, state, exported)
+        self.write_state(state_file, exported)
+
+        copied = 0
+        static_path = urlsplit(settings.STATIC_URL or "")
+        if not options["no_static"] and not static_path.netloc:
+            for site in sites.values():
+                copied += copy_static(output / site_directory(site) / static_path.path.strip("/"))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {len(tasks) - len(errors)} page(s) to {output}: {unchanged} unchanged, {removed} removed,"
+                f" {len(errors)} failed, {copied} static file(s) copied"
+            )
+        )
+
+    def render(self, output: str, tasks: list, chunk_size: int, workers: int) -> dict:
+        """Render the pages, returning the errors by page id"""
+        chunks = [tasks[start : start + chunk_size] for start in range(0, len(tasks), chunk_size)]
+        if workers == 1 or len(chunks) <= 1:
+            return self.report((export_chunk(output, chunk) for chunk in chunks), len(tasks))
+        # Worker processes must not share the connections of this one
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            results = executor.map(export_chunk_in_process, [output] * len(chunks), chunks)
+            return self.report(results, len(tasks))
+
+    def report(self, results, total: int) -> dict:
+        rendered, errors = 0, {}
+        for chunk in results:
+            for page_id, error in chunk:
+                rendered += 1
+                if error is not None:
+                    errors[page_id] = error
+                    self.stdout.write(self.style.WARNING(f"Could not export page {page_id}: {error}"))
+            self.stdout.write(f"Rendered {rendered} of {total} page(s)")
+        return errors
+
+    @staticmethod
+    def remove_stale(output: Path, state: dict, exported: dict) -> int:
+        """Remove the files of pages exported before that are no longer, or elsewhere"""
+        files = {entry["file"] for entry in exported.values()}
+        removed = 0
+        for entry in state.values():
+            if entry["file"] not in files and (path := output / entry["file"]).exists():
+                path.unlink()
+                removed += 1
+        return removed
+
+    @staticmethod
+    def read_state(state_file: Path) -> dict:
+        try:
+            return json.loads(state_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def write_state(state_file: Path, exported: dict):
+        write_file(state_file, json.dumps(exported, indent=2, sort_keys=True).encode())
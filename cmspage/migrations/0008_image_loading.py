@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:33
+
+import wagtail.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmspage', '0007_alter_cmsfooterpage_footer_alter_cmsformpage_body_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cmsfooterpage',
+            name='footer',
+            field=wagtail.fields.StreamField([('info', 19), ('copy', 22), ('links', 26), ('social', 33), ('new_section', 35)], block_lookup={0: ('wagtail.blocks.CharBlock', (), {'blank': True, 'max_length': 60, 'null': True, 'required': False}), 1: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Use the cursive font on title?', 'required': False}), 2: ('wagtail.blocks.RichTextBlock', (), {'blank': True, 'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'required': False}), 3: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('text-start', 'Left'), ('text-center', 'Center'), ('text-end', 'Right')], 'help_text': 'Text alignment', 'required': False}), 4: ('wagtail.images.blocks.ImageChooserBlock', (), {'blank': True, 'null': True}), 5: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('landscape', 'Landscape'), ('portrait', 'Portrait'), ('square', 'Square'), ('extrawide', 'Extra Wide')], 'help_text': 'Image orientation'}), 6: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('tiny', 'Tiny'), ('small', 'Small'), ('medium', 'Medium'), ('large', 'Large'), ('full_width', 'Full Width'), ('original', 'Original')], 'help_text': 'Image size'}), 7: ('wagtail.blocks.ChoiceBlock', [], {'choices': [(0, 'None'), (25, 'Small'), (50, 'Medium'), (75, 'Large'), (100, 'Full')], 'help_text': 'Crop percentage'}), 8: ('wagtail.blocks.ChoiceBlock', [], {'choices': [(-1, 'None'), (0, '0'), (1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5')], 'help_text': 'Image rounding'}), 9: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Image responsive', 'required': False}), 10: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('auto', 'Automatic'), ('eager', 'Eager'), ('lazy', 'Lazy'), ('priority', 'Priority')], 'help_text': 'Image loading', 'required': False}), 11: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('left', 'Left'), ('right', 'Right'), ('center', 'Center'), ('full', 'Full')], 'help_text': 'Image left - text right, or image right - text left.'}), 12: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'Palette'}), 13: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('p-0', 'None'), ('p-1 p-sm-2', 'Small (responsive)'), ('p-2 p-sm-3', 'Medium (responsive)'), ('p-3 p-sm-4', 'Large (responsive)'), ('p-4 p-sm-5', 'Larger (responsive)'), ('p-5 p-sm-6', 'Largest (responsive)')], 'help_text': 'Padding around the block'}), 14: ('wagtail.blocks.CharBlock', (), {'label': 'Button Title (use hyphen for special link button)', 'max_length': 255, 'required': False}), 15: ('wagtail.blocks.PageChooserBlock', (), {'label': 'Page link', 'required': False}), 16: ('wagtail.documents.blocks.DocumentChooserBlock', (), {'label': 'Document link', 'required': False}), 17: ('wagtail.blocks.CharBlock', (), {'label': 'Extra link', 'max_length': 255, 'required': False}), 18: ('wagtail.blocks.StructBlock', [[('button_title', 14), ('page_link', 15), ('doc_link', 16), ('extra_link', 17)]], {}), 19: ('wagtail.blocks.StructBlock', [[('title', 0), ('cursive', 1), ('text', 2), ('justify', 3), ('image', 4), ('orientation', 5), ('size', 6), ('crop', 7), ('rounded', 8), ('responsive', 9), ('loading', 10), ('image_alignment', 11), ('palette', 12), ('inset', 13), ('link', 18)]], {}), 20: ('wagtail.blocks.CharBlock', (), {'help_text': 'Copyright notice to display in the footer'}), 21: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'Section palette'}), 22: ('wagtail.blocks.StructBlock', [[('copyright', 20), ('palette', 21), ('inset', 13)]], {'classnames': 'text-center text-muted text-small', 'label': 'Copyright'}), 23: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'Cards palette'}), 24: ('wagtail.blocks.CharBlock', (), {'blank': True, 'help_text': 'Bold title text for this set of links (len=255)', 'label': 'links Title', 'max_length': 255, 'null': True, 'required': False}), 25: ('wagtail.blocks.ListBlock', (18,), {}), 26: ('wagtail.blocks.StructBlock', [[('palette', 23), ('inset', 13), ('title', 24), ('links', 25)]], {}), 27: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('discord', 'Discord'), ('envelope', 'Email'), ('facebook', 'Facebook'), ('github', 'GitHub'), ('instagram', 'Instagram'), ('linkedin', 'LinkedIn'), ('medium', 'Medium'), ('facebook-messenger', 'Messenger'), ('pinterest', 'Pinterest'), ('reddit', 'Reddit'), ('rss', 'RSS'), ('skype', 'Skype'), ('slack', 'Slack'), ('snapchat', 'Snapchat'), ('telegram', 'Telegram'), ('tiktok', 'TikTok'), ('tumblr', 'Tumblr'), ('twitch', 'Twitch'), ('twitter', 'Twitter'), ('vimeo', 'Vimeo'), ('whatsapp', 'WhatsApp'), ('X', 'X'), ('youtube', 'YouTube'), ('zoom', 'Zoom')], 'help_text': 'Social media icon'}), 28: ('wagtail.blocks.CharBlock', (), {'help_text': 'Social media name', 'max_length': 120}), 29: ('wagtail.blocks.RegexBlock', ('^(?:[a-zA-Z][a-zA-Z0-9+.-]*:/{0,3}[a-zA-Z0-9.-]+(?:/?|[/?]\\S*)|mailto:[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,})$',), {'help_text': 'Social media URL'}), 30: ('wagtail.blocks.StructBlock', [[('icon', 27), ('name', 28), ('url', 29)]], {}), 31: ('wagtail.blocks.ListBlock', (30,), {}), 32: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'LineBlock palette'}), 33: ('wagtail.blocks.StructBlock', [[('links', 31), ('palette', 32), ('inset', 13)]], {}), 34: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('height-0', 'None'), ('height-1 py-1', 'Small'), ('height-2 py-2', 'Medium'), ('height-3 py-3', 'Large'), ('height-4 py-4', 'Larger'), ('height-5 py-5', 'Largest')], 'help_text': 'Vertical space height'}), 35: ('wagtail.blocks.StructBlock', [[('height', 34), ('palette', 12), ('inset', 13)]], {})}),
+        ),
+        migrations.AlterField(
+            model_name='cmsformpage',
+            name='body',
+            field=wagtail.fields.StreamField([('form', 28), ('hero', 38), ('title', 42), ('cards', 58), ('image_and_text', 66), ('cta', 72), ('richtext', 75), ('video', 76), ('large_image', 77), ('table', 78), ('carousel', 86), ('new_section', 88), ('lines', 97)], blank=True, block_lookup={0: ('wagtail.blocks.CharBlock', (), {'help_text': 'Form title displayed at the top', 'required': True}), 1: ('wagtail.blocks.TextBlock', (), {'help_text': "Description of the form's purpose", 'required': False}), 2: ('wagtail.blocks.CharBlock', (), {'help_text': 'URL to which the form data is to be submitted', 'required': True}), 3: ('wagtail.blocks.CharBlock', (), {'default': 'Submit', 'required': True}), 4: ('wagtail.blocks.CharBlock', (), {'default': 'Form submitted successfully', 'required': True}), 5: ('wagtail.blocks.CharBlock', (), {'help_text': 'The label for this field', 'required': True}), 6: ('wagtail.blocks.CharBlock', (), {'help_text': 'Optional help text for this field', 'required': False}), 7: ('wagtail.blocks.BooleanBlock', (), {'help_text': 'Is this field required?', 'required': False}), 8: ('wagtail.blocks.CharBlock', (), {'required': False}), 9: ('wagtail.blocks.StructBlock', [[('label', 5), ('help_text', 6), ('required', 7), ('default_value', 8)]], {}), 10: ('wagtail.blocks.TextBlock', (), {'required': False}), 11: ('wagtail.blocks.IntegerBlock', (), {'default': 3, 'required': False}), 12: ('wagtail.blocks.StructBlock', [[('label', 5), ('help_text', 6), ('required', 7), ('default_value', 10), ('rows', 11)]], {}), 13: ('wagtail.blocks.EmailBlock', (), {'required': False}), 14: ('wagtail.blocks.StructBlock', [[('label', 5), ('help_text', 6), ('required', 7), ('default_value', 13)]], {}), 15: ('wagtail.blocks.IntegerBlock', (), {'required': False}), 16: ('wagtail.blocks.StructBlock', [[('label', 5), ('help_text', 6), ('required', 7), ('default_value', 15), ('min_value', 15), ('max_value', 15)]], {}), 17: ('wagtail.blocks.DecimalBlock', (), {'required': False}), 18: ('wagtail.blocks.IntegerBlock', (), {'default': 2, 'required': False}), 19: ('wagtail.blocks.StructBlock', [[('label', 5), ('help_text', 6), ('required', 7), ('default_value', 17), ('min_value', 17), ('max_value', 17), ('decimal_places', 18)]], {}), 20: ('wagtail.blocks.CharBlock', (), {'help_text': 'Display text for this option', 'required': True}), 21: ('wagtail.blocks.CharBlock', (), {'help_text': 'Value when this option is selected', 'required': True}), 22: ('wagtail.blocks.StructBlock', [[('label', 20), ('value', 21)]], {}), 23: ('wagtail.blocks.ListBlock', (22,), {}), 24: ('wagtail.blocks.CharBlock', (), {'help_text': 'Value must match one of the options', 'required': False}), 25: ('wagtail.blocks.StructBlock', [[('label', 5), ('help_text', 6), ('required', 7), ('options', 23), ('default_value', 24)]], {}), 26: ('wagtail.blocks.StructBlock', [[('label', 5), ('help_text', 6), ('required', 7), ('options', 23)]], {}), 27: ('wagtail.blocks.StreamBlock', [[('text_field', 9), ('textarea_field', 12), ('email_field', 14), ('integer_field', 16), ('decimal_field', 19), ('select_field', 25), ('multiselect_field', 26)]], {}), 28: ('wagtail.blocks.StructBlock', [[('form_title', 0), ('form_description', 1), ('submit_url', 2), ('submit_button_text', 3), ('success_message', 4), ('fields', 27)]], {}), 29: ('wagtail.images.blocks.ImageChooserBlock', (), {}), 30: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('landscape', 'Landscape'), ('portrait', 'Portrait'), ('square', 'Square'), ('extrawide', 'Extra Wide')], 'help_text': 'Image orientation'}), 31: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('tiny', 'Tiny'), ('small', 'Small'), ('medium', 'Medium'), ('large', 'Large'), ('full_width', 'Full Width'), ('original', 'Original')], 'help_text': 'Image size'}), 32: ('wagtail.blocks.ChoiceBlock', [], {'choices': [(0, 'None'), (25, 'Small'), (50, 'Medium'), (75, 'Large'), (100, 'Full')], 'help_text': 'Crop percentage'}), 33: ('wagtail.blocks.ChoiceBlock', [], {'choices': [(-1, 'None'), (0, '0'), (1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5')], 'help_text': 'Image rounding'}), 34: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Image responsive', 'required': False}), 35: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('auto', 'Automatic'), ('eager', 'Eager'), ('lazy', 'Lazy'), ('priority', 'Priority')], 'help_text': 'Image loading', 'required': False}), 36: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'Palette'}), 37: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('p-0', 'None'), ('p-1 p-sm-2', 'Small (responsive)'), ('p-2 p-sm-3', 'Medium (responsive)'), ('p-3 p-sm-4', 'Large (responsive)'), ('p-4 p-sm-5', 'Larger (responsive)'), ('p-5 p-sm-6', 'Largest (responsive)')], 'help_text': 'Padding around the block'}), 38: ('wagtail.blocks.StructBlock', [[('image', 29), ('orientation', 30), ('size', 31), ('crop', 32), ('rounded', 33), ('responsive', 34), ('loading', 35), ('palette', 36), ('inset', 37)]], {'label': 'Hero Image', 'max_num': 1}), 39: ('wagtail.blocks.CharBlock', (), {'help_text': 'Title text to display'}), 40: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Use the cursive font on title?', 'required': False}), 41: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('text-start', 'Left'), ('text-center', 'Center'), ('text-end', 'Right')], 'help_text': 'Title text alignment', 'required': False}), 42: ('wagtail.blocks.StructBlock', [[('text', 39), ('cursive', 40), ('justify', 41), ('palette', 36), ('inset', 37)]], {'label': 'Title', 'max_num': 1}), 43: ('wagtail.blocks.CharBlock', (), {'blank': True, 'help_text': 'Bold title text for this card (len=255)', 'label': 'Card Title', 'max_length': 255, 'null': True, 'required': False}), 44: ('wagtail.blocks.RichTextBlock', (), {'blank': True, 'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Optional text for this card', 'label': 'Card Text', 'null': True, 'required': False}), 45: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('text-start', 'Left'), ('text-center', 'Center'), ('text-end', 'Right')], 'help_text': 'Text alignment', 'required': False}), 46: ('wagtail.images.blocks.ImageChooserBlock', (), {'blank': True, 'label': 'Card Image', 'null': True, 'required': False}), 47: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'Card palette'}), 48: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('p-0', 'None'), ('p-1 p-sm-2', 'Small (responsive)'), ('p-2 p-sm-3', 'Medium (responsive)'), ('p-3 p-sm-4', 'Large (responsive)'), ('p-4 p-sm-5', 'Larger (responsive)'), ('p-5 p-sm-6', 'Largest (responsive)')], 'help_text': 'Padding around the card'}), 49: ('wagtail.blocks.CharBlock', (), {'label': 'Button Title (use hyphen for special link button)', 'max_length': 255, 'required': False}), 50: ('wagtail.blocks.PageChooserBlock', (), {'label': 'Page link', 'required': False}), 51: ('wagtail.documents.blocks.DocumentChooserBlock', (), {'label': 'Document link', 'required': False}), 52: ('wagtail.blocks.CharBlock', (), {'label': 'Extra link', 'max_length': 255, 'required': False}), 53: ('wagtail.blocks.StructBlock', [[('button_title', 49), ('page_link', 50), ('doc_link', 51), ('extra_link', 52)]], {'help_text': 'Enter a page or document, or an external link', 'label': 'Card Link', 'required': False}), 54: ('wagtail.blocks.StructBlock', [[('title', 43), ('text', 44), ('justify', 45), ('image', 46), ('orientation', 30), ('size', 31), ('crop', 32), ('responsive', 34), ('palette', 47), ('inset', 48), ('link', 53)]], {}), 55: ('wagtail.blocks.ListBlock', (54,), {}), 56: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Use the cursive font in titles?', 'required': False}), 57: ('wagtail.blocks.ChoiceBlock', [], {'choices': [(-1, 'None'), (0, '0'), (1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5')], 'help_text': 'Image rounding', 'required': False}), 58: ('wagtail.blocks.StructBlock', [[('cards', 55), ('cursive', 56), ('rounded', 57), ('loading', 35), ('palette', 36), ('inset', 37)]], {}), 59: ('wagtail.blocks.CharBlock', (), {'blank': True, 'max_length': 60, 'null': True, 'required': False}), 60: ('wagtail.blocks.RichTextBlock', (), {'blank': True, 'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'required': False}), 61: ('wagtail.blocks.BooleanBlock', (), {'blank': True, 'default': False, 'help_text': 'Overlay text on image', 'required': False}), 62: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('text-start', 'Left'), ('text-center', 'Center'), ('text-end', 'Right')], 'help_text': 'Block text alignment', 'required': False}), 63: ('wagtail.images.blocks.ImageChooserBlock', (), {'blank': True, 'null': True}), 64: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('left', 'Left'), ('right', 'Right'), ('center', 'Center'), ('full', 'Full')], 'help_text': 'Image left - text right, or image right - text left.'}), 65: ('wagtail.blocks.StructBlock', [[('button_title', 49), ('page_link', 50), ('doc_link', 51), ('extra_link', 52)]], {}), 66: ('wagtail.blocks.StructBlock', [[('title', 59), ('cursive', 40), ('text', 60), ('overlay', 61), ('justify', 62), ('image', 63), ('image_alignment', 64), ('orientation', 30), ('size', 31), ('crop', 32), ('rounded', 33), ('responsive', 34), ('loading', 35), ('palette', 36), ('inset', 37), ('link', 65)]], {}), 67: ('wagtail.blocks.CharBlock', (), {'blank': True, 'help_text': 'Max length of 60 characters, optional', 'max_length': 60, 'null': True, 'required': False}), 68: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Use the cursive font?', 'required': False}), 69: ('wagtail.blocks.RichTextBlock', (), {'blank': True, 'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Call to action text, optional (max=200)', 'required': False}), 70: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'CTA palette', 'label': 'CTA Button palette'}), 71: ('wagtail.blocks.StructBlock', [[('button_title', 49), ('page_link', 50), ('doc_link', 51), ('extra_link', 52)]], {'blank': True, 'null': True, 'required': False}), 72: ('wagtail.blocks.StructBlock', [[('title', 67), ('cursive', 68), ('text', 69), ('justify', 45), ('palette', 70), ('inset', 37), ('link', 71)]], {}), 73: ('wagtail.blocks.CharBlock', (), {'blank': True, 'help_text': 'Display title, optional (max len=120)', 'max_length': 120, 'null': True, 'required': False}), 74: ('wagtail.blocks.RichTextBlock', (), {'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Rich text block, required'}), 75: ('wagtail.blocks.StructBlock', [[('title', 73), ('cursive', 40), ('content', 74), ('justify', 45), ('palette', 36), ('inset', 37)]], {}), 76: ('wagtail.embeds.blocks.EmbedBlock', (), {'help_text': 'Video URL', 'max_with': 1200}), 77: ('wagtail.blocks.StructBlock', [[('image', 63), ('orientation', 30), ('size', 31), ('crop', 32), ('rounded', 33), ('responsive', 34), ('loading', 35), ('palette', 36), ('inset', 37), ('link', 65)]], {}), 78: ('cmspage.blocks.custom_table.CustomTableBlock', (), {}), 79: ('wagtail.blocks.CharBlock', (), {'help_text': 'Display title, optional (max len=120)', 'max_length': 120, 'required': False}), 80: ('wagtail.blocks.RichTextBlock', (), {'features': ['bold', 'italic', 'ol', 'ul', 'usefont'], 'help_text': 'Short description', 'max_length': 256, 'required': False}), 81: ('wagtail.blocks.CharBlock', (), {'help_text': 'Attribution, optional (max len=80)', 'max_length': 80, 'required': False}), 82: ('wagtail.blocks.StructBlock', [[('carousel_image', 29), ('carousel_title', 79), ('carousel_justify', 45), ('carousel_content', 80), ('carousel_attribution', 81)]], {}), 83: ('wagtail.blocks.ListBlock', (82,), {}), 84: ('wagtail.blocks.IntegerBlock', (), {'default': 12000, 'help_text': 'Keep visible for time in milliseconds'}), 85: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('auto', 'Automatic'), ('eager', 'Eager'), ('lazy', 'Lazy'), ('priority', 'Priority')], 'help_text': 'First slide image loading (other slides load lazily)', 'required': False}), 86: ('wagtail.blocks.StructBlock', [[('carousel', 83), ('carousel_interval', 84), ('palette', 36), ('inset', 37), ('loading', 85)]], {}), 87: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('height-0', 'None'), ('height-1 py-1', 'Small'), ('height-2 py-2', 'Medium'), ('height-3 py-3', 'Large'), ('height-4 py-4', 'Larger'), ('height-5 py-5', 'Largest')], 'help_text': 'Vertical space height'}), 88: ('wagtail.blocks.StructBlock', [[('height', 87), ('palette', 36), ('inset', 37)]], {}), 89: ('wagtail.blocks.CharBlock', (), {'help_text': 'Lines Title (optional)', 'required': False}), 90: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Add number to lines', 'required': False}), 91: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Dropdown text (accordian)', 'required': False}), 92: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'LineBlock palette'}), 93: ('wagtail.blocks.CharBlock', (), {'help_text': 'Line text (max len=120)', 'max_length': 120}), 94: ('wagtail.blocks.RichTextBlock', (), {'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Dropdown text block, optional', 'required': False}), 95: ('wagtail.blocks.StructBlock', [[('heading', 93), ('content', 94)]], {}), 96: ('wagtail.blocks.ListBlock', (95,), {}), 97: ('wagtail.blocks.StructBlock', [[('subtitle', 89), ('number', 90), ('dropdown', 91), ('palette', 92), ('inset', 37), ('lines', 96)]], {})}, null=True),
+        ),
+        migrations.AlterField(
+            model_name='cmshomepage',
+            name='body',
+            field=wagtail.fields.StreamField([('hero', 9), ('title', 13), ('cards', 29), ('image_and_text', 37), ('cta', 43), ('richtext', 46), ('video', 47), ('large_image', 48), ('table', 49), ('carousel', 57), ('new_section', 59), ('lines', 68)], blank=True, block_lookup={0: ('wagtail.images.blocks.ImageChooserBlock', (), {}), 1: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('landscape', 'Landscape'), ('portrait', 'Portrait'), ('square', 'Square'), ('extrawide', 'Extra Wide')], 'help_text': 'Image orientation'}), 2: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('tiny', 'Tiny'), ('small', 'Small'), ('medium', 'Medium'), ('large', 'Large'), ('full_width', 'Full Width'), ('original', 'Original')], 'help_text': 'Image size'}), 3: ('wagtail.blocks.ChoiceBlock', [], {'choices': [(0, 'None'), (25, 'Small'), (50, 'Medium'), (75, 'Large'), (100, 'Full')], 'help_text': 'Crop percentage'}), 4: ('wagtail.blocks.ChoiceBlock', [], {'choices': [(-1, 'None'), (0, '0'), (1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5')], 'help_text': 'Image rounding'}), 5: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Image responsive', 'required': False}), 6: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('auto', 'Automatic'), ('eager', 'Eager'), ('lazy', 'Lazy'), ('priority', 'Priority')], 'help_text': 'Image loading', 'required': False}), 7: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'Palette'}), 8: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('p-0', 'None'), ('p-1 p-sm-2', 'Small (responsive)'), ('p-2 p-sm-3', 'Medium (responsive)'), ('p-3 p-sm-4', 'Large (responsive)'), ('p-4 p-sm-5', 'Larger (responsive)'), ('p-5 p-sm-6', 'Largest (responsive)')], 'help_text': 'Padding around the block'}), 9: ('wagtail.blocks.StructBlock', [[('image', 0), ('orientation', 1), ('size', 2), ('crop', 3), ('rounded', 4), ('responsive', 5), ('loading', 6), ('palette', 7), ('inset', 8)]], {'label': 'Hero Image', 'max_num': 1}), 10: ('wagtail.blocks.CharBlock', (), {'help_text': 'Title text to display'}), 11: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Use the cursive font on title?', 'required': False}), 12: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('text-start', 'Left'), ('text-center', 'Center'), ('text-end', 'Right')], 'help_text': 'Title text alignment', 'required': False}), 13: ('wagtail.blocks.StructBlock', [[('text', 10), ('cursive', 11), ('justify', 12), ('palette', 7), ('inset', 8)]], {'label': 'Title', 'max_num': 1}), 14: ('wagtail.blocks.CharBlock', (), {'blank': True, 'help_text': 'Bold title text for this card (len=255)', 'label': 'Card Title', 'max_length': 255, 'null': True, 'required': False}), 15: ('wagtail.blocks.RichTextBlock', (), {'blank': True, 'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Optional text for this card', 'label': 'Card Text', 'null': True, 'required': False}), 16: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('text-start', 'Left'), ('text-center', 'Center'), ('text-end', 'Right')], 'help_text': 'Text alignment', 'required': False}), 17: ('wagtail.images.blocks.ImageChooserBlock', (), {'blank': True, 'label': 'Card Image', 'null': True, 'required': False}), 18: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'Card palette'}), 19: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('p-0', 'None'), ('p-1 p-sm-2', 'Small (responsive)'), ('p-2 p-sm-3', 'Medium (responsive)'), ('p-3 p-sm-4', 'Large (responsive)'), ('p-4 p-sm-5', 'Larger (responsive)'), ('p-5 p-sm-6', 'Largest (responsive)')], 'help_text': 'Padding around the card'}), 20: ('wagtail.blocks.CharBlock', (), {'label': 'Button Title (use hyphen for special link button)', 'max_length': 255, 'required': False}), 21: ('wagtail.blocks.PageChooserBlock', (), {'label': 'Page link', 'required': False}), 22: ('wagtail.documents.blocks.DocumentChooserBlock', (), {'label': 'Document link', 'required': False}), 23: ('wagtail.blocks.CharBlock', (), {'label': 'Extra link', 'max_length': 255, 'required': False}), 24: ('wagtail.blocks.StructBlock', [[('button_title', 20), ('page_link', 21), ('doc_link', 22), ('extra_link', 23)]], {'help_text': 'Enter a page or document, or an external link', 'label': 'Card Link', 'required': False}), 25: ('wagtail.blocks.StructBlock', [[('title', 14), ('text', 15), ('justify', 16), ('image', 17), ('orientation', 1), ('size', 2), ('crop', 3), ('responsive', 5), ('palette', 18), ('inset', 19), ('link', 24)]], {}), 26: ('wagtail.blocks.ListBlock', (25,), {}), 27: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Use the cursive font in titles?', 'required': False}), 28: ('wagtail.blocks.ChoiceBlock', [], {'choices': [(-1, 'None'), (0, '0'), (1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5')], 'help_text': 'Image rounding', 'required': False}), 29: ('wagtail.blocks.StructBlock', [[('cards', 26), ('cursive', 27), ('rounded', 28), ('loading', 6), ('palette', 7), ('inset', 8)]], {}), 30: ('wagtail.blocks.CharBlock', (), {'blank': True, 'max_length': 60, 'null': True, 'required': False}), 31: ('wagtail.blocks.RichTextBlock', (), {'blank': True, 'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'required': False}), 32: ('wagtail.blocks.BooleanBlock', (), {'blank': True, 'default': False, 'help_text': 'Overlay text on image', 'required': False}), 33: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('text-start', 'Left'), ('text-center', 'Center'), ('text-end', 'Right')], 'help_text': 'Block text alignment', 'required': False}), 34: ('wagtail.images.blocks.ImageChooserBlock', (), {'blank': True, 'null': True}), 35: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('left', 'Left'), ('right', 'Right'), ('center', 'Center'), ('full', 'Full')], 'help_text': 'Image left - text right, or image right - text left.'}), 36: ('wagtail.blocks.StructBlock', [[('button_title', 20), ('page_link', 21), ('doc_link', 22), ('extra_link', 23)]], {}), 37: ('wagtail.blocks.StructBlock', [[('title', 30), ('cursive', 11), ('text', 31), ('overlay', 32), ('justify', 33), ('image', 34), ('image_alignment', 35), ('orientation', 1), ('size', 2), ('crop', 3), ('rounded', 4), ('responsive', 5), ('loading', 6), ('palette', 7), ('inset', 8), ('link', 36)]], {}), 38: ('wagtail.blocks.CharBlock', (), {'blank': True, 'help_text': 'Max length of 60 characters, optional', 'max_length': 60, 'null': True, 'required': False}), 39: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Use the cursive font?', 'required': False}), 40: ('wagtail.blocks.RichTextBlock', (), {'blank': True, 'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Call to action text, optional (max=200)', 'required': False}), 41: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'CTA palette', 'label': 'CTA Button palette'}), 42: ('wagtail.blocks.StructBlock', [[('button_title', 20), ('page_link', 21), ('doc_link', 22), ('extra_link', 23)]], {'blank': True, 'null': True, 'required': False}), 43: ('wagtail.blocks.StructBlock', [[('title', 38), ('cursive', 39), ('text', 40), ('justify', 16), ('palette', 41), ('inset', 8), ('link', 42)]], {}), 44: ('wagtail.blocks.CharBlock', (), {'blank': True, 'help_text': 'Display title, optional (max len=120)', 'max_length': 120, 'null': True, 'required': False}), 45: ('wagtail.blocks.RichTextBlock', (), {'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Rich text block, required'}), 46: ('wagtail.blocks.StructBlock', [[('title', 44), ('cursive', 11), ('content', 45), ('justify', 16), ('palette', 7), ('inset', 8)]], {}), 47: ('wagtail.embeds.blocks.EmbedBlock', (), {'help_text': 'Video URL', 'max_with': 1200}), 48: ('wagtail.blocks.StructBlock', [[('image', 34), ('orientation', 1), ('size', 2), ('crop', 3), ('rounded', 4), ('responsive', 5), ('loading', 6), ('palette', 7), ('inset', 8), ('link', 36)]], {}), 49: ('cmspage.blocks.custom_table.CustomTableBlock', (), {}), 50: ('wagtail.blocks.CharBlock', (), {'help_text': 'Display title, optional (max len=120)', 'max_length': 120, 'required': False}), 51: ('wagtail.blocks.RichTextBlock', (), {'features': ['bold', 'italic', 'ol', 'ul', 'usefont'], 'help_text': 'Short description', 'max_length': 256, 'required': False}), 52: ('wagtail.blocks.CharBlock', (), {'help_text': 'Attribution, optional (max len=80)', 'max_length': 80, 'required': False}), 53: ('wagtail.blocks.StructBlock', [[('carousel_image', 0), ('carousel_title', 50), ('carousel_justify', 16), ('carousel_content', 51), ('carousel_attribution', 52)]], {}), 54: ('wagtail.blocks.ListBlock', (53,), {}), 55: ('wagtail.blocks.IntegerBlock', (), {'default': 12000, 'help_text': 'Keep visible for time in milliseconds'}), 56: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('auto', 'Automatic'), ('eager', 'Eager'), ('lazy', 'Lazy'), ('priority', 'Priority')], 'help_text': 'First slide image loading (other slides load lazily)', 'required': False}), 57: ('wagtail.blocks.StructBlock', [[('carousel', 54), ('carousel_interval', 55), ('palette', 7), ('inset', 8), ('loading', 56)]], {}), 58: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('height-0', 'None'), ('height-1 py-1', 'Small'), ('height-2 py-2', 'Medium'), ('height-3 py-3', 'Large'), ('height-4 py-4', 'Larger'), ('height-5 py-5', 'Largest')], 'help_text': 'Vertical space height'}), 59: ('wagtail.blocks.StructBlock', [[('height', 58), ('palette', 7), ('inset', 8)]], {}), 60: ('wagtail.blocks.CharBlock', (), {'help_text': 'Lines Title (optional)', 'required': False}), 61: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Add number to lines', 'required': False}), 62: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Dropdown text (accordian)', 'required': False}), 63: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'LineBlock palette'}), 64: ('wagtail.blocks.CharBlock', (), {'help_text': 'Line text (max len=120)', 'max_length': 120}), 65: ('wagtail.blocks.RichTextBlock', (), {'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Dropdown text block, optional', 'required': False}), 66: ('wagtail.blocks.StructBlock', [[('heading', 64), ('content', 65)]], {}), 67: ('wagtail.blocks.ListBlock', (66,), {}), 68: ('wagtail.blocks.StructBlock', [[('subtitle', 60), ('number', 61), ('dropdown', 62), ('palette', 63), ('inset', 8), ('lines', 67)]], {})}, null=True),
+        ),
+        migrations.AlterField(
+            model_name='cmspage',
+            name='body',
+            field=wagtail.fields.StreamField([('hero', 9), ('title', 13), ('cards', 29), ('image_and_text', 37), ('cta', 43), ('richtext', 46), ('video', 47), ('large_image', 48), ('table', 49), ('carousel', 57), ('new_section', 59), ('lines', 68)], blank=True, block_lookup={0: ('wagtail.images.blocks.ImageChooserBlock', (), {}), 1: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('landscape', 'Landscape'), ('portrait', 'Portrait'), ('square', 'Square'), ('extrawide', 'Extra Wide')], 'help_text': 'Image orientation'}), 2: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('tiny', 'Tiny'), ('small', 'Small'), ('medium', 'Medium'), ('large', 'Large'), ('full_width', 'Full Width'), ('original', 'Original')], 'help_text': 'Image size'}), 3: ('wagtail.blocks.ChoiceBlock', [], {'choices': [(0, 'None'), (25, 'Small'), (50, 'Medium'), (75, 'Large'), (100, 'Full')], 'help_text': 'Crop percentage'}), 4: ('wagtail.blocks.ChoiceBlock', [], {'choices': [(-1, 'None'), (0, '0'), (1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5')], 'help_text': 'Image rounding'}), 5: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Image responsive', 'required': False}), 6: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('auto', 'Automatic'), ('eager', 'Eager'), ('lazy', 'Lazy'), ('priority', 'Priority')], 'help_text': 'Image loading', 'required': False}), 7: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'Palette'}), 8: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('p-0', 'None'), ('p-1 p-sm-2', 'Small (responsive)'), ('p-2 p-sm-3', 'Medium (responsive)'), ('p-3 p-sm-4', 'Large (responsive)'), ('p-4 p-sm-5', 'Larger (responsive)'), ('p-5 p-sm-6', 'Largest (responsive)')], 'help_text': 'Padding around the block'}), 9: ('wagtail.blocks.StructBlock', [[('image', 0), ('orientation', 1), ('size', 2), ('crop', 3), ('rounded', 4), ('responsive', 5), ('loading', 6), ('palette', 7), ('inset', 8)]], {'label': 'Hero Image', 'max_num': 1}), 10: ('wagtail.blocks.CharBlock', (), {'help_text': 'Title text to display'}), 11: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Use the cursive font on title?', 'required': False}), 12: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('text-start', 'Left'), ('text-center', 'Center'), ('text-end', 'Right')], 'help_text': 'Title text alignment', 'required': False}), 13: ('wagtail.blocks.StructBlock', [[('text', 10), ('cursive', 11), ('justify', 12), ('palette', 7), ('inset', 8)]], {'label': 'Title', 'max_num': 1}), 14: ('wagtail.blocks.CharBlock', (), {'blank': True, 'help_text': 'Bold title text for this card (len=255)', 'label': 'Card Title', 'max_length': 255, 'null': True, 'required': False}), 15: ('wagtail.blocks.RichTextBlock', (), {'blank': True, 'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Optional text for this card', 'label': 'Card Text', 'null': True, 'required': False}), 16: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('text-start', 'Left'), ('text-center', 'Center'), ('text-end', 'Right')], 'help_text': 'Text alignment', 'required': False}), 17: ('wagtail.images.blocks.ImageChooserBlock', (), {'blank': True, 'label': 'Card Image', 'null': True, 'required': False}), 18: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'Card palette'}), 19: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('p-0', 'None'), ('p-1 p-sm-2', 'Small (responsive)'), ('p-2 p-sm-3', 'Medium (responsive)'), ('p-3 p-sm-4', 'Large (responsive)'), ('p-4 p-sm-5', 'Larger (responsive)'), ('p-5 p-sm-6', 'Largest (responsive)')], 'help_text': 'Padding around the card'}), 20: ('wagtail.blocks.CharBlock', (), {'label': 'Button Title (use hyphen for special link button)', 'max_length': 255, 'required': False}), 21: ('wagtail.blocks.PageChooserBlock', (), {'label': 'Page link', 'required': False}), 22: ('wagtail.documents.blocks.DocumentChooserBlock', (), {'label': 'Document link', 'required': False}), 23: ('wagtail.blocks.CharBlock', (), {'label': 'Extra link', 'max_length': 255, 'required': False}), 24: ('wagtail.blocks.StructBlock', [[('button_title', 20), ('page_link', 21), ('doc_link', 22), ('extra_link', 23)]], {'help_text': 'Enter a page or document, or an external link', 'label': 'Card Link', 'required': False}), 25: ('wagtail.blocks.StructBlock', [[('title', 14), ('text', 15), ('justify', 16), ('image', 17), ('orientation', 1), ('size', 2), ('crop', 3), ('responsive', 5), ('palette', 18), ('inset', 19), ('link', 24)]], {}), 26: ('wagtail.blocks.ListBlock', (25,), {}), 27: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Use the cursive font in titles?', 'required': False}), 28: ('wagtail.blocks.ChoiceBlock', [], {'choices': [(-1, 'None'), (0, '0'), (1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5')], 'help_text': 'Image rounding', 'required': False}), 29: ('wagtail.blocks.StructBlock', [[('cards', 26), ('cursive', 27), ('rounded', 28), ('loading', 6), ('palette', 7), ('inset', 8)]], {}), 30: ('wagtail.blocks.CharBlock', (), {'blank': True, 'max_length': 60, 'null': True, 'required': False}), 31: ('wagtail.blocks.RichTextBlock', (), {'blank': True, 'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'required': False}), 32: ('wagtail.blocks.BooleanBlock', (), {'blank': True, 'default': False, 'help_text': 'Overlay text on image', 'required': False}), 33: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('text-start', 'Left'), ('text-center', 'Center'), ('text-end', 'Right')], 'help_text': 'Block text alignment', 'required': False}), 34: ('wagtail.images.blocks.ImageChooserBlock', (), {'blank': True, 'null': True}), 35: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('left', 'Left'), ('right', 'Right'), ('center', 'Center'), ('full', 'Full')], 'help_text': 'Image left - text right, or image right - text left.'}), 36: ('wagtail.blocks.StructBlock', [[('button_title', 20), ('page_link', 21), ('doc_link', 22), ('extra_link', 23)]], {}), 37: ('wagtail.blocks.StructBlock', [[('title', 30), ('cursive', 11), ('text', 31), ('overlay', 32), ('justify', 33), ('image', 34), ('image_alignment', 35), ('orientation', 1), ('size', 2), ('crop', 3), ('rounded', 4), ('responsive', 5), ('loading', 6), ('palette', 7), ('inset', 8), ('link', 36)]], {}), 38: ('wagtail.blocks.CharBlock', (), {'blank': True, 'help_text': 'Max length of 60 characters, optional', 'max_length': 60, 'null': True, 'required': False}), 39: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Use the cursive font?', 'required': False}), 40: ('wagtail.blocks.RichTextBlock', (), {'blank': True, 'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Call to action text, optional (max=200)', 'required': False}), 41: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'CTA palette', 'label': 'CTA Button palette'}), 42: ('wagtail.blocks.StructBlock', [[('button_title', 20), ('page_link', 21), ('doc_link', 22), ('extra_link', 23)]], {'blank': True, 'null': True, 'required': False}), 43: ('wagtail.blocks.StructBlock', [[('title', 38), ('cursive', 39), ('text', 40), ('justify', 16), ('palette', 41), ('inset', 8), ('link', 42)]], {}), 44: ('wagtail.blocks.CharBlock', (), {'blank': True, 'help_text': 'Display title, optional (max len=120)', 'max_length': 120, 'null': True, 'required': False}), 45: ('wagtail.blocks.RichTextBlock', (), {'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Rich text block, required'}), 46: ('wagtail.blocks.StructBlock', [[('title', 44), ('cursive', 11), ('content', 45), ('justify', 16), ('palette', 7), ('inset', 8)]], {}), 47: ('wagtail.embeds.blocks.EmbedBlock', (), {'help_text': 'Video URL', 'max_with': 1200}), 48: ('wagtail.blocks.StructBlock', [[('image', 34), ('orientation', 1), ('size', 2), ('crop', 3), ('rounded', 4), ('responsive', 5), ('loading', 6), ('palette', 7), ('inset', 8), ('link', 36)]], {}), 49: ('cmspage.blocks.custom_table.CustomTableBlock', (), {}), 50: ('wagtail.blocks.CharBlock', (), {'help_text': 'Display title, optional (max len=120)', 'max_length': 120, 'required': False}), 51: ('wagtail.blocks.RichTextBlock', (), {'features': ['bold', 'italic', 'ol', 'ul', 'usefont'], 'help_text': 'Short description', 'max_length': 256, 'required': False}), 52: ('wagtail.blocks.CharBlock', (), {'help_text': 'Attribution, optional (max len=80)', 'max_length': 80, 'required': False}), 53: ('wagtail.blocks.StructBlock', [[('carousel_image', 0), ('carousel_title', 50), ('carousel_justify', 16), ('carousel_content', 51), ('carousel_attribution', 52)]], {}), 54: ('wagtail.blocks.ListBlock', (53,), {}), 55: ('wagtail.blocks.IntegerBlock', (), {'default': 12000, 'help_text': 'Keep visible for time in milliseconds'}), 56: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('auto', 'Automatic'), ('eager', 'Eager'), ('lazy', 'Lazy'), ('priority', 'Priority')], 'help_text': 'First slide image loading (other slides load lazily)', 'required': False}), 57: ('wagtail.blocks.StructBlock', [[('carousel', 54), ('carousel_interval', 55), ('palette', 7), ('inset', 8), ('loading', 56)]], {}), 58: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('height-0', 'None'), ('height-1 py-1', 'Small'), ('height-2 py-2', 'Medium'), ('height-3 py-3', 'Large'), ('height-4 py-4', 'Larger'), ('height-5 py-5', 'Largest')], 'help_text': 'Vertical space height'}), 59: ('wagtail.blocks.StructBlock', [[('height', 58), ('palette', 7), ('inset', 8)]], {}), 60: ('wagtail.blocks.CharBlock', (), {'help_text': 'Lines Title (optional)', 'required': False}), 61: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Add number to lines', 'required': False}), 62: ('wagtail.blocks.BooleanBlock', (), {'default': False, 'help_text': 'Dropdown text (accordian)', 'required': False}), 63: ('wagtail.blocks.ChoiceBlock', [], {'choices': [('cp-transparent', 'Transparent Background'), ('cp-page', 'Page Theme (respects light/dark mode)'), ('cp-light', 'Light Theme (fixed light)'), ('cp-dark', 'Dark Theme (fixed dark)'), ('cp-white', 'Black on White'), ('cp-black', 'White on Black'), ('cp-highlight', 'Highlight Theme (alternate background)'), ('cp-standout', 'Standout Theme (secondary alternate)'), ('cp-success', 'Success (green for positive actions)'), ('cp-warning', 'Warning (yellow for caution)'), ('cp-info', 'Info (using site palette colors)'), ('cp-danger', 'Danger (red for errors/critical)')], 'help_text': 'LineBlock palette'}), 64: ('wagtail.blocks.CharBlock', (), {'help_text': 'Line text (max len=120)', 'max_length': 120}), 65: ('wagtail.blocks.RichTextBlock', (), {'features': ['h2', 'h3', 'h4', 'h5', 'h6', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed', 'code', 'blockquote', 'superscript', 'subscript', 'strikethrough', 'usefont'], 'help_text': 'Dropdown text block, optional', 'required': False}), 66: ('wagtail.blocks.StructBlock', [[('heading', 64), ('content', 65)]], {}), 67: ('wagtail.blocks.ListBlock', (66,), {}), 68: ('wagtail.blocks.StructBlock', [[('subtitle', 60), ('number', 61), ('dropdown', 62), ('palette', 63), ('inset', 8), ('lines', 67)]], {})}, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:00
+
+from django.db import migrations, models
+
+# Icons whose choices named a path that did not exist
+MOVED_ICONS = {
+    "cmspage/icons/train.svg": "cmspage/icons/living/train.svg",
+    "cmspage/icons/truck.svg": "cmspage/icons/living/truck.svg",
+    "cmspage/icons/walk.svg": "cmspage/icons/living/walk.svg",
+}
+
+
+def update_icon_paths(apps, schema_editor, icons=MOVED_ICONS):
+    MenuLink = apps.get_model("cmspage", "MenuLink")
+    for old_icon, new_icon in icons.items():
+        MenuLink.objects.filter(menu_icon=old_icon).update(menu_icon=new_icon)
+
+
+def revert_icon_paths(apps, schema_editor):
+    update_icon_paths(apps, schema_editor, {new_icon: old_icon for old_icon, new_icon in MOVED_ICONS.items()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmspage', '0008_image_loading'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='menulink',
+            name='menu_icon',
+            field=models.CharField(blank=True, choices=[('', 'No Icon'), ('cmspage/icons/social/X.svg', 'X'), ('cmspage/icons/cards/ace-of-clubs.svg', 'Ace Of Clubs'), ('cmspage/icons/cards/ace-of-diamonds.svg', 'Ace Of Diamonds'), ('cmspage/icons/cards/ace-of-hearts.svg', 'Ace Of Hearts'), ('cmspage/icons/cards/ace-of-spades.svg', 'Ace Of Spades'), ('cmspage/icons/living/airplane.svg', 'Airplane'), ('cmspage/icons/symbols/anchor.svg', 'Anchor'), ('cmspage/icons/symbols/apply.svg', 'Apply'), ('cmspage/icons/symbols/arrow-down.svg', 'Arrow Down'), ('cmspage/icons/symbols/arrow-end.svg', 'Arrow End'), ('cmspage/icons/symbols/arrow-left.svg', 'Arrow Left'), ('cmspage/icons/symbols/arrow-right.svg', 'Arrow Right'), ('cmspage/icons/symbols/arrow-start.svg', 'Arrow Start'), ('cmspage/icons/symbols/arrow-up.svg', 'Arrow Up'), ('cmspage/icons/people/baby.svg', 'Baby'), ('cmspage/icons/living/bloom.svg', 'Bloom'), ('cmspage/icons/living/book-open.svg', 'Book Open'), ('cmspage/icons/people/brain.svg', 'Brain'), ('cmspage/icons/symbols/broadcast.svg', 'Broadcast'), ('cmspage/icons/living/car-side.svg', 'Car Side'), ('cmspage/icons/living/champagne.svg', 'Champagne'), ('cmspage/icons/tech/cloud.svg', 'Cloud'), ('cmspage/icons/tech/computer.svg', 'Computer'), ('cmspage/icons/sport/cricket.svg', 'Cricket'), ('cmspage/icons/people/cry.svg', 'Cry'), ('cmspage/icons/living/desk.svg', 'Desk'), ('cmspage/icons/social/discord.svg', 'Discord'), ('cmspage/icons/tech/document.svg', 'Document'), ('cmspage/icons/living/donation.svg', 'Donation'), ('cmspage/icons/social/envelope.svg', 'Envelope'), ('cmspage/icons/tech/external.svg', 'External'), ('cmspage/icons/social/facebook.svg', 'Facebook'), ('cmspage/icons/social/facebook-messenger.svg', 'Facebook Messenger'), ('cmspage/icons/people/father.svg', 'Father'), ('cmspage/icons/sport/football.svg', 'Football'), ('cmspage/icons/social/github.svg', 'Github'), ('cmspage/icons/living/giving.svg', 'Giving'), ('cmspage/icons/tech/graph-flowchart.svg', 'Graph Flowchart'), ('cmspage/icons/tech/graph-trend.svg', 'Graph Trend'), ('cmspage/icons/symbols/heart.svg', 'Heart'), ('cmspage/icons/symbols/help.svg', 'Help'), ('cmspage/icons/symbols/home.svg', 'Home'), ('cmspage/icons/symbols/home-dark.svg', 'Home Dark'), ('cmspage/icons/symbols/information.svg', 'Information'), ('cmspage/icons/social/instagram.svg', 'Instagram'), ('cmspage/icons/tech/keyboard.svg', 'Keyboard'), ('cmspage/icons/tech/laptop.svg', 'Laptop'), ('cmspage/icons/symbols/link.svg', 'Link'), ('cmspage/icons/social/linkedin.svg', 'Linkedin'), ('cmspage/icons/tech/mainframe.svg', 'Mainframe'), ('cmspage/icons/living/map.svg', 'Map'), ('cmspage/icons/living/map-pin.svg', 'Map Pin'), ('cmspage/icons/social/medium.svg', 'Medium'), ('cmspage/icons/tech/microphone.svg', 'Microphone'), ('cmspage/icons/tech/mobile.svg', 'Mobile'), ('cmspage/icons/living/moon.svg', 'Moon'), ('cmspage/icons/people/mother.svg', 'Mother'), ('cmspage/icons/tech/mouse.svg', 'Mouse'), ('cmspage/icons/living/news.svg', 'News'), ('cmspage/icons/tech/page.svg', 'Page'), ('cmspage/icons/tech/phone.svg', 'Phone'), ('cmspage/icons/tech/phone-call.svg', 'Phone Call'), ('cmspage/icons/social/pinterest.svg', 'Pinterest'), ('cmspage/icons/symbols/point-left.svg', 'Point Left'), ('cmspage/icons/symbols/point-right.svg', 'Point Right'), ('cmspage/icons/symbols/point-up.svg', 'Point Up'), ('cmspage/icons/people/pram.svg', 'Pram'), ('cmspage/icons/living/rain.svg', 'Rain'), ('cmspage/icons/social/reddit.svg', 'Reddit'), ('cmspage/icons/sport/referee.svg', 'Referee'), ('cmspage/icons/symbols/rss.svg', 'Rss'), ('cmspage/icons/living/run.svg', 'Run'), ('cmspage/icons/living/ship.svg', 'Ship'), ('cmspage/icons/social/skype.svg', 'Skype'), ('cmspage/icons/social/slack.svg', 'Slack'), ('cmspage/icons/living/sleep.svg', 'Sleep'), ('cmspage/icons/people/smile.svg', 'Smile'), ('cmspage/icons/social/snapchat.svg', 'Snapchat'), ('cmspage/icons/tech/speaker.svg', 'Speaker'), ('cmspage/icons/people/speech.svg', 'Speech'), ('cmspage/icons/living/stand.svg', 'Stand'), ('cmspage/icons/living/star.svg', 'Star'), ('cmspage/icons/living/sun.svg', 'Sun'), ('cmspage/icons/social/telegram.svg', 'Telegram'), ('cmspage/icons/sport/tennis.svg', 'Tennis'), ('cmspage/icons/social/tiktok.svg', 'Tiktok'), ('cmspage/icons/living/train.svg', 'Train'), ('cmspage/icons/living/trash.svg', 'Trash'), ('cmspage/icons/living/truck.svg', 'Truck'), ('cmspage/icons/social/tumblr.svg', 'Tumblr'), ('cmspage/icons/social/twitch.svg', 'Twitch'), ('cmspage/icons/social/twitter.svg', 'Twitter'), ('cmspage/icons/social/vimeo.svg', 'Vimeo'), ('cmspage/icons/living/walk.svg', 'Walk'), ('cmspage/icons/symbols/warning.svg', 'Warning'), ('cmspage/icons/living/water.svg', 'Water'), ('cmspage/icons/living/water-tap.svg', 'Water Tap'), ('cmspage/icons/social/whatsapp.svg', 'Whatsapp'), ('cmspage/icons/living/wheelchair.svg', 'Wheelchair'), ('cmspage/icons/social/youtube.svg', 'Youtube'), ('cmspage/icons/social/zoom.svg', 'Zoom')], default='', help_text='Select an icon to display next to the link', max_length=64, verbose_name='Icon'),
+        ),
+        migrations.RunPython(update_icon_paths, revert_icon_paths),
+    ]
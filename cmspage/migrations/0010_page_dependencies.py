@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmspage', '0009_menu_icon_paths'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('wagtailcore', '0094_alter_page_locale'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.CharField(max_length=255)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+                ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cmspage_dependencies', to='wagtailcore.page')),
+                ('revision', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='wagtailcore.revision')),
+            ],
+            options={
+                'verbose_name_plural': 'page dependencies',
+                'indexes': [models.Index(fields=['content_type', 'object_id'], name='pagedependency_object_idx')],
+                'constraints': [models.UniqueConstraint(fields=('page', 'content_type', 'object_id'), name='pagedependency_unique')],
+            },
+        ),
+    ]
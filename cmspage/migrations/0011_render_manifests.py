@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmspage', '0010_page_dependencies'),
+        ('wagtailcore', '0094_alter_page_locale'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderManifest',
+            fields=[
+                ('revision', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='wagtailcore.revision')),
+                ('manifest', models.JSONField(default=dict)),
+            ],
+        ),
+    ]
@@ -1,4 +1,5 @@
 import logging
+import math
 import os
 import json
 from itertools import combinations
@@ -8,6 +9,9 @@ from django.apps import apps
 from django.conf import settings
 from django.template import engines, TemplateDoesNotExist
 
+from cmspage.cache import CMSCache
+from cmspage.models import functional
+
 
 __all__ = ("CMSTemplateMixin", "CMSPageMixin", "log_template_debug")
 
@@ -18,6 +22,8 @@ CMSPAGE_TEMPLATE_BASE_DIR = "CMSPAGE_TEMPLATE_BASE_DIR"
 CMSPAGE_TEMPLATE_INCLUDE_DIR = "CMSPAGE_TEMPLATE_INCLUDE_DIR"
 CMSPAGE_TEMPLATE_INCLUDE_FILES = "CMSPAGE_TEMPLATE_INCLUDE_FILES"
 CMSPAGE_TEMPLATE_INCLUDE_FILES_EXTRA = "CMSPAGE_TEMPLATE_INCLUDE_FILES_EXTRA"
+CMSPAGE_TEMPLATE_MANIFEST = "CMSPAGE_TEMPLATE_MANIFEST"
+CMSPAGE_TEMPLATE_CACHE = "CMSPAGE_TEMPLATE_CACHE"
 
 # Default settings
 DEFAULT_TEMPLATE_EXTENSIONS = [".html", ".htm"]
@@ -42,6 +48,10 @@ DEFAULT_TEMPLATE_INCLUDE_NAMES = [
     "media",
     "theme_switcher",
 ]
+# Resolved templates depend on the templates deployed with each process, so they are kept
+# in process (without expiring) unless CMSPAGE_TEMPLATE_CACHE names a shared cache
+template_cache = CMSCache("template", CMSPAGE_TEMPLATE_CACHE, alias=None, l1_timeout=math.inf)
+
 # optional logging (for development)
 _logger = logging.getLogger("cmspage")
 
@@ -62,7 +72,7 @@ class CMSTemplateMixin:
     for rendering CMS pages based on various conditions and settings.
     """
 
-    from cmspage.models.functional import conditional_lru_cache, conditional_cached_property
+    from cmspage.models.functional import conditional_cached_property
 
     """
 
@@ -114,7 +124,7 @@ class CMSTemplateMixin:
         - Returns:
             - dict: The dictionary of include templates.
 
-    - `find_existing_template(template_path: str, *parts: Optional[str]) -> str | None` (lru_cache):
+    - `find_existing_template(template_path: str, *parts: Optional[str]) -> str | None` (cached):
         - Returns an existing template path based on the additional path parts provided.
         - Parameters:
             - `template_path` (str): The base template path.
@@ -122,6 +132,9 @@ class CMSTemplateMixin:
         - Returns:
             - str | None: The existing template path if found, None otherwise.
 
+    - `probe_template(template_path: str, *parts: Optional[str]) -> str | None`:
+        - Uncached filesystem probe behind `find_existing_template()`, bypassing any template manifest.
+
     """
 
     default_base_template = DEFAULT_BASE_TEMPLATE_NAME
@@ -252,10 +265,24 @@ class CMSTemplateMixin:
         return resolved_include_paths
 
     @staticmethod
-    @conditional_lru_cache
+    @template_cache.memoize(condition=lambda: functional.cache_state)
     def find_existing_template(template_path: str, *parts: Optional[str]) -> str | None:
         """
-        Return an existing template path based on the additional path parts provided
+        Return an existing template path based on the additional path parts provided.
+        A loaded template manifest answers without probing the template engines.
+        """
+        from cmspage.template_manifest import lookup_template
+
+        found, template_name = lookup_template(template_path, *parts)
+        if found:
+            return template_name
+        return CMSTemplateMixin.probe_template(template_path, *parts)
+
+    @staticmethod
+    def probe_template(template_path: str, *parts: Optional[str]) -> str | None:
+        """
+        Probe the template engines for each style combination, longest first,
+        returning the first template that exists
         """
         dirname, filename = os.path.split(template_path)
         parts = [part for part in parts if part is not None]  # Filter possible None values
@@ -301,9 +328,9 @@ class CMSPageMixin(CMSTemplateMixin):
         return self.__class__.__bases__[0].__name__
 
     def get_context(self, request, *args, **kwargs):
-        from cmspage.models import CMSFooterPage
+        from cmspage.footer import SiteFooter
 
         context = super().get_context(request, *args, **kwargs)
         context |= CMSTemplateMixin.get_context(self, self.request, **kwargs)
-        context["page_footer"] = CMSFooterPage.objects.first()
+        context |= SiteFooter.for_page(self, request).get_context()
         return context
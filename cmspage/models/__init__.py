@@ -3,6 +3,8 @@ from .cms_form import CMSFormPage
 from .tags import PageTag, Tag
 from .menu_link import MenuLink, min_length_validator
 from .image import CMSPageImage
+from .dependency import PageDependency
+from .render_manifest import RenderManifest
 
 __all__ = (
     "CMSPage",
@@ -13,5 +15,7 @@ __all__ = (
     "PageTag",
     "Tag",
     "MenuLink",
+    "PageDependency",
+    "RenderManifest",
     "min_length_validator",
 )
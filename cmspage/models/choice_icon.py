@@ -2,6 +2,7 @@ from django.db import models
 
 class IconChoices(models.TextChoices):
     NONE = "", "No Icon"
+    X = "cmspage/icons/social/X.svg", "X"
     ACE_OF_CLUBS = "cmspage/icons/cards/ace-of-clubs.svg", "Ace Of Clubs"
     ACE_OF_DIAMONDS = "cmspage/icons/cards/ace-of-diamonds.svg", "Ace Of Diamonds"
     ACE_OF_HEARTS = "cmspage/icons/cards/ace-of-hearts.svg", "Ace Of Hearts"
@@ -27,11 +28,16 @@ class IconChoices(models.TextChoices):
     CRICKET = "cmspage/icons/sport/cricket.svg", "Cricket"
     CRY = "cmspage/icons/people/cry.svg", "Cry"
     DESK = "cmspage/icons/living/desk.svg", "Desk"
+    DISCORD = "cmspage/icons/social/discord.svg", "Discord"
     DOCUMENT = "cmspage/icons/tech/document.svg", "Document"
     DONATION = "cmspage/icons/living/donation.svg", "Donation"
+    ENVELOPE = "cmspage/icons/social/envelope.svg", "Envelope"
     EXTERNAL = "cmspage/icons/tech/external.svg", "External"
+    FACEBOOK = "cmspage/icons/social/facebook.svg", "Facebook"
+    FACEBOOK_MESSENGER = "cmspage/icons/social/facebook-messenger.svg", "Facebook Messenger"
     FATHER = "cmspage/icons/people/father.svg", "Father"
     FOOTBALL = "cmspage/icons/sport/football.svg", "Football"
+    GITHUB = "cmspage/icons/social/github.svg", "Github"
     GIVING = "cmspage/icons/living/giving.svg", "Giving"
     GRAPH_FLOWCHART = "cmspage/icons/tech/graph-flowchart.svg", "Graph Flowchart"
     GRAPH_TREND = "cmspage/icons/tech/graph-trend.svg", "Graph Trend"
@@ -40,12 +46,15 @@ class IconChoices(models.TextChoices):
     HOME = "cmspage/icons/symbols/home.svg", "Home"
     HOME_DARK = "cmspage/icons/symbols/home-dark.svg", "Home Dark"
     INFORMATION = "cmspage/icons/symbols/information.svg", "Information"
+    INSTAGRAM = "cmspage/icons/social/instagram.svg", "Instagram"
     KEYBOARD = "cmspage/icons/tech/keyboard.svg", "Keyboard"
     LAPTOP = "cmspage/icons/tech/laptop.svg", "Laptop"
     LINK = "cmspage/icons/symbols/link.svg", "Link"
+    LINKEDIN = "cmspage/icons/social/linkedin.svg", "Linkedin"
     MAINFRAME = "cmspage/icons/tech/mainframe.svg", "Mainframe"
     MAP = "cmspage/icons/living/map.svg", "Map"
     MAP_PIN = "cmspage/icons/living/map-pin.svg", "Map Pin"
+    MEDIUM = "cmspage/icons/social/medium.svg", "Medium"
     MICROPHONE = "cmspage/icons/tech/microphone.svg", "Microphone"
     MOBILE = "cmspage/icons/tech/mobile.svg", "Mobile"
     MOON = "cmspage/icons/living/moon.svg", "Moon"
@@ -55,28 +64,42 @@ class IconChoices(models.TextChoices):
     PAGE = "cmspage/icons/tech/page.svg", "Page"
     PHONE = "cmspage/icons/tech/phone.svg", "Phone"
     PHONE_CALL = "cmspage/icons/tech/phone-call.svg", "Phone Call"
+    PINTEREST = "cmspage/icons/social/pinterest.svg", "Pinterest"
     POINT_LEFT = "cmspage/icons/symbols/point-left.svg", "Point Left"
     POINT_RIGHT = "cmspage/icons/symbols/point-right.svg", "Point Right"
     POINT_UP = "cmspage/icons/symbols/point-up.svg", "Point Up"
     PRAM = "cmspage/icons/people/pram.svg", "Pram"
     RAIN = "cmspage/icons/living/rain.svg", "Rain"
+    REDDIT = "cmspage/icons/social/reddit.svg", "Reddit"
     REFEREE = "cmspage/icons/sport/referee.svg", "Referee"
     RSS = "cmspage/icons/symbols/rss.svg", "Rss"
     RUN = "cmspage/icons/living/run.svg", "Run"
     SHIP = "cmspage/icons/living/ship.svg", "Ship"
+    SKYPE = "cmspage/icons/social/skype.svg", "Skype"
+    SLACK = "cmspage/icons/social/slack.svg", "Slack"
     SLEEP = "cmspage/icons/living/sleep.svg", "Sleep"
     SMILE = "cmspage/icons/people/smile.svg", "Smile"
+    SNAPCHAT = "cmspage/icons/social/snapchat.svg", "Snapchat"
     SPEAKER = "cmspage/icons/tech/speaker.svg", "Speaker"
     SPEECH = "cmspage/icons/people/speech.svg", "Speech"
     STAND = "cmspage/icons/living/stand.svg", "Stand"
     STAR = "cmspage/icons/living/star.svg", "Star"
     SUN = "cmspage/icons/living/sun.svg", "Sun"
+    TELEGRAM = "cmspage/icons/social/telegram.svg", "Telegram"
     TENNIS = "cmspage/icons/sport/tennis.svg", "Tennis"
-    TRAIN = "cmspage/icons/train.svg", "Train"
+    TIKTOK = "cmspage/icons/social/tiktok.svg", "Tiktok"
+    TRAIN = "cmspage/icons/living/train.svg", "Train"
     TRASH = "cmspage/icons/living/trash.svg", "Trash"
-    TRUCK = "cmspage/icons/truck.svg", "Truck"
-    WALK = "cmspage/icons/walk.svg", "Walk"
+    TRUCK = "cmspage/icons/living/truck.svg", "Truck"
+    TUMBLR = "cmspage/icons/social/tumblr.svg", "Tumblr"
+    TWITCH = "cmspage/icons/social/twitch.svg", "Twitch"
+    TWITTER = "cmspage/icons/social/twitter.svg", "Twitter"
+    VIMEO = "cmspage/icons/social/vimeo.svg", "Vimeo"
+    WALK = "cmspage/icons/living/walk.svg", "Walk"
     WARNING = "cmspage/icons/symbols/warning.svg", "Warning"
     WATER = "cmspage/icons/living/water.svg", "Water"
     WATER_TAP = "cmspage/icons/living/water-tap.svg", "Water Tap"
+    WHATSAPP = "cmspage/icons/social/whatsapp.svg", "Whatsapp"
     WHEELCHAIR = "cmspage/icons/living/wheelchair.svg", "Wheelchair"
+    YOUTUBE = "cmspage/icons/social/youtube.svg", "Youtube"
+    ZOOM = "cmspage/icons/social/zoom.svg", "Zoom"
@@ -1,13 +1,36 @@
+from itertools import chain
+
+from django.apps import apps
+from django.conf import settings
 from django.db import models
+from django.db.models import Case, Value, When
+from django.utils.timezone import now
 from modelcluster.contrib.taggit import ClusterTaggableManager
 from wagtail.admin.panels import FieldRowPanel, FieldPanel
-from wagtail.embeds import blocks as embed_blocks
+from wagtail.embeds.embeds import get_embed_hash
+from wagtail.embeds.models import Embed
 from wagtail.fields import StreamField
-from wagtail.images.models import Image as WagtailImage
-from wagtail.models import Page
+from wagtail.images import get_image_model
+from wagtail.images.models import AbstractImage
+from wagtail.models import Page, Site
 
 import cmspage.blocks as cmsblocks
+from cmspage.blocks.choosers import PrefetchedChooserMixin, prefetch_urls, use_prefetched
+from cmspage.blocks.rich_text import RichTextBlock, expand_rich_text
+from cmspage.footer import SiteFooter
+from cmspage.fragments import is_preview
+from cmspage.references import stream_block_values, stream_chooser_ids
 from cmspage.mixins import CMSTemplateMixin, log_template_debug
+from cmspage.conditional import serve_conditional
+from cmspage.holes import serve_with_holes
+from cmspage.page_cache import serve_cached
+from cmspage.render_manifest import load_render_manifest, merge_render_manifests, save_render_manifest, stream_embeds
+from cmspage.renditions import (
+    CMSPAGE_IMAGE_PRELOAD,
+    prefetch_renditions,
+    priority_block_index,
+    stream_rendition_specs,
+)
 
 
 class AbstractCMSPage(CMSTemplateMixin, Page):
@@ -91,7 +114,7 @@ class CMSPageBase(AbstractCMSPage):
         ("image_and_text", cmsblocks.image_and_text.ImageAndTextBlock()),
         ("cta", cmsblocks.cta.CallToActionBlock()),
         ("richtext", cmsblocks.title.RichTextWithTitleBlock()),
-        ("video", embed_blocks.EmbedBlock(max_with=1200, help_text="Video URL")),
+        ("video", cmsblocks.embed.EmbedBlock(max_with=1200, help_text="Video URL")),
         ("large_image", cmsblocks.image_and_text.LargeImageBlock()),
         ("table", cmsblocks.custom_table.CustomTableBlock()),
         # utilities
@@ -102,85 +125,112 @@ class CMSPageBase(AbstractCMSPage):
 
     body = StreamField(body_blocks, blank=True, null=True)
 
+    def serve(self, request, *args, **kwargs):
+        # Revalidations are answered, and anonymous visitors served the cached page if there is
+        # one, before any context is built. Holes are filled in the cached or rendered page.
+        return serve_conditional(
+            self,
+            request,
+            lambda: serve_with_holes(
+                request,
+                lambda: serve_cached(self, request, lambda: super(CMSPageBase, self).serve(request, *args, **kwargs)),
+            ),
+        )
+
     def get_context(self, request, *args, **kwargs):
         context = super().get_context(request, *args, **kwargs)
-        context["page_footer"] = CMSFooterPage.objects.live().first()
-
-        # Prefetch images for all blocks to avoid N+1 queries
-        if self.body:
-            self._prefetch_block_images()
+        # The site's rendered footer is usually cached, otherwise the footer page is loaded
+        site_footer = SiteFooter.for_page(self, request)
+        context |= site_footer.get_context()
+        page_footer = site_footer.page if site_footer.cached is None else None
+
+        # What the page and footer need is listed in the render manifests of their revisions, computed
+        # when they were published; without them (as for previews) it is found in their StreamFields
+        manifest = self._render_manifest(page_footer, request)
+        # Fetch every image, page, document and embed chosen on the page, including the footer, in one
+        # query per model, and the renditions of the images in another
+        self._prefetch_block_objects(page_footer, request, manifest)
+        # Expand the links and embeds in every rich text value on the page together
+        self._prefetch_rich_text(page_footer)
+        self._prefetch_block_renditions(page_footer, manifest)
+        context |= self._image_priority_context(manifest)
+        if manifest is None:
+            self._save_render_manifests(page_footer, request)
 
         return context
 
-    @classmethod
-    def _extract_image_ids_from_block(cls, block):
+    def _render_manifest(self, page_footer=None, request=None) -> dict | None:
+        """The render manifests of the page and footer combined, or None unless both have one"""
+        if is_preview(request):
+            return None
+        manifests = [load_render_manifest(page) for page in (self, page_footer) if page is not None]
+        return None if None in manifests else merge_render_manifests(*manifests)
+
+    def _save_render_manifests(self, page_footer=None, request=None):
+        """Store the missing render manifests of the live page and footer, from their converted values"""
+        if not is_preview(request):
+            for page in (self, page_footer):
+                if page is not None and page.live_revision_id and load_render_manifest(page) is None:
+                    save_render_manifest(page)
+
+    def _prefetch_block_objects(self, page_footer=None, request=None, manifest=None):
         """
-        Extract image IDs from a block, checking the block type to determine if it can contain images.
-        Only recurses into block types that are known to contain images.
+        Fetch all images, pages, documents and embeds chosen in the body and footer StreamFields in one
+        query per model, and convert the block values from them, so that the blocks do not query for
+        them. The URLs of the pages and documents are computed once, for the current request.
         """
-        ids = []
-
-        # Check if the block has a block_type attribute
-        if hasattr(block, "block_type"):
-            block_type = block.block_type
-
-            # Handle specific block types that contain images
-            if block_type == "cards":
-                # Cards block has a "cards" field, which is a list of cards, each with an "image" field
-                cards = block.value.get("cards", [])
-                ids.extend(card["image"].id for card in cards if card.get("image"))
-            elif block_type == "carousel":
-                # Carousel block has a "carousel" field, which is a list of carousel items, each with a "carousel_image" field
-                carousel_items = block.value.get("carousel", [])
-                ids.extend(item["carousel_image"].id for item in carousel_items if item.get("carousel_image"))
-            elif block_type in ["image_and_text", "large_image", "small_image_and_text", "hero"]:
-                # These blocks have an "image" field directly
-                if block.value.get("image"):
-                    ids.append(block.value["image"].id)
-
-            elif hasattr(block, "value") and isinstance(block.value, dict):
-                # Check for common image field names in the block's value
-                if "image" in block.value and block.value["image"] and hasattr(block.value["image"], "id"):
-                    ids.append(block.value["image"].id)
-                elif (
-                    "carousel_image" in block.value
-                    and block.value["carousel_image"]
-                    and hasattr(block.value["carousel_image"], "id")
-                ):
-                    ids.append(block.value["carousel_image"].id)
-
-        elif isinstance(block, list):
-            for item in block:
-                ids.extend(cls._extract_image_ids_from_block(item))
-
-        elif hasattr(block, "id") and isinstance(block, WagtailImage):
-            ids.append(block.id)
-
-        elif isinstance(block, dict):
-            # Check for common image field names
-            if "image" in block and block["image"] and hasattr(block["image"], "id"):
-                ids.append(block["image"].id)
-            elif "carousel_image" in block and block["carousel_image"] and hasattr(block["carousel_image"], "id"):
-                ids.append(block["carousel_image"].id)
-
-        return ids
-
-    def _prefetch_block_images(self):
-        """Prefetch all images used in StreamField blocks to avoid N+1 queries"""
-        image_ids = []
-
-        for block in self.body:
-            image_ids.extend(self._extract_image_ids_from_block(block))
-
-        if image_ids:
-            # Deduplicate image_ids to avoid redundant queries
-            deduped_image_ids = list(set(image_ids))
-            # Prefetch all images with select_related to get both CMSPageImage and WagtailImage data
-            from cmspage.models import CMSPageImage
-
-            images = CMSPageImage.objects.filter(id__in=deduped_image_ids).select_related()
-            # Store in a cache for template access
-            self._prefetched_images = {img.id: img for img in images}
+        streams = [self.body, page_footer.footer if page_footer else None]
+        if manifest is None:
+            # Ids are read from the raw StreamField data, using paths derived from the block definitions
+            chosen_ids = stream_chooser_ids(streams, PrefetchedChooserMixin)
+            embeds = stream_embeds(streams)
+        else:
+            chosen_ids = {apps.get_model(label): ids for label, ids in manifest["objects"].items()}
+            embeds = manifest["embeds"]
+        self._prefetched_objects = {model: model.objects.in_bulk(ids) for model, ids in chosen_ids.items()}
+        self._prefetched_images = self._prefetched_objects.setdefault(get_image_model(), {})
+        for model, objects in self._prefetched_objects.items():
+            if not issubclass(model, AbstractImage):
+                prefetch_urls(objects.values(), request)
+        if embeds:
+            hashes = [get_embed_hash(*embed) for embed in embeds]
+            self._prefetched_objects[Embed] = {
+                embed.hash: embed for embed in Embed.objects.exclude(cache_until__lte=now()).filter(hash__in=hashes)
+            }
+        with use_prefetched(self._prefetched_objects):
+            for stream in streams:
+                for _ in stream or ():
+                    pass  # converts each block value
+        return self._prefetched_objects
+
+    def _prefetch_rich_text(self, page_footer=None):
+        """Expand every rich text value in the body and footer in one pass, batching their lookups"""
+        return expand_rich_text(
+            stream_block_values([self.body, page_footer.footer if page_footer else None], RichTextBlock)
+        )
+
+    def _prefetch_block_renditions(self, page_footer=None, manifest=None):
+        """Prefetch the renditions requested by image blocks in the body and footer"""
+        if manifest is not None:
+            images = self._prefetched_images
+            return prefetch_renditions(
+                (images.get(int(image_id)), specs) for image_id, specs in manifest["renditions"].items()
+            )
+        return prefetch_renditions(
+            chain(
+                stream_rendition_specs(self.body),
+                stream_rendition_specs(page_footer.footer if page_footer else None),
+            )
+        )
+
+    def _image_priority_context(self, manifest=None):
+        """Locate the block holding the priority image and, if enabled, the image to preload"""
+        index = priority_block_index(self.body) if manifest is None else manifest["priority_index"]
+        context = {"image_priority_index": index}
+        if index is not None and getattr(settings, CMSPAGE_IMAGE_PRELOAD, False):
+            bound_block = self.body[index]
+            context["image_preload"] = next(iter(bound_block.block.get_image_options(bound_block.value)), None)
+        return context
 
     class Meta:
         app_label = "cmspage"
@@ -205,7 +255,8 @@ class CMSPage(CMSPageBase):
 
 class CMSFooterPage(AbstractCMSPage):
     page_description = "This page type is for the site footer."
-    max_count = 1
+    # One footer per site, below the site's home page
+    max_count_per_parent = 1
 
     footer_blocks = [
         ("info", cmsblocks.image_and_text.SmallImageAndTextBlock()),
@@ -220,6 +271,17 @@ class CMSFooterPage(AbstractCMSPage):
         FieldPanel("footer"),
     ]
 
+    @classmethod
+    def for_site(cls, site_id: int | None):
+        """Return the site's live footer page, or else the first live footer page (shared by other sites)"""
+        footers = cls.objects.live()
+        root_paths = {root.site_id: root.root_path for root in Site.get_site_root_paths()}
+        if (root_path := root_paths.get(site_id)) is not None:
+            footers = footers.order_by(
+                Case(When(url_path__startswith=root_path, then=Value(0)), default=Value(1)), "path"
+            )
+        return footers.first()
+
     class Meta:
         app_label = "cmspage"
         verbose_name = "CMS Footer Page"
@@ -0,0 +1,32 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class PageDependency(models.Model):
+    """
+    An object that the live revision of a CMS page renders: an image, document, linked page,
+    embed or tag. The dependencies of a page are recorded when it is published (see
+    cmspage.dependencies), so that a change to an object invalidates the cached content of
+    exactly the pages that depend on it.
+    """
+
+    page = models.ForeignKey("wagtailcore.Page", on_delete=models.CASCADE, related_name="cmspage_dependencies")
+    revision = models.ForeignKey(
+        "wagtailcore.Revision", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name="+")
+    object_id = models.CharField(max_length=255)
+
+    def __str__(self):
+        return f"{self.page_id} -> {self.content_type_id}:{self.object_id}"
+
+    class Meta:
+        app_label = "cmspage"
+        verbose_name_plural = "page dependencies"
+        constraints = [
+            models.UniqueConstraint(fields=["page", "content_type", "object_id"], name="pagedependency_unique"),
+        ]
+        indexes = [
+            # Find the pages depending on an object
+            models.Index(fields=["content_type", "object_id"], name="pagedependency_object_idx"),
+        ]
@@ -2,7 +2,6 @@
 
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models.signals import post_save, post_delete
@@ -15,6 +14,14 @@ from wagtail.search.index import Indexed, FilterField, SearchField
 
 from .choice_icon import IconChoices
 from ..blocks import IconColorChoices
+from ..cache import CMSCache
+from ..versions import MENU, bump_version
+
+# Settings
+CMSPAGE_MENU_CACHE = "CMSPAGE_MENU_CACHE"
+
+# Menu links by site and user, tagged with the menu version
+menu_cache = CMSCache("menu_links", CMSPAGE_MENU_CACHE)
 
 
 THERE_CAN_BE_ONLY_ONE = "Please select only one type of link: Page, Document or External Link."
@@ -211,11 +218,11 @@ class MenuLink(PreviewableMixin, DraftStateMixin, RevisionMixin, Indexed, models
     objects = MenuLinkManager()
 
     def get_preview_context(self, request, mode_name):
-        from cmspage.models import CMSFooterPage
+        from cmspage.footer import SiteFooter
         return {
             "level": 0,
             "navigation": self.get_menu_links(self.site),
-            "page_footer": CMSFooterPage.objects.first(),
+            **SiteFooter.for_site(self.site_id, request).get_context(),
             "include": {
                 "header": "cmspage/includes/header.html",
                 "messages": "cmspage/includes/messages.html",
@@ -279,7 +286,6 @@ class MenuLink(PreviewableMixin, DraftStateMixin, RevisionMixin, Indexed, models
         """
         return list(MenuLink.objects.get_optimized_queryset(site))
 
-    MENU_LINKS_KEY = "menu_links_ids"
     MENU_LINKS_TIMEOUT = 1800  # 30 minutes
 
     @classmethod
@@ -287,25 +293,10 @@ class MenuLink(PreviewableMixin, DraftStateMixin, RevisionMixin, Indexed, models
         if not cls.cache_enabled:
             return cls.get_menu_links(site)
 
-        cache_key = f"menu_links:{site.id}:{user_id}"
-
-        # Try to get from cache first
-        menu_links = cache.get(cache_key)
-        if menu_links:
-            return menu_links
-
-        # Cache miss - generate menu links with optimized queries
-        menu_links = cls.get_menu_links(site)
-
-        # Cache the result
-        cache.set(cache_key, menu_links, cls.MENU_LINKS_TIMEOUT)
-
-        # Update the registry for easier cache invalidation
-        registry = cache.get(cls.MENU_LINKS_KEY) or set()
-        registry.add((site.id, user_id))
-        cache.set(cls.MENU_LINKS_KEY, registry, cls.MENU_LINKS_TIMEOUT)
-
-        return menu_links
+        # Cache misses generate menu links with optimized queries
+        return menu_cache.get_or_compute(
+            site.id, user_id, compute=lambda: cls.get_menu_links(site), tags=[MENU], timeout=cls.MENU_LINKS_TIMEOUT
+        )
 
     @classmethod
     def warm_cache_for_site(cls, site: Site, user_ids: list = None):
@@ -320,9 +311,7 @@ class MenuLink(PreviewableMixin, DraftStateMixin, RevisionMixin, Indexed, models
             user_ids = [0]  # Anonymous user
 
         for user_id in user_ids:
-            cache_key = f"menu_links:{site.id}:{user_id}"
-            if not cache.get(cache_key):
-                cls.get_cached_menu_links(site, user_id)
+            cls.get_cached_menu_links(site, user_id)
 
     @classmethod
     def bulk_create_menu_links(cls, menu_links_data: list, site: Site):
@@ -343,15 +332,8 @@ class MenuLink(PreviewableMixin, DraftStateMixin, RevisionMixin, Indexed, models
 
     @classmethod
     def clear_cached_menu_links(cls):
-        registry = cache.get(cls.MENU_LINKS_KEY) or set()
-
-        for site_id, user_id in registry:
-            if site_id is not None and user_id is not None:
-                cache_key = f"menu_links:{site_id}:{user_id}"
-                cache.delete(cache_key)
-
-        # Delete the registry itself
-        cache.delete(cls.MENU_LINKS_KEY)
+        # Menu links, and pages, cached with the previous menu are no longer used
+        bump_version(MENU)
 
     def clean(self):
         super().clean()
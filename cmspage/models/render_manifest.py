@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class RenderManifest(models.Model):
+    """
+    What rendering a page revision needs: the objects chosen in its blocks, the renditions of
+    its images, its embeds and its priority image block, computed when the revision is
+    published (see cmspage.render_manifest).
+    """
+
+    revision = models.OneToOneField(
+        "wagtailcore.Revision", on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    manifest = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"Render manifest of revision {self.revision_id}"
+
+    class Meta:
+        app_label = "cmspage"
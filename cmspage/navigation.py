@@ -0,0 +1,134 @@
+"""
+Single-pass navigation rendering.
+
+The navigation include renders every menu node by recursively including
+`navigation_item.html`, which costs a template render per node. The
+`{% cmspage_navigation %}` tag instead walks the navigation tree once and formats
+each item in Python with a `NavigationFormatter`, producing the same markup as the
+bundled `navigation_item.html`.
+
+To change the markup, subclass `NavigationFormatter` and either name it in the
+CMSPAGE_NAVIGATION_FORMATTER setting or pass it to the tag as `formatter`. Without a
+formatter set, an item template that resolves to anything but the bundled
+`navigation_item.html` (an override at the same path in a project's template
+directories, or a style specific template) is included per item instead.
+"""
+
+from pathlib import Path
+from typing import Iterable
+
+from django.conf import settings
+from django.template import Context, Template, TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.html import format_html
+from django.utils.module_loading import import_string
+from django.utils.safestring import SafeString, mark_safe
+
+from cmspage.icons import render_icon
+from cmspage.mixins import template_cache
+from cmspage.models import functional
+
+__all__ = (
+    "CMSPAGE_NAVIGATION_FORMATTER",
+    "DEFAULT_NAVIGATION_ITEM_TEMPLATE",
+    "NavigationFormatter",
+    "get_navigation_formatter",
+    "is_bundled_template",
+    "navigation_formatter_configured",
+    "render_navigation_items",
+)
+
+# Settings
+CMSPAGE_NAVIGATION_FORMATTER = "CMSPAGE_NAVIGATION_FORMATTER"
+
+# The item template whose markup NavigationFormatter reproduces
+DEFAULT_NAVIGATION_ITEM_TEMPLATE = "cmspage/includes/navigation_item.html"
+
+BUNDLED_TEMPLATES = Path(__file__).resolve().parent / "templates"
+
+
+class NavigationFormatter:
+    """
+    Format a navigation tree as nested <li class="menu-item"> elements, as the bundled
+    navigation_item.html does. Items may be dicts (as provided by the navigation context
+    processor) or objects with title, url, icon, icon_color and children attributes.
+
+    Each method returns safe HTML, so subclasses can override the markup for an item,
+    its label, its icon or its list of children independently.
+    """
+
+    def __init__(self, context: Context | None = None):
+        self.context = context
+
+    @staticmethod
+    def get(item, name: str):
+        return item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+
+    def render(self, items: Iterable, level: int = 0) -> SafeString:
+        """Render the items at a level of the tree and, recursively, their children"""
+        return mark_safe("".join(self.format_item(item, level) for item in items or ()))
+
+    def format_item(self, item, level: int) -> SafeString:
+        children = self.get(item, "children")
+        return format_html(
+            '<li class="menu-item">\n<a href="{}" class="menu-link level-{} align-top">{}</a>{}\n</li>\n',
+            self.get(item, "url"),
+            level,
+            self.format_label(item),
+            self.format_children(children, level + 1) if children else "",
+        )
+
+    def format_label(self, item) -> SafeString:
+        if icon := self.get(item, "icon"):
+            return format_html(
+                '<span class="fw-bolder">{}</span>\n<div class="{} menu-icon img-responsive">{}</div>',
+                self.get(item, "title"),
+                self.get(item, "icon_color"),
+                self.format_icon(icon),
+            )
+        return format_html("{}", self.get(item, "title"))
+
+    def format_children(self, children: Iterable, level: int) -> SafeString:
+        return format_html('\n<ul class="list-unstyled">{}</ul>', self.render(children, level))
+
+    def format_icon(self, icon: str) -> SafeString:
+        """Render an icon from the icon sprite (see cmspage.icons)"""
+        return render_icon(self.context, icon)
+
+
+def get_navigation_formatter(formatter=None) -> type[NavigationFormatter]:
+    """
+    Return the formatter class given as a class or dotted path, defaulting to the
+    CMSPAGE_NAVIGATION_FORMATTER setting and then NavigationFormatter
+    """
+    formatter = formatter or getattr(settings, CMSPAGE_NAVIGATION_FORMATTER, None) or NavigationFormatter
+    return import_string(formatter) if isinstance(formatter, str) else formatter
+
+
+def navigation_formatter_configured(formatter=None) -> bool:
+    """Whether a formatter is given, or set by CMSPAGE_NAVIGATION_FORMATTER"""
+    return bool(formatter or getattr(settings, CMSPAGE_NAVIGATION_FORMATTER, None))
+
+
+@template_cache.memoize(condition=lambda: functional.cache_state)
+def is_bundled_template(template_name: str) -> bool:
+    """Whether the template name resolves to cmspage's own template, rather than an override"""
+    try:
+        origin = getattr(get_template(template_name), "origin", None)
+    except TemplateDoesNotExist:
+        return False
+    return origin is not None and Path(origin.name).resolve() == BUNDLED_TEMPLATES / template_name
+
+
+def render_navigation_items(items: Iterable, item_template: str, context: Context, level: int = 0) -> SafeString:
+    """Render items by including an item template per top level item, which recurses itself"""
+    template = get_template(item_template)
+    if isinstance(template.template, Template):
+        rendered = []
+        for item in items or ():
+            with context.push(item=item, level=level):
+                rendered.append(template.template.render(context))
+        return mark_safe("".join(rendered))
+    # Templates from other engines (e.g. Jinja2) only accept a dict
+    values = context.flatten()
+    return mark_safe("".join(template.render(values | {"item": item, "level": level}) for item in items or ()))
@@ -0,0 +1,160 @@
+"""
+Cached pages for anonymous visitors.
+
+A page served to a visitor who is not logged in is the same for every such visitor until
+something it was rendered from changes, so its final HTML is cached and served from
+`CMSPageBase.serve()` before any context is built. Cached pages are keyed by the site, the
+page and its live revision, the path and language, and tagged with the page's version and
+the `sites`, `menu` and `footer` versions (see cmspage.cache and cmspage.versions), so
+that publishing the page, changing the menu, footer or sites, or changing an object the
+page depends on (see cmspage.dependencies) serves a freshly rendered page.
+
+Only plain GET and HEAD requests are served from the cache: requests from logged in
+users, previews and requests with a query string are always rendered. A response is only
+cached if it is a successful HTML page that sets no cookies and uses no CSRF token. The
+page is cached as a hole-punched shell (see cmspage.holes), so pages whose messages, CSRF
+tokens and navigation are holes are cached too, with the holes filled for each request.
+A request with messages to show is only served a cached page with a hole for them.
+
+Cached pages served to anonymous visitors are sent precompressed in an encoding the client
+accepts (see cmspage.encoding).
+
+Setting CMSPAGE_PAGE_CACHE_AUTHENTICATED to True serves the cached shells to logged in
+users as well (separately from anonymous visitors), for sites whose templates leave
+everything specific to a user to holes.
+"""
+
+from hashlib import sha256
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.translation import get_language
+
+from cmspage.audience import has_pending_messages, is_authenticated
+from cmspage.cache import CMSCache
+from cmspage.encoding import MINIMUM_LENGTH, accepted_encoding, compress, encode_response, page_encodings
+from cmspage.fragments import is_preview, page_site_id
+from cmspage.holes import fill_response, punched_holes
+from cmspage.versions import FOOTER, MENU, SITES, page_version
+
+__all__ = (
+    "CMSPAGE_PAGE_CACHE",
+    "CMSPAGE_PAGE_CACHE_AUTHENTICATED",
+    "get_page_cache",
+    "is_cacheable_request",
+    "is_cacheable_response",
+    "page_cache_key",
+    "page_cache_tags",
+    "serve_cached",
+)
+
+# Settings
+CMSPAGE_PAGE_CACHE = "CMSPAGE_PAGE_CACHE"
+CMSPAGE_PAGE_CACHE_AUTHENTICATED = "CMSPAGE_PAGE_CACHE_AUTHENTICATED"
+
+CACHED_METHODS = ("GET", "HEAD")
+
+page_cache = CMSCache("page", CMSPAGE_PAGE_CACHE)
+
+
+def get_page_cache() -> CMSCache | None:
+    """Return the cache for rendered pages, or None if CMSPAGE_PAGE_CACHE disables it"""
+    return page_cache if page_cache.enabled else None
+
+
+def is_cacheable_request(request) -> bool:
+    """Whether the request is for the page every visitor (by default, every anonymous visitor) sees"""
+    if request.method not in CACHED_METHODS or request.META.get("QUERY_STRING") or is_preview(request):
+        return False
+    return not is_authenticated(request) or getattr(settings, CMSPAGE_PAGE_CACHE_AUTHENTICATED, False)
+
+
+def is_cacheable_response(request, response) -> bool:
+    """
+    Whether the rendered response can be served to other visitors: pending messages must be
+    left to a hole, as must CSRF tokens
+    """
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        and (not has_pending_messages(request) or "messages" in punched_holes(request))
+        and response.get("Content-Type", "").startswith("text/html")
+    )
+
+
+def page_cache_tags(page) -> list:
+    """The versions a rendered page depends on"""
+    return [page_version(page.pk), SITES, MENU, FOOTER]
+
+
+def page_cache_key(page, request) -> str | None:
+    """Return the cache key for the page as served for the request, or None if it is not cached"""
+    if not (revision_id := getattr(page, "live_revision_id", None)):
+        return None
+    audience = "authenticated" if is_authenticated(request) else "anonymous"
+    digest = sha256("\n".join([request.path, get_language() or "", audience]).encode()).hexdigest()
+    return page_cache.key(page_site_id(page, request), page.pk, revision_id, digest, tags=page_cache_tags(page))
+
+
+def cached_response(request, cache, key: str, cached: dict):
+    """
+    Return the cached page with its holes filled for the request, in the encoding the client
+    accepts if the page is the one every anonymous visitor sees (see cmspage.encoding)
+    """
+    shared = not is_authenticated(request) and not has_pending_messages(request)
+    response = HttpResponse(cached["content"], content_type=cached["content_type"])
+    fill_response(request, response)
+    if not (encodings := page_encodings()):
+        return response
+    patch_vary_headers(response, ("Accept-Encoding",))
+    if (
+        not shared
+        or request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        or len(response.content) < MINIMUM_LENGTH
+        or (encoding := accepted_encoding(request, encodings)) is None
+    ):
+        return response
+    # The variants are made from the first page served, and only used for the same page
+    digest = sha256(response.content).hexdigest()
+    encoded_key = f"{key}:encoded"
+    if (variants := cache.get(encoded_key)) is None or encoding not in variants:
+        variants = {"digest": digest, **compress(response.content, encodings)}
+        cache.set(encoded_key, variants)
+    if variants["digest"] == digest:
+        encode_response(response, encoding, variants[encoding])
+    return response
+
+
+def serve_cached(page, request, serve):
+    """
+    Return the page from the cache if it is there, otherwise `serve()` it, caching the
+    rendered response if it can be reused
+    """
+    cache = get_page_cache()
+    if cache is None or not is_cacheable_request(request) or (key := page_cache_key(page, request)) is None:
+        return serve()
+    # Pending messages can only be shown in a page with a hole for them
+    cached = cache.get(key)
+    if cached is not None and (not has_pending_messages(request) or "messages" in cached.get("holes", ())):
+        return cached_response(request, cache, key, cached)
+
+    def store(response):
+        if is_cacheable_response(request, response):
+            cache.set(
+                key,
+                {
+                    "content": response.content,
+                    "content_type": response["Content-Type"],
+                    "holes": sorted(punched_holes(request)),
+                },
+            )
+
+    response = serve()
+    if hasattr(response, "add_post_render_callback"):
+        response.add_post_render_callback(store)
+    else:
+        store(response)
+    return response
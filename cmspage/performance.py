@@ -4,6 +4,7 @@ Performance monitoring utilities for cmspage.
 
 import time
 import logging
+import tracemalloc
 from contextlib import contextmanager
 from django.db import connection
 from django.conf import settings
@@ -90,6 +91,75 @@ def analyze_menu_performance(site):
     return metrics
 
 
+def build_benchmark_menu(items=300, children=9, depth=2):
+    """
+    Build a navigation tree of `items` entries for render benchmarks,
+    with `children` children per entry down to `depth` levels.
+    """
+    counter = iter(range(items))
+    roots = -(-items // sum(children**level for level in range(depth)))  # rounded up
+
+    def build_level(level):
+        nodes = []
+        for _ in range(children if level else roots):
+            if (index := next(counter, None)) is None:
+                break
+            nodes.append({"title": f"Item {index}", "url": f"/item-{index}/", "children": []})
+        if level + 1 < depth:
+            for node in nodes:
+                node["children"] = build_level(level + 1)
+        return nodes
+
+    return build_level(0)
+
+
+NAVIGATION_BENCHMARK_TEMPLATE = """{% load cmspage_tags %}{% for item in navigation %}
+{% cmspage_include include.navigation_item with item=item level=0 %}{% endfor %}"""
+
+
+def analyze_navigation_rendering(navigation, include=None, context=None, iterations=5):
+    """
+    Render a (large) navigation tree through the recursive cmspage_include of the
+    navigation_item include, as the navigation include does, and measure the cost.
+    Additional context (e.g. a request or page) may be supplied to reproduce the size
+    of a real page context.
+
+    Returns:
+        dict: item count, average render time, allocated memory per render and peak memory
+    """
+    from django.template import Context, Template
+
+    include = include or {"navigation_item": "cmspage/includes/navigation_item.html"}
+    template = Template(NAVIGATION_BENCHMARK_TEMPLATE)
+
+    def count(nodes):
+        return sum(1 + count(node.get("children") or ()) for node in nodes)
+
+    def render():
+        return template.render(Context({**(context or {}), "navigation": navigation, "include": include}))
+
+    render()  # warm up template loading
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        output = render()
+    render_time = (time.perf_counter() - start_time) / iterations
+
+    # Measure memory separately, as tracing distorts the timing
+    tracemalloc.start()
+    try:
+        render()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    metrics = {"items": count(navigation), "time": render_time, "peak_allocated": peak, "size": len(output)}
+    logger.info(
+        f"Performance: navigation_render - Items: {metrics['items']}, "
+        f"Time: {render_time:.3f}s, Peak allocated: {peak / 1024:.1f}KiB"
+    )
+    return metrics
+
+
 class MenuLinkQueryOptimizer:
     """
     Utility class to help optimize MenuLink queries.
@@ -0,0 +1,188 @@
+"""
+Schema driven reference extraction for StreamFields.
+
+To prefetch the images, pages and documents on a page, their ids are read from the
+StreamField's raw JSON rather than from block values, which would fetch each object
+as it is converted. The paths to every chooser block (such as ImageChooserBlock) are
+computed once per block definition by walking its child blocks, so references in any
+block (including those nested in ListBlocks, StructBlocks and StreamBlocks of custom
+blocks) are found without naming block types or fields. The same paths locate other
+blocks' values, such as every RichTextBlock value on a page.
+
+A path is a tuple of steps into the raw data:
+
+- `(STREAM, name)`: the values of the items of type `name` in a stream
+- `(STRUCT, name)`: the `name` field of a struct
+- `(LIST,)`: each item of a list
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from wagtail.blocks import BaseStreamBlock, BaseStructBlock, Block, ChooserBlock, ListBlock
+from wagtail.fields import StreamField
+from wagtail.images.blocks import ImageChooserBlock
+
+__all__ = (
+    "STREAM",
+    "STRUCT",
+    "LIST",
+    "block_paths",
+    "chooser_paths",
+    "image_paths",
+    "raw_chooser_ids",
+    "page_streams",
+    "raw_image_ids",
+    "stream_block_values",
+    "stream_chooser_ids",
+    "stream_image_ids",
+    "stream_raw_values",
+)
+
+STREAM = "stream"
+STRUCT = "struct"
+LIST = "list"
+
+# Paths by block definition and block class, holding the block so that its id is not reused
+_block_paths = {}
+
+
+def _find_block_paths(block, block_class, seen: frozenset) -> Iterator[Tuple[tuple, Block]]:
+    if isinstance(block, block_class):
+        yield (), block
+    elif id(block) in seen:
+        return  # a recursive block definition
+    elif isinstance(block, BaseStreamBlock):
+        for name, child_block in block.child_blocks.items():
+            for path, found in _find_block_paths(child_block, block_class, seen | {id(block)}):
+                yield ((STREAM, name), *path), found
+    elif isinstance(block, BaseStructBlock):
+        for name, child_block in block.child_blocks.items():
+            for path, found in _find_block_paths(child_block, block_class, seen | {id(block)}):
+                yield ((STRUCT, name), *path), found
+    elif isinstance(block, ListBlock):
+        for path, found in _find_block_paths(block.child_block, block_class, seen | {id(block)}):
+            yield ((LIST,), *path), found
+
+
+def block_paths(block, block_class) -> Tuple[Tuple[tuple, Block], ...]:
+    """
+    Return the path to, and the block of, every block of block_class within a block definition,
+    computed once per block
+    """
+    try:
+        return _block_paths[id(block), block_class][1]
+    except KeyError:
+        paths = tuple(_find_block_paths(block, block_class, frozenset()))
+        _block_paths[id(block), block_class] = (block, paths)
+        return paths
+
+
+def chooser_paths(block) -> Tuple[Tuple[tuple, ChooserBlock], ...]:
+    """Return the path to, and the block of, every chooser block within a block definition"""
+    return block_paths(block, ChooserBlock)
+
+
+def image_paths(block) -> Tuple[Tuple[tuple, ...], ...]:
+    """Return the paths to every ImageChooserBlock within a block definition"""
+    return tuple(path for path, chooser in chooser_paths(block) if isinstance(chooser, ImageChooserBlock))
+
+
+def _follow(raw, path: Tuple[tuple, ...]) -> Iterator:
+    if not path:
+        yield raw
+        return
+    (kind, *name), rest = path[0], path[1:]
+    if kind == STRUCT:
+        if isinstance(raw, dict) and name[0] in raw:
+            yield from _follow(raw[name[0]], rest)
+    elif raw is not None and not isinstance(raw, (str, dict)):
+        for item in raw:
+            if kind == STREAM:
+                if isinstance(item, dict) and item.get("type") == name[0]:
+                    yield from _follow(item.get("value"), rest)
+            elif isinstance(item, dict) and item.get("type") == "item" and "value" in item:
+                yield from _follow(item["value"], rest)  # ListBlock items in block format
+            else:
+                yield from _follow(item, rest)
+
+
+def raw_chooser_ids(block, raw, chooser_class=ChooserBlock) -> Dict[type, List]:
+    """Return the ids chosen by chooser blocks of chooser_class in the raw (JSON) data of a block, by model"""
+    ids = defaultdict(list)
+    for path, chooser in chooser_paths(block):
+        if not isinstance(chooser, chooser_class):
+            continue
+        for object_id in _follow(raw, path):
+            if isinstance(object_id, int) and not isinstance(object_id, bool):
+                ids[chooser.model_class].append(object_id)
+            elif hasattr(object_id, "pk"):
+                ids[chooser.model_class].append(object_id.pk)  # an instance in data built in code
+    return ids
+
+
+def _follow_value(value, path: Tuple[tuple, ...]) -> Iterator:
+    if not path:
+        yield value
+        return
+    (kind, *name), rest = path[0], path[1:]
+    if kind == STRUCT:
+        if hasattr(value, "get"):
+            yield from _follow_value(value.get(name[0]), rest)
+    elif kind == STREAM:
+        for child in value or ():
+            if child.block_type == name[0]:
+                yield from _follow_value(child.value, rest)
+    else:
+        for item in value or ():
+            yield from _follow_value(item, rest)
+
+
+def raw_image_ids(block, raw) -> List[int]:
+    """Return the ids of the images in the raw (JSON) data of a block"""
+    return [image_id for ids in raw_chooser_ids(block, raw, ImageChooserBlock).values() for image_id in ids]
+
+
+def page_streams(page) -> List:
+    """Return the values of the page's StreamFields"""
+    return [getattr(page, field.name) for field in page._meta.fields if isinstance(field, StreamField)]
+
+
+def stream_chooser_ids(stream_values: Iterable, chooser_class=ChooserBlock) -> Dict[type, List]:
+    """
+    Return the ids chosen by chooser blocks of chooser_class in StreamField values, by model
+    and without duplicates. Only the raw data is read, so no block values are converted.
+    """
+    ids = defaultdict(dict)
+    for stream_value in stream_values:
+        if not stream_value:
+            continue
+        raw_ids = raw_chooser_ids(stream_value.stream_block, stream_value.raw_data, chooser_class)
+        for model, model_ids in raw_ids.items():
+            ids[model].update(dict.fromkeys(model_ids))
+    return {model: list(model_ids) for model, model_ids in ids.items()}
+
+
+def stream_image_ids(stream_values: Iterable) -> List[int]:
+    """Return the ids of the images referenced by StreamField values, without duplicates"""
+    ids = stream_chooser_ids(stream_values, ImageChooserBlock)
+    return list(dict.fromkeys(image_id for model_ids in ids.values() for image_id in model_ids))
+
+
+def stream_raw_values(stream_values: Iterable, block_class) -> Iterator[Tuple[Block, object]]:
+    """Yield (block, raw value) for every block of block_class in StreamField values, without converting them"""
+    for stream_value in stream_values:
+        if not stream_value:
+            continue
+        for path, block in block_paths(stream_value.stream_block, block_class):
+            for raw in _follow(stream_value.raw_data, path):
+                yield block, raw
+
+
+def stream_block_values(stream_values: Iterable, block_class) -> Iterator:
+    """Yield the value of every block of block_class in StreamField values, converting the values as needed"""
+    for stream_value in stream_values:
+        if not stream_value:
+            continue
+        for path, _ in block_paths(stream_value.stream_block, block_class):
+            yield from _follow_value(stream_value, path)
@@ -0,0 +1,152 @@
+"""
+Render manifests: what rendering a page revision needs, computed once when it is published.
+
+To prefetch what a page renders, `CMSPageBase.get_context()` would otherwise walk its
+StreamFields on every request: reading the chosen objects' ids from the raw data, and the
+converted block values for the rendition specs of every image and the priority image
+block. A page revision does not change, so this is done once, when the page is published,
+and stored with the revision as a RenderManifest:
+
+- `objects`: the ids of the images, pages and documents chosen in its blocks, by model
+- `renditions`: the rendition specs requested for each image, by image id
+- `embeds`: the URL and dimensions of each media embed block
+- `priority_index`: the index of the block holding the priority image
+
+`get_context()` then fetches everything the page and its footer need with a fixed set of
+bulk queries from their manifests, which are cached (in the cache named by
+CMSPAGE_RENDER_MANIFEST_CACHE) by revision. A manifest records the image settings it was
+computed with, and is recomputed (and stored again) when they have changed, as it is for
+revisions published before manifests existed. Previews never use a manifest.
+"""
+
+from collections import defaultdict
+
+from django.dispatch import receiver
+from wagtail.embeds.blocks import EmbedBlock
+from wagtail.signals import page_published
+
+from cmspage.blocks.choosers import PrefetchedChooserMixin
+from cmspage.cache import CMSCache
+from cmspage.models.render_manifest import RenderManifest
+from cmspage.references import page_streams, stream_chooser_ids, stream_raw_values
+from cmspage.renditions import eager_blocks, image_formats, priority_block_index, srcset_widths, stream_rendition_specs
+
+__all__ = (
+    "CMSPAGE_RENDER_MANIFEST_CACHE",
+    "build_render_manifest",
+    "get_manifest_cache",
+    "load_render_manifest",
+    "manifest_key",
+    "merge_render_manifests",
+    "save_render_manifest",
+    "stream_embeds",
+)
+
+# Settings
+CMSPAGE_RENDER_MANIFEST_CACHE = "CMSPAGE_RENDER_MANIFEST_CACHE"
+
+CACHE_KEY_PREFIX = "cmspage:manifest"
+
+manifest_cache = CMSCache("manifest", CMSPAGE_RENDER_MANIFEST_CACHE)
+
+
+def get_manifest_cache() -> CMSCache | None:
+    """Return the cache for render manifests, or None if CMSPAGE_RENDER_MANIFEST_CACHE disables it"""
+    return manifest_cache if manifest_cache.enabled else None
+
+
+def manifest_key(revision_id: int) -> str:
+    # Revisions do not change, so their manifests need no tags
+    return f"{CACHE_KEY_PREFIX}:{revision_id}"
+
+
+def manifest_settings() -> dict:
+    """The settings a manifest depends on"""
+    return {"formats": image_formats(), "widths": srcset_widths(), "eager_blocks": eager_blocks()}
+
+
+def is_current(manifest) -> bool:
+    return isinstance(manifest, dict) and manifest.get("settings") == manifest_settings()
+
+
+def stream_embeds(stream_values) -> list:
+    """Return [url, max_width, max_height] for each media embed block in StreamField values, from the raw data"""
+    embeds = []
+    for block, raw in stream_raw_values(stream_values, EmbedBlock):
+        if url := getattr(raw, "url", raw):
+            embed = [url, getattr(block.meta, "max_width", None), getattr(block.meta, "max_height", None)]
+            if embed not in embeds:
+                embeds.append(embed)
+    return embeds
+
+
+def build_render_manifest(page) -> dict:
+    """Compute the render manifest of a page from its StreamFields, converting their values as needed"""
+    streams = page_streams(page)
+    renditions = defaultdict(set)
+    for stream in streams:
+        for image, specs in stream_rendition_specs(stream):
+            if image is not None and image.pk is not None:
+                renditions[str(image.pk)].update(specs)
+    body = getattr(page, "body", None)
+    return {
+        "settings": manifest_settings(),
+        "objects": {
+            model._meta.label_lower: ids
+            for model, ids in stream_chooser_ids(streams, PrefetchedChooserMixin).items()
+        },
+        "renditions": {image_id: sorted(specs) for image_id, specs in renditions.items()},
+        "embeds": stream_embeds(streams),
+        "priority_index": priority_block_index(body) if body is not None else None,
+    }
+
+
+def save_render_manifest(page, revision_id: int | None = None) -> dict:
+    """Compute and store the render manifest of the page's live (or given) revision"""
+    manifest = build_render_manifest(page)
+    if revision_id := revision_id or page.live_revision_id:
+        RenderManifest.objects.update_or_create(revision_id=revision_id, defaults={"manifest": manifest})
+        if (cache := get_manifest_cache()) is not None:
+            cache.set(manifest_key(revision_id), manifest)
+    return manifest
+
+
+def load_render_manifest(page) -> dict | None:
+    """Return the stored manifest of the page's live revision, or None if it has none for the current settings"""
+    if not (revision_id := getattr(page, "live_revision_id", None)):
+        return None
+    cache = get_manifest_cache()
+    if cache is not None and is_current(manifest := cache.get(manifest_key(revision_id))):
+        return manifest
+    manifest = RenderManifest.objects.filter(revision_id=revision_id).values_list("manifest", flat=True).first()
+    if not is_current(manifest):
+        return None
+    if cache is not None:
+        cache.set(manifest_key(revision_id), manifest)
+    return manifest
+
+
+def merge_render_manifests(*manifests: dict) -> dict:
+    """Combine the manifests of a page and its footer, taking the priority block from the first"""
+    objects, renditions, embeds = defaultdict(dict), defaultdict(set), []
+    for manifest in manifests:
+        for label, ids in manifest["objects"].items():
+            objects[label].update(dict.fromkeys(ids))
+        for image_id, specs in manifest["renditions"].items():
+            renditions[image_id].update(specs)
+        embeds.extend(embed for embed in manifest["embeds"] if embed not in embeds)
+    return {
+        "settings": manifests[0]["settings"],
+        "objects": {label: list(ids) for label, ids in objects.items()},
+        "renditions": {image_id: sorted(specs) for image_id, specs in renditions.items()},
+        "embeds": embeds,
+        "priority_index": manifests[0]["priority_index"],
+    }
+
+
+@receiver(page_published)
+def _save_published(sender, instance, revision=None, **kwargs):
+    from cmspage.models.cms_page import AbstractCMSPage
+
+    if isinstance(instance, AbstractCMSPage):
+        save_render_manifest(instance, revision.pk if revision else None)
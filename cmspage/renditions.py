@@ -0,0 +1,257 @@
+"""
+Image rendition specs and page-wide rendition prefetching.
+
+Each image rendered with `render_image` needs a ladder of renditions (several widths,
+in webp and the original format), and each rendition lookup is a query unless the
+image already carries its renditions.
+Blocks that render images declare the renditions they will request via
+`get_rendition_specs(value)`, so a page can collect every (image, specs) pair in its
+StreamFields and fetch all existing renditions in a single query before rendering.
+"""
+
+import re
+from collections import defaultdict
+from typing import Iterable, Iterator, List, Tuple
+
+from django.conf import settings
+from django.db.models import Prefetch, prefetch_related_objects
+
+from cmspage.mixins import CMSTemplateMixin
+
+__all__ = (
+    "RAW_SIZES",
+    "ORIENTATIONS",
+    "IMAGE_SIZES",
+    "CMSPAGE_IMAGE_FORMATS",
+    "CMSPAGE_IMAGE_SRCSET_WIDTHS",
+    "CMSPAGE_IMAGE_EAGER_BLOCKS",
+    "CMSPAGE_IMAGE_PRELOAD",
+    "srcset_widths",
+    "image_formats",
+    "format_spec",
+    "image_ladder",
+    "ladder_options",
+    "image_specs",
+    "image_srcset",
+    "image_sizes",
+    "eager_blocks",
+    "image_loading",
+    "priority_block_index",
+    "stream_rendition_specs",
+    "prefetch_renditions",
+)
+
+# Settings
+CMSPAGE_IMAGE_FORMATS = "CMSPAGE_IMAGE_FORMATS"
+CMSPAGE_IMAGE_SRCSET_WIDTHS = "CMSPAGE_IMAGE_SRCSET_WIDTHS"
+CMSPAGE_IMAGE_EAGER_BLOCKS = "CMSPAGE_IMAGE_EAGER_BLOCKS"
+CMSPAGE_IMAGE_PRELOAD = "CMSPAGE_IMAGE_PRELOAD"
+
+# Default settings
+DEFAULT_IMAGE_FORMATS = ["webp"]
+DEFAULT_SRCSET_WIDTHS = [160, 320, 480, 640, 800, 1200, 1600]
+DEFAULT_EAGER_BLOCKS = 2
+
+# Image loading choices
+LOADING_AUTO = "auto"
+LOADING_EAGER = "eager"
+LOADING_LAZY = "lazy"
+LOADING_PRIORITY = "priority"
+
+DIMENSIONS = re.compile(r"^(\d+)x(\d+)$")
+
+RAW_SIZES = {  # landscape (width, height),
+    # portrait (width, height),
+    # square (width, height),
+    # extrawide (width, height)
+    "tiny": ((150, 100), (100, 150), (150, 150), (450, 150)),
+    "small": ((300, 200), (200, 300), (300, 300), (900, 300)),
+    "medium": ((480, 320), (320, 480), (480, 480), (1440, 480)),
+    "large": ((600, 400), (400, 600), (600, 600), (1800, 600)),
+    "full_width": ((800, 533), (533, 800), (800, 800), (2400, 800)),
+    "original": ((None, None), (None, None), (None, None), (None, None)),
+}
+
+ORIENTATIONS = ["landscape", "portrait", "square", "extrawide"]
+
+IMAGE_SIZES = {}
+for orientation_index, orientation in enumerate(ORIENTATIONS):
+    IMAGE_SIZES[orientation] = {}
+    for size, size_tuple in RAW_SIZES.items():
+        dims = size_tuple[orientation_index]
+        IMAGE_SIZES[orientation][size] = "original" if dims[0] is None else f"{dims[0]}x{dims[1]}"
+
+
+def srcset_widths() -> List[int]:
+    """Return the widths available to rendition ladders"""
+    return sorted(getattr(settings, CMSPAGE_IMAGE_SRCSET_WIDTHS, None) or DEFAULT_SRCSET_WIDTHS)
+
+
+def image_formats() -> List[str]:
+    """Return the image formats offered as <source> elements, most preferred first"""
+    formats = getattr(settings, CMSPAGE_IMAGE_FORMATS, None)
+    return CMSTemplateMixin.to_list(DEFAULT_IMAGE_FORMATS if formats is None else formats)
+
+
+def format_spec(spec: str, image_format: str | None = None) -> str:
+    """Return the spec converting the rendition to image_format, joined with "|" as the {% image %} tag does"""
+    return f"{spec}|format-{image_format}" if image_format else spec
+
+
+def image_ladder(
+    orientation: str = "landscape",
+    size: str = "medium",
+    size_prefix: str = "fill",
+    crop: str | int = None,
+) -> List[Tuple[int | None, str]]:
+    """
+    Return the rendition ladder for an orientation and size as (width, spec) pairs,
+    smallest first. The ladder holds each of the srcset widths below the nominal
+    width of the size, and the nominal size itself, all with the same aspect ratio.
+    The size may also be given directly as "<width>x<height>". Original size and
+    other specs (e.g. "width-400") are not laddered and have a width of None.
+    """
+    dimensions = IMAGE_SIZES.get(orientation, {}).get(size) or size
+    if dimensions == "original":
+        return [(None, "original")]
+    if not (match := DIMENSIONS.match(str(dimensions))):
+        return [(None, size)]
+
+    width, height = int(match[1]), int(match[2])
+    cropping = f"-c{crop}" if crop and size_prefix == "fill" else ""
+    widths = [ladder_width for ladder_width in srcset_widths() if ladder_width < width] + [width]
+    return [
+        (ladder_width, f"{size_prefix}-{ladder_width}x{round(ladder_width * height / width)}{cropping}")
+        for ladder_width in widths
+    ]
+
+
+def ladder_options(options: dict) -> dict:
+    """Return the `render_image` options that select the rendition ladder"""
+    return {name: value for name, value in options.items() if name in ("orientation", "size", "size_prefix", "crop")}
+
+
+def image_specs(
+    orientation: str = "landscape",
+    size: str = "medium",
+    size_prefix: str = "fill",
+    crop: str | int = None,
+) -> Tuple[str, ...]:
+    """
+    Return every rendition filter spec `render_image` requests for an orientation,
+    size and crop: the ladder in each configured format, then the fallback ladder.
+    """
+    ladder = image_ladder(orientation, size, size_prefix, crop)
+    return tuple(
+        format_spec(spec, image_format) for image_format in image_formats() + [None] for _, spec in ladder
+    )
+
+
+def image_srcset(renditions: dict, ladder: List[Tuple[int | None, str]], image_format: str | None = None) -> str:
+    """Return the srcset for a ladder, given the renditions keyed by spec"""
+    urls = ((width, renditions[format_spec(spec, image_format)].url) for width, spec in ladder)
+    return ", ".join(f"{url} {width}w" if width else url for width, url in urls)
+
+
+def image_sizes(ladder: List[Tuple[int | None, str]]) -> str | None:
+    """Return the default sizes attribute for a ladder: full viewport width up to the nominal width"""
+    if nominal_width := ladder[-1][0]:
+        return f"(max-width: {nominal_width}px) 100vw, {nominal_width}px"
+    return None
+
+
+def eager_blocks() -> int:
+    """Return the number of leading page blocks whose images load eagerly"""
+    eager = getattr(settings, CMSPAGE_IMAGE_EAGER_BLOCKS, None)
+    return DEFAULT_EAGER_BLOCKS if eager is None else int(eager)
+
+
+def image_loading(loading: str | None = None, block_index: int | None = None, priority: bool = False) -> dict:
+    """
+    Return the loading related <img> attributes for a block's images.
+    With automatic loading, images in the first `CMSPAGE_IMAGE_EAGER_BLOCKS` blocks load
+    eagerly, the page's priority image is fetched with high priority and everything
+    else (including blocks outside the page body, such as the footer) loads lazily.
+    """
+    if not loading or loading == LOADING_AUTO:
+        if priority:
+            loading = LOADING_PRIORITY
+        elif block_index is not None and block_index < eager_blocks():
+            loading = LOADING_EAGER
+        else:
+            loading = LOADING_LAZY
+    if loading == LOADING_PRIORITY:
+        return {"fetchpriority": "high"}
+    if loading == LOADING_LAZY:
+        return {"loading": "lazy", "decoding": "async"}
+    return {}
+
+
+def priority_block_index(stream_value) -> int | None:
+    """
+    Return the index of the block holding the page's priority image, the likely
+    largest contentful paint: the first block explicitly set to priority loading,
+    or else the first block with automatic loading within the eager blocks that is
+    a priority candidate (such as a hero or large image) and has an image.
+    """
+
+    def loading(bound_block):
+        return bound_block.value.get("loading") if hasattr(bound_block.value, "get") else None
+
+    image_blocks = [
+        (index, bound_block)
+        for index, bound_block in enumerate(stream_value or ())
+        if hasattr(bound_block.block, "get_image_options")
+    ]
+    for index, bound_block in image_blocks:
+        if loading(bound_block) == LOADING_PRIORITY:
+            return index
+    for index, bound_block in image_blocks:
+        if index >= eager_blocks():
+            break
+        if (
+            loading(bound_block) in (None, "", LOADING_AUTO)
+            and getattr(bound_block.block, "priority_candidate", False)
+            and next(iter(bound_block.block.get_image_options(bound_block.value)), None)
+        ):
+            return index
+    return None
+
+
+def stream_rendition_specs(stream_value) -> Iterator[Tuple[object, Iterable[str]]]:
+    """
+    Yield (image, specs) for every block in a StreamField value whose block
+    declares its renditions with `get_rendition_specs(value)`.
+    """
+    for bound_block in stream_value or ():
+        if get_rendition_specs := getattr(bound_block.block, "get_rendition_specs", None):
+            yield from get_rendition_specs(bound_block.value)
+
+
+def prefetch_renditions(images_and_specs: Iterable[Tuple[object, Iterable[str]]]) -> int:
+    """
+    Fetch the existing renditions for all (image, specs) pairs in one query per image
+    model, attaching them to each image as `prefetched_renditions` so that subsequent
+    rendition lookups on those image instances are answered from memory.
+    Renditions that do not exist yet are still generated on first use.
+    Returns the number of images prefetched.
+    """
+    images_by_model = defaultdict(dict)
+    specs_by_model = defaultdict(set)
+    for image, specs in images_and_specs:
+        if image is None or getattr(image, "pk", None) is None:
+            continue
+        images_by_model[type(image)][id(image)] = image
+        specs_by_model[type(image)].update(specs)
+
+    for image_model, images in images_by_model.items():
+        rendition_model = image_model.get_rendition_model()
+        prefetch_related_objects(
+            list(images.values()),
+            Prefetch(
+                "renditions",
+                queryset=rendition_model.objects.filter(filter_spec__in=sorted(specs_by_model[image_model])),
+                to_attr="prefetched_renditions",
+            ),
+        )
+    return sum(len(images) for images in images_by_model.values())
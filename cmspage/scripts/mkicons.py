@@ -1,20 +1,64 @@
 #!/usr/bin/env python3
 """
-Generate a Django model.TextChoices for SVG icons.
+Generate a Django model.TextChoices for SVG icons, and an SVG sprite.
 
 This script scans one or more directories for SVG files and creates
 a module containing a Django TextChoices class with entries for each icon.
 
+With --optimize, the SVGs in a source directory are first optimised into the icon
+directory (minified, stripped of metadata, class based styles inlined and black
+icons normalised to currentColor) across a pool of processes, with a report
+of the size savings, and the choices and sprite are generated from the optimised set.
+
+It also writes a sprite holding each icon as a <symbol>, which the
+{% cmspage_icon %} template tag references with <use href="#id"> instead of
+inlining each icon's SVG every time it is used. The sprite may be subset to the
+icons actually in use with --subset.
+
 If using the default output, this must be run from the root of the cmspage app directory.
 """
 
+import re
 import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Set, Generator
+from typing import Dict, Iterable, List, Set, Generator
 import argparse
 
 OUTFILE_NAME = "models/choice_icon.py"
+SPRITE_NAME = "templates/cmspage/icon_sprite.svg"
 TEMPLATES_PREFIX = "templates/"
+ICONS_DIR = "./templates/cmspage/icons"
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+# Root attributes that describe the standalone document rather than the drawing
+SYMBOL_DROP_ATTRIBUTES = {"width", "height", "x", "y", "id", "version", "enable-background", "xml:space"}
+# Elements that do not contribute to the drawing
+SYMBOL_DROP_ELEMENTS = {"metadata", "title", "desc", "sodipodi:namedview"}
+CSS_CLASS = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+URL_REFERENCE = re.compile(r"url\(\s*#([^)\s]+)\s*\)")
+ENABLE_BACKGROUND = re.compile(r"enable-background\s*:[^;]*;?\s*")
+WHITESPACE = re.compile(r"\s+")
+
+# Optimisation
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_RULE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+CSS_CLASS_SELECTOR = re.compile(r"^\.-?[_a-zA-Z][\w-]*$")
+HEX_COLOR = re.compile(r"^#[0-9a-f]{3}([0-9a-f]{3})?$")
+PATH_TOKEN = re.compile(r"[A-DF-Za-df-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|(?P<invalid>[^\s,])")
+COLOR_PROPERTIES = ("fill", "stroke", "stop-color")
+NOT_COLORS = {"", "none", "transparent", "currentcolor", "inherit"}
+NAMED_COLORS = {"black": "#000000", "white": "#ffffff"}
+# Only black (the default fill) is normalised, brand and other colours are kept
+NORMALISED_COLORS = {"#000000"}
+# CSS properties that are also SVG presentation attributes
+PRESENTATION_ATTRIBUTES = {
+    "clip-path", "clip-rule", "color", "display", "fill", "fill-opacity", "fill-rule", "filter", "mask",
+    "opacity", "stop-color", "stop-opacity", "stroke", "stroke-dasharray", "stroke-dashoffset",
+    "stroke-linecap", "stroke-linejoin", "stroke-miterlimit", "stroke-opacity", "stroke-width", "visibility",
+}
 
 
 def generate_icons_module(icon_dirs: List[str], recursive: bool = False) -> (int, int, str):
@@ -70,6 +114,362 @@ def generate_icons_module(icon_dirs: List[str], recursive: bool = False) -> (int
     return count, dir_count, "\n".join(content)
 
 
+def icon_id(icon_path: str) -> str:
+    """
+    Return the sprite symbol id for an icon template path,
+    e.g. "cmspage/icons/tech/cloud.svg" -> "cmspage-icons-tech-cloud".
+    cmspage.icons.icon_id() must return the same id.
+    """
+    return re.sub(r"[^\w-]+", "-", icon_path.removesuffix(".svg")).strip("-")
+
+
+def _local_name(name: str) -> str:
+    """Strip the namespace from an element or attribute name, keeping known prefixes"""
+    if name.startswith(f"{{{SVG_NS}}}"):
+        return name[len(SVG_NS) + 2:]
+    if name.startswith(f"{{{XLINK_NS}}}"):
+        return name[len(XLINK_NS) + 2:]  # SVG 2 uses plain href
+    if name == "{http://www.w3.org/XML/1998/namespace}space":
+        return "xml:space"
+    if name.startswith("{"):
+        namespace, local = name[1:].split("}", 1)
+        return f"{'sodipodi' if 'sodipodi' in namespace else 'inkscape' if 'inkscape' in namespace else 'ns'}:{local}"
+    return name
+
+
+def svg_symbol(icon_file: Path, symbol_id: str) -> str:
+    """
+    Convert an SVG icon into a <symbol> for the sprite.
+    Document attributes, metadata and editor namespaces are removed, whitespace is
+    collapsed, and class names and ids are prefixed with the symbol id so that the
+    icons' <style> blocks and references do not collide once they share a document.
+    """
+    root = ET.parse(icon_file).getroot()
+    prefix = f"{symbol_id}-"
+
+    def scope_css(css: str) -> str:
+        css = CSS_CLASS.sub(lambda match: f".{prefix}{match[1]}", css)
+        return URL_REFERENCE.sub(lambda match: f"url(#{prefix}{match[1]})", css)
+
+    def scope_attribute(name: str, value: str) -> str:
+        if name == "class":
+            return " ".join(f"{prefix}{css_class}" for css_class in value.split())
+        if name == "id":
+            return f"{prefix}{value}"
+        if name == "href" and value.startswith("#"):
+            return f"#{prefix}{value[1:]}"
+        if name == "style":
+            value = ENABLE_BACKGROUND.sub("", value)
+        return URL_REFERENCE.sub(lambda match: f"url(#{prefix}{match[1]})", WHITESPACE.sub(" ", value).strip())
+
+    def convert(element: ET.Element) -> ET.Element | None:
+        tag = _local_name(element.tag)
+        if tag in SYMBOL_DROP_ELEMENTS or ":" in tag:
+            return None
+        converted = ET.Element(tag)
+        for name, value in element.attrib.items():
+            name = _local_name(name)
+            if ":" not in name and (value := scope_attribute(name, value)):
+                converted.set(name, value)
+        text = (element.text or "").strip()
+        converted.text = scope_css(WHITESPACE.sub(" ", text)) if tag == "style" else (text or None)
+        for child in element:
+            if (converted_child := convert(child)) is not None:
+                converted.append(converted_child)
+        return converted
+
+    symbol = convert(root)
+    symbol.tag = "symbol"
+    for name in SYMBOL_DROP_ATTRIBUTES:
+        symbol.attrib.pop(name, None)
+    if style := symbol.get("style"):
+        symbol.set("style", style)
+    else:
+        symbol.attrib.pop("style", None)
+    if "viewBox" not in root.attrib:
+        width, height = (re.sub(r"[^\d.]", "", root.get(name, "")) for name in ("width", "height"))
+        if width and height:
+            symbol.set("viewBox", f"0 0 {width} {height}")
+    attributes = dict(symbol.attrib)
+    symbol.attrib.clear()
+    symbol.set("id", symbol_id)
+    symbol.attrib.update(attributes)
+    return ET.tostring(symbol, encoding="unicode", short_empty_elements=True)
+
+
+def _css_declarations(css: str) -> List[tuple]:
+    """Split CSS declarations into (property, value) pairs"""
+    declarations = []
+    for declaration in css.split(";"):
+        if ":" in declaration:
+            name, value = declaration.split(":", 1)
+            if (name := name.strip().lower()) and (value := value.strip()):
+                declarations.append((name, value))
+    return declarations
+
+
+def _css_text(declarations: Iterable[tuple]) -> str:
+    return ";".join(f"{name}:{value}" for name, value in declarations)
+
+
+def _css_rules(css: str) -> List[tuple] | None:
+    """
+    Return the rules of a stylesheet as (class names, declarations), or None if it uses
+    anything other than plain class selectors (such as @media or element selectors)
+    """
+    css = CSS_COMMENT.sub("", css)
+    rules = []
+    for match in CSS_RULE.finditer(css):
+        selectors = [selector.strip() for selector in match[1].split(",")]
+        if not all(CSS_CLASS_SELECTOR.match(selector) for selector in selectors):
+            return None
+        rules.append(([selector[1:] for selector in selectors], _css_declarations(match[2])))
+    if CSS_RULE.sub("", css).strip():
+        return None
+    return rules
+
+
+def _normal_color(value: str) -> str | None:
+    """Return a color value in a comparable form, or None if the value is not a plain color"""
+    value = value.strip().lower()
+    if value in NOT_COLORS or value.startswith("url("):
+        return None
+    if HEX_COLOR.match(value) and len(value) == 4:
+        value = "#" + "".join(digit * 2 for digit in value[1:])
+    return NAMED_COLORS.get(value, value)
+
+
+def _format_number(value: float) -> str:
+    number = f"{round(value, 3):.3f}".rstrip("0").rstrip(".")
+    number = "0" if number == "-0" else number
+    return number.replace("0.", ".", 1) if number.startswith(("0.", "-0.")) else number
+
+
+def _minify_path(data: str) -> str:
+    """
+    Round coordinates to 3 decimal places and remove redundant separators in path data.
+    Data with arcs (whose flags may be written without separators) or that cannot be
+    parsed is only collapsed.
+    """
+    tokens = list(PATH_TOKEN.finditer(data))
+    if any(token["invalid"] or token[0] in "Aa" for token in tokens):
+        return WHITESPACE.sub(" ", data).strip()
+    minified = []
+    previous = None
+    for token in tokens:
+        if token[0].isalpha():
+            minified.append(token[0])
+            previous = None
+            continue
+        number = _format_number(float(token[0]))
+        if previous is not None and not (number[0] == "-" or (number[0] == "." and "." in previous)):
+            minified.append(" ")
+        minified.append(number)
+        previous = number
+    return "".join(minified)
+
+
+def optimize_svg(source: str) -> str:
+    """
+    Optimise an SVG icon for inlining:
+
+    - strip comments, metadata, editor namespaces and document-only attributes
+    - inline class-based <style> rules as presentation attributes, removing the
+      class names (which collide between icons on the same page) and unused classes
+    - normalise black icons (including implicitly black ones) to currentColor, so that
+      they take the color of the surrounding text; icons in any other color (such as
+      brand colors) keep it
+    - collapse whitespace, round path coordinates and unwrap attribute-less groups
+    """
+    ET.register_namespace("", SVG_NS)
+    root = ET.fromstring(source)
+
+    # Strip elements and attributes that do not contribute to the drawing
+    def strip(element: ET.Element) -> ET.Element | None:
+        tag = _local_name(element.tag)
+        if tag in SYMBOL_DROP_ELEMENTS or ":" in tag:
+            return None
+        stripped = ET.Element(tag)
+        for name, value in element.attrib.items():
+            name = _local_name(name)
+            value = WHITESPACE.sub(" ", value).strip()
+            if name == "style":
+                value = _css_text(
+                    (prop, prop_value)
+                    for prop, prop_value in _css_declarations(value)
+                    if prop not in ("enable-background",)
+                )
+            if name in ("d", "points"):
+                value = _minify_path(value)
+            if ":" not in name and value:
+                stripped.set(name, value)
+        text = WHITESPACE.sub(" ", element.text or "").strip()
+        stripped.text = text or None
+        for child in element:
+            if (stripped_child := strip(child)) is not None:
+                stripped.append(stripped_child)
+        return stripped
+
+    root = strip(root)
+    for name in ("version", "id", "xml:space", "enable-background"):
+        root.attrib.pop(name, None)
+    for name in ("x", "y"):
+        if root.get(name) in ("0", "0px"):
+            del root.attrib[name]
+
+    # Inline class based stylesheets
+    parents = {child: parent for parent in root.iter() for child in parent}
+    for style in [element for element in root.iter() if element.tag == "style"]:
+        if (rules := _css_rules(style.text or "")) is None:
+            style.text = WHITESPACE.sub(" ", CSS_COMMENT.sub("", style.text or "")).strip()
+            continue
+        for element in root.iter():
+            if not (classes := set((element.get("class") or "").split())):
+                continue
+            inline_style = dict(_css_declarations(element.get("style", "")))
+            extra_style = {}
+            for rule_classes, declarations in rules:
+                if classes & set(rule_classes):
+                    for name, value in declarations:
+                        if name in inline_style:
+                            continue  # inline style wins over the stylesheet
+                        if name in PRESENTATION_ATTRIBUTES:
+                            element.set(name, value)
+                        else:
+                            extra_style[name] = value
+            if extra_style:
+                element.set("style", _css_text({**extra_style, **inline_style}.items()))
+            del element.attrib["class"]
+        parent = parents[style]
+        parent.remove(style)
+        if parent.tag == "defs" and not len(parent) and parent is not root:
+            parents[parent].remove(parent)
+
+    # Remove class names that no remaining stylesheet uses
+    stylesheets = " ".join(element.text or "" for element in root.iter() if element.tag == "style")
+    used_classes = {match[1] for match in CSS_CLASS.finditer(stylesheets)}
+    for element in root.iter():
+        if classes := element.get("class"):
+            if classes := " ".join(css_class for css_class in classes.split() if css_class in used_classes):
+                element.set("class", classes)
+            else:
+                del element.attrib["class"]
+
+    # Normalise black icons to currentColor
+    colors = set()
+    for element in root.iter():
+        for name in COLOR_PROPERTIES:
+            if (color := _normal_color(element.get(name, ""))) is not None:
+                colors.add(color)
+        for name, value in _css_declarations(element.get("style", "")):
+            if name in COLOR_PROPERTIES and (color := _normal_color(value)) is not None:
+                colors.add(color)
+    if colors <= NORMALISED_COLORS:
+        for element in root.iter():
+            for name in COLOR_PROPERTIES:
+                if _normal_color(element.get(name, "")) is not None:
+                    element.set(name, "currentColor")
+            if style := element.get("style"):
+                element.set(
+                    "style",
+                    _css_text(
+                        (name, "currentColor" if name in COLOR_PROPERTIES and _normal_color(value) else value)
+                        for name, value in _css_declarations(style)
+                    ),
+                )
+        if not colors and "fill" not in root.attrib:
+            root.set("fill", "currentColor")  # the default fill is black
+
+    # Unwrap groups without attributes
+    def unwrap(element: ET.Element):
+        children = []
+        for child in element:
+            unwrap(child)
+            if child.tag == "g" and not child.attrib:
+                children.extend(child)
+            else:
+                children.append(child)
+        element[:] = children
+
+    unwrap(root)
+
+    root.tag = f"{{{SVG_NS}}}svg"
+    for element in root.iter():
+        if not element.tag.startswith("{"):
+            element.tag = f"{{{SVG_NS}}}{element.tag}"
+    return ET.tostring(root, encoding="unicode", short_empty_elements=True)
+
+
+def optimize_icon(source: Path, destination: Path) -> tuple:
+    """Optimise a single icon file, returning (destination, original size, optimised size)"""
+    optimized = optimize_svg(source.read_text(encoding="utf-8")) + "\n"
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    destination.write_text(optimized, encoding="utf-8")
+    return destination, source.stat().st_size, len(optimized.encode("utf-8"))
+
+
+def optimize_icons(source_dir: str, output_dir: str, jobs: int | None = None) -> List[tuple]:
+    """
+    Optimise every SVG under source_dir into the same relative path under output_dir,
+    across a pool of processes. Returns (destination, original size, optimised size) per icon.
+    """
+    sources = sorted(Path(source_dir).glob("**/*.svg"))
+    destinations = [Path(output_dir) / source.relative_to(source_dir) for source in sources]
+    if jobs == 1:
+        return list(map(optimize_icon, sources, destinations))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(optimize_icon, sources, destinations, chunksize=8))
+
+
+def size_report(results: List[tuple], output_dir: str) -> str:
+    """Return a report of the size of each icon before and after optimisation"""
+
+    def saving(original, optimized):
+        return f"{100 * (original - optimized) / original:5.1f}%" if original else "    -"
+
+    lines = [f"{'Icon':<48} {'Original':>9} {'Optimised':>9} {'Saving':>7}"]
+    for destination, original, optimized in sorted(results):
+        icon = Path(destination).relative_to(output_dir).as_posix()
+        lines.append(f"{icon:<48} {original:>9} {optimized:>9} {saving(original, optimized):>7}")
+    original_total = sum(original for _, original, _ in results)
+    optimized_total = sum(optimized for _, _, optimized in results)
+    lines.append(f"{f'Total ({len(results)} icons)':<48} {original_total:>9} {optimized_total:>9} "
+                 f"{saving(original_total, optimized_total):>7}")
+    return "\n".join(lines)
+
+
+def generate_sprite(icons: Iterable[str], icon_files: Dict[str, Path]) -> (int, str):
+    """Return the sprite document holding a symbol for each icon"""
+    symbols = [svg_symbol(icon_files[icon], icon_id(icon)) for icon in icons]
+    content = [f'<svg xmlns="{SVG_NS}" style="display:none">', *symbols, "</svg>"]
+    return len(symbols), "\n".join(content)
+
+
+def find_icons(icon_dirs: List[str], recursive: bool = False) -> Dict[str, Path]:
+    """Return the icon files found, keyed by their path relative to the templates directory"""
+    icon_files = {}
+    for icon_dir in icon_dirs:
+        pattern = "**/*.svg" if recursive else "*.svg"
+        for icon_file in sorted(Path(icon_dir).glob(pattern)):
+            icon_str = icon_file.as_posix()
+            if TEMPLATES_PREFIX in icon_str:
+                icon_str = icon_str[icon_str.index(TEMPLATES_PREFIX) + len(TEMPLATES_PREFIX):]
+            icon_files[icon_str] = icon_file
+    return icon_files
+
+
+def subset_icons(icons: Iterable[str], subset: Iterable[str] | None) -> List[str]:
+    """
+    Return the icons named in the subset, by path, file name or stem
+    (e.g. "cmspage/icons/tech/cloud.svg", "cloud.svg" or "cloud"), or all icons without one
+    """
+    icons = list(icons)
+    if not subset:
+        return icons
+    wanted = {name.strip() for name in subset if name.strip()}
+    return [icon for icon in icons if {icon, Path(icon).name, Path(icon).stem} & wanted]
+
+
 def write_module(content: str, filename: str):
     if filename == "-":
         sys.stdout.write(content)
@@ -80,6 +480,17 @@ def write_module(content: str, filename: str):
         print(f"Icons module has been generated in '{output_path.absolute()}'", file=sys.stderr)
 
 
+def write_sprite(content: str, filename: str):
+    if filename == "-":
+        sys.stdout.write(content)
+        sys.stdout.write("\n")
+    else:
+        output_path = Path(filename)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(content + "\n")
+        print(f"Icon sprite has been generated in '{output_path.absolute()}'", file=sys.stderr)
+
+
 def process_paths(paths: List[str], icon_dirs: Set[str]) -> Set[str]:
     if paths is not None:
         for path in paths:
@@ -97,15 +508,48 @@ def main():
         "-o", "--output", default=OUTFILE_NAME, help=f"Output to ('-' = stdout, default={OUTFILE_NAME})"
     )
     parser.add_argument("-r", "--recursive", action="store_true", help="Recursively search for SVG icons")
+    parser.add_argument(
+        "-s", "--sprite", default=SPRITE_NAME, help=f"Sprite output ('-' = stdout, '' = none, default={SPRITE_NAME})"
+    )
+    parser.add_argument(
+        "--subset",
+        action="append",
+        help="Only include these icons in the sprite, by path, file name or stem (comma separated, multiple allowed)",
+    )
+    parser.add_argument(
+        "-O",
+        "--optimize",
+        metavar="SOURCE_DIR",
+        help=f"Optimise the SVG icons in SOURCE_DIR into the first icon directory (default={ICONS_DIR})",
+    )
+    parser.add_argument("-j", "--jobs", type=int, help="Number of processes used to optimise icons (default=all cpus)")
+    parser.add_argument("--report", help="Write the optimisation size report to this file (default=stderr)")
     parser.add_argument("paths", type=str, nargs="*", help="Directories containing SVG icons (multiple allowed)")
     args = parser.parse_args()
 
-    icon_dirs = process_paths(args.paths, {"./templates/cmspage/icons"})
+    icon_dirs = process_paths(args.paths, {ICONS_DIR})
 
-    count, dir_count, module_content = generate_icons_module(list(icon_dirs), args.recursive or False)
+    if args.optimize:
+        output_dir = args.paths[0] if args.paths else ICONS_DIR
+        results = optimize_icons(args.optimize, output_dir, args.jobs)
+        report = size_report(results, output_dir)
+        if args.report:
+            Path(args.report).write_text(report + "\n")
+            print(f"Size report has been written to '{Path(args.report).absolute()}'", file=sys.stderr)
+        else:
+            print(report, file=sys.stderr)
+
+    count, dir_count, module_content = generate_icons_module(sorted(icon_dirs), args.recursive or False)
     print(f"Generated {count} icons from {dir_count} directories", file=sys.stderr)
     write_module(module_content, args.output)
 
+    if args.sprite:
+        icon_files = find_icons(sorted(icon_dirs), args.recursive or False)
+        subset = [name for names in args.subset or () for name in names.split(",")]
+        count, sprite_content = generate_sprite(subset_icons(sorted(icon_files), subset), icon_files)
+        print(f"Generated sprite with {count} icons", file=sys.stderr)
+        write_sprite(sprite_content, args.sprite)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,211 @@
+"""
+Build-time template resolution manifest.
+
+Resolving a page or include template probes every combination of the configured
+template styles against every template engine. The results are cached per process,
+but each cold worker pays the probing cost on its first requests.
+
+The `build_template_manifest` management command resolves every page and include
+template once and writes the winners to a JSON manifest. When the
+CMSPAGE_TEMPLATE_MANIFEST setting names that file, `CMSTemplateMixin` answers
+template lookups from the manifest and skips filesystem probing entirely.
+
+The manifest carries a checksum of the template configuration it was built for
+(styles, template settings, engines and installed apps). A manifest whose checksum
+does not match the running configuration is ignored with a warning, so a stale
+manifest degrades to normal probing rather than serving the wrong templates.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template import engines
+
+from cmspage.mixins import (
+    CMSTemplateMixin,
+    CMSPAGE_TEMPLATE_BASE,
+    CMSPAGE_TEMPLATE_BASE_DIR,
+    CMSPAGE_TEMPLATE_INCLUDE_DIR,
+    CMSPAGE_TEMPLATE_INCLUDE_FILES,
+    CMSPAGE_TEMPLATE_INCLUDE_FILES_EXTRA,
+    CMSPAGE_TEMPLATE_MANIFEST,
+    CMSPAGE_TEMPLATE_STYLES,
+)
+
+__all__ = (
+    "MANIFEST_VERSION",
+    "configured_styles",
+    "configuration_checksum",
+    "resolve_templates",
+    "build_manifest",
+    "write_manifest",
+    "read_manifest",
+    "load_manifest",
+    "clear_manifest",
+    "lookup_template",
+)
+
+MANIFEST_VERSION = 1
+
+_logger = logging.getLogger("cmspage")
+
+# None: not yet loaded, False: no usable manifest, dict: the loaded manifest
+_manifest: dict | bool | None = None
+
+
+def configured_styles() -> List[str]:
+    """Return the template styles as configured in settings"""
+    return CMSTemplateMixin.to_list(getattr(settings, CMSPAGE_TEMPLATE_STYLES, None))
+
+
+def configuration_checksum(styles: Iterable[str]) -> str:
+    """
+    Return a checksum of everything that influences template resolution, so that
+    a manifest built for a different configuration is detected.
+    """
+    fingerprint = {
+        "styles": list(styles),
+        "settings": {
+            name: getattr(settings, name, None)
+            for name in (
+                CMSPAGE_TEMPLATE_BASE,
+                CMSPAGE_TEMPLATE_BASE_DIR,
+                CMSPAGE_TEMPLATE_INCLUDE_DIR,
+                CMSPAGE_TEMPLATE_INCLUDE_FILES,
+                CMSPAGE_TEMPLATE_INCLUDE_FILES_EXTRA,
+            )
+        },
+        "engines": [
+            {
+                "name": engine.name,
+                "dirs": [str(directory) for directory in getattr(engine.engine, "dirs", [])],
+                "app_dirs": getattr(engine.engine, "app_dirs", None),
+            }
+            for engine in engines.all()
+        ],
+        "apps": [app_config.name for app_config in apps.get_app_configs()],
+    }
+    encoded = json.dumps(fingerprint, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _template_models():
+    return [
+        model
+        for model in apps.get_models()
+        if issubclass(model, CMSTemplateMixin) and not model._meta.abstract
+    ]
+
+
+def resolve_templates(styles: Optional[List[str]] = None) -> Dict[str, str | None]:
+    """
+    Resolve every page template and include template of every model using
+    CMSTemplateMixin, returning a map of requested template path to the winning
+    template (or None when no candidate exists).
+    """
+    styles = configured_styles() if styles is None else list(styles)
+    template_paths = set()
+    for model in _template_models():
+        for attr in ("template", "ajax_template"):
+            if template_name := getattr(model, attr, None):
+                template_paths.add(template_name)
+        # Include resolution only depends on class attributes and settings, so skip
+        # Model.__init__, which may query the database for field defaults
+        template_paths.update(model.__new__(model).get_include_templates().values())
+
+    return {
+        template_path: CMSTemplateMixin.probe_template(template_path, *styles)
+        for template_path in sorted(template_paths)
+    }
+
+
+def build_manifest(styles: Optional[List[str]] = None) -> dict:
+    """Resolve all templates and return the manifest content"""
+    styles = configured_styles() if styles is None else list(styles)
+    return {
+        "version": MANIFEST_VERSION,
+        "styles": styles,
+        "checksum": configuration_checksum(styles),
+        "templates": resolve_templates(styles),
+    }
+
+
+def write_manifest(manifest: dict, path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def read_manifest(path: str | Path) -> dict | None:
+    """Read a manifest file, returning None if it is missing or unreadable"""
+    try:
+        manifest = json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        _logger.warning("Template manifest %s not found, probing templates instead", path)
+        return None
+    except (OSError, ValueError):
+        _logger.warning("Template manifest %s is unreadable, probing templates instead", path, exc_info=True)
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        _logger.warning("Template manifest %s has an unsupported format, probing templates instead", path)
+        return None
+    return manifest
+
+
+def load_manifest(force: bool = False) -> dict | None:
+    """
+    Load the manifest named by CMSPAGE_TEMPLATE_MANIFEST once per process.
+    Returns None when no manifest is configured or the manifest does not
+    match the running configuration.
+    """
+    global _manifest
+    if _manifest is None or force:
+        _manifest = False
+        if path := getattr(settings, CMSPAGE_TEMPLATE_MANIFEST, None):
+            manifest = read_manifest(path)
+            if manifest is not None:
+                if manifest.get("checksum") == configuration_checksum(configured_styles()):
+                    _manifest = manifest
+                else:
+                    _logger.warning(
+                        "Template manifest %s does not match the template configuration, probing templates instead",
+                        path,
+                    )
+    return _manifest or None
+
+
+def clear_manifest():
+    """Forget the loaded manifest, and any templates already resolved from it"""
+    global _manifest
+    _manifest = None
+    CMSTemplateMixin.find_existing_template.cache_clear()
+
+
+def lookup_template(template_path: str, *parts: Optional[str]) -> Tuple[bool, str | None]:
+    """
+    Look up a template in the loaded manifest. Returns (found, template_name);
+    found is False when there is no manifest, the template path was not recorded
+    or the lookup is for styles other than those the manifest was built for.
+    """
+    if (manifest := load_manifest()) is None:
+        return False, None
+    if [part for part in parts if part is not None] != manifest["styles"]:
+        return False, None
+    templates = manifest["templates"]
+    if template_path not in templates:
+        return False, None
+    return True, templates[template_path]
+
+
+@receiver(setting_changed)
+def _reset_manifest(setting, **kwargs):
+    if setting in (CMSPAGE_TEMPLATE_MANIFEST, CMSPAGE_TEMPLATE_STYLES, "TEMPLATES", "INSTALLED_APPS"):
+        clear_manifest()
@@ -1,9 +1,33 @@
 # -*- coding: utf-8 -*-
 import re
-from django.template import Template, Context
 from django import template
+from django.template.base import token_kwargs
 from django.template.loader import get_template
+from django.urls import NoReverseMatch, reverse
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
 from wagtail.images.models import Image
+from wagtail.images.shortcuts import get_renditions_or_not_found
+
+from cmspage.footer import render_footer_page
+from cmspage.fragments import render_blocks
+from cmspage.holes import is_punching, punch_hole
+from cmspage.icons import render_icon
+from cmspage.navigation import (
+    get_navigation_formatter,
+    is_bundled_template,
+    navigation_formatter_configured,
+    render_navigation_items,
+)
+from cmspage.renditions import RAW_SIZES, ORIENTATIONS, IMAGE_SIZES, image_specs  # noqa: F401
+from cmspage.renditions import (
+    format_spec,
+    image_formats as get_image_formats,
+    image_ladder,
+    image_sizes,
+    image_srcset,
+    ladder_options,
+)
 
 register = template.Library()
 
@@ -12,11 +36,27 @@ class SafeIncludeNode(template.Node):
     """
     A Node that safely includes templates, handling cases where the template variable is empty or None.
     Only suppresses errors related to missing/empty template variables, not actual template errors.
+
+    Like Django's {% include %}, the included template is rendered with the current context
+    plus a pushed layer holding the 'with' variables, rather than a flattened copy of the
+    context, and resolved templates are cached per template name for the rest of the render.
+    This keeps recursive includes (such as navigation_item.html) cheap on large menus.
     """
     def __init__(self, template_expr, extra_context=None):
         self.template_expr = template_expr
         self.extra_context = extra_context or {}
 
+    @staticmethod
+    def get_template(context, template_name):
+        """Return the template for template_name, resolving each name once per render"""
+        # render_context.dicts[0] lives for the whole top-level render and is shared by every
+        # cmspage_include node, including those in recursively included templates
+        cache = context.render_context.dicts[0].setdefault(SafeIncludeNode, {})
+        if (template_obj := cache.get(template_name)) is None:
+            # Let TemplateDoesNotExist and other template errors bubble up
+            template_obj = cache[template_name] = get_template(template_name)
+        return template_obj
+
     def render(self, context):
         template_name = None
         if not self.template_expr:
@@ -32,22 +72,24 @@ class SafeIncludeNode(template.Node):
         if not template_name:
             return ""
 
-        # Get the template - let TemplateDoesNotExist and other template errors bubble up
-        template_obj = get_template(template_name)
-
-        # Convert context to dict for template rendering
-        include_context = context.flatten()
+        template_obj = self.get_template(context, template_name)
 
-        # Merge extra context from 'with' clause
+        # Resolve extra context from 'with' clause
+        values = {}
         for key, var_expr in self.extra_context.items():
             try:
-                include_context[key] = var_expr.resolve(context)
+                values[key] = var_expr.resolve(context)
             except template.VariableDoesNotExist:
                 # If variable doesn't exist, set to None (consistent with main template handling)
-                include_context[key] = None
+                values[key] = None
 
         # Render the included template - let all template errors bubble up
-        return template_obj.render(include_context)
+        if isinstance(engine_template := getattr(template_obj, "template", None), template.Template):
+            with context.push(**values):
+                return engine_template.render(context)
+
+        # Templates from other engines (e.g. Jinja2) only accept a dict
+        return template_obj.render(context.flatten() | values)
 
 
 @register.tag("cmspage_include")
@@ -93,6 +135,129 @@ def cmspage_include(parser, token):
     return SafeIncludeNode(template_expr, extra_context)
 
 
+class HoleNode(template.Node):
+    """
+    A hole in a hole-punched page: a placeholder filled in for each request when the page is
+    hole-punched (see cmspage.holes), and otherwise its contents rendered in place.
+    """
+
+    def __init__(self, name, arguments, nodelist):
+        self.name = name
+        self.arguments = arguments
+        self.nodelist = nodelist
+
+    def render(self, context):
+        name = self.name.resolve(context)
+        if not is_punching(request := context.get("request"), name):
+            return self.nodelist.render(context)
+        arguments = {key: value.resolve(context) for key, value in self.arguments.items()}
+        return punch_hole(request, name, arguments)
+
+
+@register.tag("cmspage_hole")
+def cmspage_hole(parser, token):
+    """
+    Mark markup that varies by visitor (messages, CSRF tokens, user specific navigation) as
+    a hole, filled in by the hole's renderer for each request when the page is hole-punched,
+    so that the rest of the page can be cached for every visitor.
+
+    Usage:
+        {% cmspage_hole "csrf_token" %}{% csrf_token %}{% endcmspage_hole %}
+        {% cmspage_hole "messages" template=include.messages %}...{% endcmspage_hole %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError("cmspage_hole requires the name of the hole")
+    arguments = token_kwargs(bits[2:], parser)
+    if len(arguments) != len(bits) - 2:
+        raise template.TemplateSyntaxError("cmspage_hole arguments must be key=value pairs")
+    nodelist = parser.parse(("endcmspage_hole",))
+    parser.delete_first_token()
+    return HoleNode(parser.compile_filter(bits[1]), arguments, nodelist)
+
+
+@register.simple_tag
+def cmspage_csrf_url():
+    """
+    The URL form blocks fetch their CSRF token from when submitted, or "" if cmspage.urls is
+    not included, in which case the token is rendered in the form (in a hole).
+
+    Usage:
+        {% cmspage_csrf_url as csrf_url %}
+    """
+    try:
+        return reverse("cmspage_csrf")
+    except NoReverseMatch:
+        return ""
+
+
+@register.simple_tag(takes_context=True)
+def cmspage_navigation(context, navigation=None, item_template=None, formatter=None):
+    """
+    Render the navigation tree (by default the navigation context variable) in a single
+    pass, formatting each item with the CMSPAGE_NAVIGATION_FORMATTER (or the given
+    formatter class or dotted path) rather than including a template per item.
+
+    Usage:
+        {% cmspage_navigation navigation item_template=include.navigation_item %}
+
+    Unless a formatter is given or configured, an item_template that resolves to a file other
+    than the bundled navigation_item.html (a project override at the same path, or a style
+    specific template) is included for each item instead, so customised item templates keep
+    working.
+    """
+    if navigation is None:
+        navigation = context.get("navigation")
+    if item_template and not navigation_formatter_configured(formatter) and not is_bundled_template(item_template):
+        return render_navigation_items(navigation, item_template, context)
+    return get_navigation_formatter(formatter)(context).render(navigation)
+
+
+@register.simple_tag(takes_context=True)
+def cmspage_footer(context, site_footer=None):
+    """
+    Render the site's footer (by default the site_footer context variable), from the cache
+    once it has been rendered for the site (see cmspage.footer). Without a site_footer, the
+    page_footer context variable is rendered, uncached.
+
+    Usage:
+        {% cmspage_footer as footer %}
+        {% if footer %}{{ footer }}{% endif %}
+    """
+    if site_footer is None and (site_footer := context.get("site_footer")) is None:
+        if not (page_footer := context.get("page_footer")):
+            return mark_safe("")
+        return mark_safe(render_footer_page(page_footer, context))
+    return site_footer.render(context)
+
+
+@register.simple_tag(takes_context=True)
+def cmspage_blocks(context, stream, page=None):
+    """
+    Render the blocks of a page's StreamField, each with its block_index, as
+    {% include_block %} would in a loop, using the cached fragments of the blocks that
+    allow it (see cmspage.fragments). The fragments are those of the page (by default
+    the page context variable).
+
+    Usage:
+        {% cmspage_blocks self.body %}
+    """
+    return render_blocks(stream, context, page)
+
+
+@register.simple_tag(takes_context=True)
+def cmspage_icon(context, icon, css_class=None):
+    """
+    Render an SVG icon, given its template path, as a reference to its symbol in the icon sprite.
+    The symbol itself is added to the page on the first use of the icon.
+
+    Usage:
+        {% cmspage_icon item.icon %}
+        {% cmspage_icon "cmspage/icons/social/"|add:social.icon|add:".svg" css_class="me-1" %}
+    """
+    return render_icon(context, icon, css_class)
+
+
 @register.filter(name="embedurl")
 def get_embed_url_with_parameters(url):
     if any(youtube in url for youtube in ("youtube.com", "youtu.be")):
@@ -103,26 +268,9 @@ def get_embed_url_with_parameters(url):
     return url
 
 
-RAW_SIZES = {  # landscape (width, height),
-    # portrait (width, height),
-    # square (width, height),
-    # extrawide (width, height)
-    "tiny": ((150, 100), (100, 150), (150, 150), (450, 150)),
-    "small": ((300, 200), (200, 300), (300, 300), (900, 300)),
-    "medium": ((480, 320), (320, 480), (480, 480), (1440, 480)),
-    "large": ((600, 400), (400, 600), (600, 600), (1800, 600)),
-    "full_width": ((800, 533), (533, 800), (800, 800), (2400, 800)),
-    "original": ((None, None), (None, None), (None, None), (None, None)),
-}
-
-ORIENTATIONS = ["landscape", "portrait", "square", "extrawide"]
-
-IMAGE_SIZES = {}
-for orientation_index, orientation in enumerate(ORIENTATIONS):
-    IMAGE_SIZES[orientation] = {}
-    for size, size_tuple in RAW_SIZES.items():
-        dims = size_tuple[orientation_index]
-        IMAGE_SIZES[orientation][size] = "original" if dims[0] is None else f"{dims[0]}x{dims[1]}"
+def html_attrs(attrs: dict) -> str:
+    """Format attributes in the order given, omitting those with a value of None"""
+    return format_html_join("", ' {}="{}"', ((name, value) for name, value in attrs.items() if value is not None))
 
 
 @register.simple_tag
@@ -135,33 +283,91 @@ def render_image(
     crop: str | int = None,
     rounded: int = None,
     responsive: bool = True,
+    css_class: str = None,
+    sizes: str = None,
+    loading: str = None,
+    decoding: str = None,
+    fetchpriority: str = None,
 ):
     """
-    Creates and renders a template for the specified image rendition.
+    Renders a <source> per configured image format and a fallback <img>, each with a
+    srcset covering the rendition ladder for the orientation and size.
+    All renditions are fetched (or generated) together using Wagtail's rendition API,
+    and are answered from memory if the page prefetched them (see cmspage.renditions).
     """
-    # Get the spec or default to medium landscape
+    if not image:
+        return ""
+
     css_classes = ["img-fluid"] if responsive else []
     if rounded:
         css_classes.append(f"rounded-{rounded}")
-    css_class = f' class="{" ".join(css_classes)}"' if css_classes else ""
+    if css_class:
+        css_classes.append(css_class)
+
+    # Get the spec ladder or default to medium landscape
+    ladder = image_ladder(orientation, size, size_prefix, crop)
+    image_formats = get_image_formats()
+    renditions = get_renditions_or_not_found(
+        image, [format_spec(spec, image_format) for image_format in image_formats + [None] for _, spec in ladder]
+    )
 
-    dimensions = IMAGE_SIZES.get(orientation, {}).get(size)
-    image_size = ("original" if dimensions == "original" else f"{size_prefix}-{dimensions}") if dimensions else size
-    cropping = f"-c{crop}" if crop and dimensions != "original" else ""
+    laddered = ladder[-1][0] is not None
+    sizes = (sizes or image_sizes(ladder)) if laddered else None
+    fallback = renditions[ladder[-1][1]]
+
+    sources = [
+        format_html(
+            "<source{}>",
+            html_attrs(
+                {
+                    "type": f"image/{image_format}",
+                    "srcset": image_srcset(renditions, ladder, image_format),
+                    "sizes": sizes,
+                }
+            ),
+        )
+        for image_format in image_formats
+    ]
+    img_attrs = {
+        "src": fallback.url,
+        "srcset": image_srcset(renditions, ladder) if laddered else None,
+        "sizes": sizes,
+        "width": fallback.width or None,
+        "height": fallback.height or None,
+        "alt": alt_text or image.title or image.description or None,
+        "class": " ".join(css_classes) or None,
+        "loading": loading or None,
+        "decoding": decoding or None,
+        "fetchpriority": fetchpriority or None,
+    }
+    return mark_safe("\n".join(sources + [format_html("<img{}>", html_attrs(img_attrs))]))
 
-    alt_text = alt_text or image.title or image.description or ""
-    alt = f' alt="{alt_text}"' if alt_text else ""
 
-    # Create a template string with the specific image tag
-    template_string = f"""
-    {{% load wagtailimages_tags %}}
-    {{% image image {image_size}{cropping} format-webp as webp_image %}}
-    <source srcset="{{{{ webp_image.url }}}}" type="image/webp"{css_class}>
-    {{% image image {image_size} as the_image %}}
-    <img src="{{ image.url }}" {alt}{css_class}>
+@register.simple_tag(takes_context=True)
+def cmspage_image_preload(context):
+    """
+    Renders a preload hint for the page's priority image, when CMSPAGE_IMAGE_PRELOAD
+    is enabled. Place it in the <head> of the base template:
+
+        {% load cmspage_tags %}
+        {% cmspage_image_preload %}
     """
+    if not (image_preload := context.get("image_preload")):
+        return ""
+    image, options = image_preload
+    ladder = image_ladder(**ladder_options(options))
+    image_formats = get_image_formats()
+    # preload the most preferred format, as that is what a supporting browser will pick
+    image_format = image_formats[0] if image_formats else None
+    renditions = get_renditions_or_not_found(image, [format_spec(spec, image_format) for _, spec in ladder])
 
-    # Create and render the template
-    t = Template(template_string)
-    context = Context({"image": image})
-    return t.render(context)
+    attrs = {"rel": "preload", "as": "image", "type": f"image/{image_format}" if image_format else None}
+    if ladder[-1][0] is not None:
+        attrs |= {
+            "imagesrcset": image_srcset(renditions, ladder, image_format),
+            "imagesizes": options.get("sizes") or image_sizes(ladder),
+        }
+    else:
+        attrs["href"] = renditions[format_spec(ladder[-1][1], image_format)].url
+    attrs["fetchpriority"] = "high"
+    return format_html("<link{}>", html_attrs(attrs))
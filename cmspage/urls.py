@@ -0,0 +1,13 @@
+"""
+URLs served by cmspage, included in a project's URL configuration:
+
+    path("cmspage/", include("cmspage.urls")),
+"""
+
+from django.urls import path
+
+from .views import csrf_token
+
+urlpatterns = [
+    path("csrf/", csrf_token, name="cmspage_csrf"),
+]
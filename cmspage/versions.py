@@ -0,0 +1,110 @@
+"""
+Versions of the data that cached content depends on.
+
+Cached content (expanded rich text, block fragments, pages) is keyed by the versions of what it
+was rendered from, rather than being deleted when that changes: starting a new version
+leaves the old entries unused, to expire or be evicted by the cache. A version is a random
+token held in a shared cache (CMSPAGE_VERSION_CACHE, by default the default cache) so that
+every process sees a change. A missing (e.g. evicted) version is replaced by a new token
+rather than restarted, so entries keyed by an earlier version are never reused.
+
+The `references` version changes whenever a page, document, image or site is saved,
+deleted or moved, since any of them can change the links, URLs and images that content
+referring to them renders. The `menu` version changes whenever the cached menu links are
+cleared, the `footer` version whenever the cached footers are discarded, and the `sites`
+version whenever a site is saved or deleted. Each page has a version of its own (see
+`page_version()`), which changes whenever an object the page depends on changes (see
+cmspage.dependencies).
+"""
+
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from wagtail.documents.models import AbstractDocument
+from wagtail.images.models import AbstractImage
+from wagtail.models import Page, Site
+from wagtail.signals import post_page_move
+
+__all__ = (
+    "CMSPAGE_VERSION_CACHE",
+    "FOOTER",
+    "MENU",
+    "REFERENCED_MODELS",
+    "REFERENCES",
+    "SITES",
+    "bump_version",
+    "get_version",
+    "get_versions",
+    "page_version",
+    "version_key",
+)
+
+# Settings
+CMSPAGE_VERSION_CACHE = "CMSPAGE_VERSION_CACHE"
+
+# Version names
+REFERENCES = "references"
+MENU = "menu"
+FOOTER = "footer"
+SITES = "sites"
+
+# Models whose changes can alter the content of pages referring to them
+REFERENCED_MODELS = (Page, AbstractDocument, AbstractImage, Site)
+
+CACHE_KEY_PREFIX = "cmspage:version"
+
+
+def version_cache():
+    return caches[getattr(settings, CMSPAGE_VERSION_CACHE, None) or DEFAULT_CACHE_ALIAS]
+
+
+def version_key(name: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{name}"
+
+
+def page_version(page_id: int) -> str:
+    """The name of the version of a page's dependencies"""
+    return f"page:{page_id}"
+
+
+def get_versions(*names: str) -> dict:
+    """
+    Return the current versions by name, starting any that are missing. A version is None
+    only if the cache does not store anything (such as the dummy cache).
+    """
+    cache = version_cache()
+    keys = {name: version_key(name) for name in names}
+    versions = cache.get_many(keys.values())
+    if missing := [key for key in keys.values() if key not in versions]:
+        for key in missing:
+            cache.add(key, uuid4().hex, None)
+        versions |= cache.get_many(missing)
+    return {name: versions.get(key) for name, key in keys.items()}
+
+
+def get_version(name: str) -> str | None:
+    return get_versions(name)[name]
+
+
+def bump_version(*names: str):
+    """Start new versions, so that content cached for the previous ones is no longer used"""
+    version_cache().set_many({version_key(name): uuid4().hex for name in names}, None)
+
+
+@receiver([post_save, post_delete])
+def _bump_referenced(sender, instance, **kwargs):
+    if isinstance(instance, REFERENCED_MODELS):
+        bump_version(REFERENCES)
+
+
+@receiver([post_save, post_delete], sender=Site)
+def _bump_sites(sender, **kwargs):
+    bump_version(SITES)
+
+
+@receiver(post_page_move)
+def _bump_moved(sender, **kwargs):
+    bump_version(REFERENCES)
@@ -1,3 +1,7 @@
+from django.http import JsonResponse
+from django.middleware.csrf import get_token
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
 from wagtail.models import Site
 from wagtail.snippets.views.snippets import SnippetViewSet
 
@@ -16,3 +20,13 @@ class MenuLinkViewSet(SnippetViewSet):
     def get_queryset(self, request):
         site = Site.find_for_request(request)
         return MenuLink.objects.get_ordered_queryset(site)
+
+
+@never_cache
+@require_GET
+def csrf_token(request):
+    """
+    The CSRF token, fetched by form blocks when they are submitted, so that the pages they
+    are on set no CSRF cookie and can be served from shared caches
+    """
+    return JsonResponse({"token": get_token(request)})
@@ -1,4 +1,5 @@
 #!/usr/bin/env python
+import json
 from pathlib import Path
 import random
 import string
@@ -6,11 +7,19 @@ import string
 from testcontainers.postgres import PostgresContainer
 
 import django
+import pytest
+import wagtail
 from django.conf import settings
+from django.core.cache import cache
 
 LETTERS = string.ascii_letters + string.digits
 KEYLEN = 50
 
+# The package's and Wagtail's own templates, for tests that render the bundled templates
+# rather than the empty test templates
+PACKAGE_TEMPLATES = Path(__file__).resolve().parent.parent / "cmspage" / "templates"
+WAGTAIL_TEMPLATES = Path(wagtail.__file__).parent / "templates"
+
 if not settings.configured:
     BASE_DIR = Path(__file__).resolve().parent
     POSTGRES_USER = "pguser"
@@ -74,6 +83,7 @@ if not settings.configured:
                 "BACKEND": "django.template.backends.django.DjangoTemplates",
                 "DIRS": [
                     BASE_DIR / "templates",
+                    PACKAGE_TEMPLATES,
                 ],
                 "APP_DIRS": False,
                 "OPTIONS": {
@@ -90,3 +100,49 @@ if not settings.configured:
     )
 
 django.setup()
+
+
+@pytest.fixture
+def clear_cache():
+    """Clear the default cache, for modules that use it with `pytestmark`"""
+    cache.clear()
+
+
+@pytest.fixture
+def make_page():
+    """Return a function adding a published CMSPage, with a title block, to the default site"""
+    from wagtail.models import Site
+
+    from cmspage.models import CMSPage
+
+    def make_page(slug, title="A title"):
+        page = CMSPage(title=slug.title(), slug=slug, body=json.dumps([{"type": "title", "value": {"text": title}}]))
+        Site.objects.get(is_default_site=True).root_page.add_child(instance=page)
+        page.save_revision().publish()
+        return CMSPage.objects.get(pk=page.pk)
+
+    return make_page
+
+
+@pytest.fixture
+def page_slug():
+    """The slug of the page fixture, overridden by modules for a page of their own"""
+    return "page"
+
+
+@pytest.fixture
+def page(make_page, page_slug):
+    return make_page(page_slug)
+
+
+@pytest.fixture
+def anonymous(rf, page_slug):
+    """Return a function making a request from an anonymous visitor, by default for the page fixture"""
+    from django.contrib.auth.models import AnonymousUser
+
+    def request(path=None, method="get", **extra):
+        request = getattr(rf, method)(path or f"/{page_slug}/", **extra)
+        request.user = AnonymousUser()
+        return request
+
+    return request
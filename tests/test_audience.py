@@ -0,0 +1,114 @@
+import pytest
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.urls import NoReverseMatch, reverse
+from wagtail.models import Site
+
+from cmspage.audience import has_pending_messages, request_user
+from cmspage.blocks.form import FormBlock
+from cmspage.context_processors import cmspage_context
+from cmspage.models import MenuLink
+from tests.conftest import PACKAGE_TEMPLATES
+
+pytestmark = pytest.mark.usefixtures("clear_cache")
+
+
+@pytest.fixture
+def visitor(rf):
+    """A request through the session and authentication middleware"""
+
+    def request(**cookies):
+        request = rf.get("/")
+        request.COOKIES.update(cookies)
+        SessionMiddleware(lambda request: HttpResponse()).process_request(request)
+        AuthenticationMiddleware(lambda request: HttpResponse()).process_request(request)
+        request._messages = FallbackStorage(request)
+        return request
+
+    return request
+
+
+@pytest.mark.django_db
+class TestAudience:
+    def test_without_session_cookie(self, visitor):
+        request = visitor()
+        assert request_user(request) is None
+        assert not has_pending_messages(request)
+        assert not request.session.accessed
+
+    def test_with_session_cookie(self, visitor, client):
+        user = User.objects.create_user("visitor")
+        client.force_login(user)
+        request = visitor(sessionid=client.session.session_key)
+        assert request_user(request) == user
+        assert request.session.accessed
+
+    def test_loaded_user(self, rf):
+        request = rf.get("/")
+        request.user = user = User(username="visitor")
+        assert request_user(request) == user
+
+
+@pytest.mark.django_db
+class TestLazyNavigation:
+    @pytest.fixture
+    def site(self):
+        site = Site.objects.get(is_default_site=True)
+        MenuLink.objects.create(site=site, menu_title="Public", link_url="https://example.com/public", menu_order=1)
+        return site
+
+    def test_session_untouched(self, visitor, site):
+        request = visitor()
+        context = cmspage_context(request)
+        assert [link["title"] for link in context["navigation"]] == ["Public"]
+        assert not request.session.accessed
+
+    def test_staff_only_links(self, visitor, site):
+        MenuLink.objects.create(
+            site=site, menu_title="Staff", link_url="https://example.com/staff", menu_order=2, staff_only=True
+        )
+        request = visitor()
+        request.user = User(username="staff", is_staff=True)
+        assert [link["title"] for link in cmspage_context(request)["navigation"]] == ["Public", "Staff"]
+
+    def test_built_when_used(self, visitor, site, mocker):
+        get_cached_menu_links = mocker.spy(MenuLink, "get_cached_menu_links")
+        context = cmspage_context(visitor())
+        get_cached_menu_links.assert_not_called()
+        assert context["navigation"]
+        get_cached_menu_links.assert_called_once()
+
+
+@pytest.mark.django_db
+class TestLazyCsrfToken:
+    VALUE = {"submit_url": "/submit/", "submit_button_text": "Send", "fields": []}
+
+    @pytest.fixture(autouse=True)
+    def templates(self, settings):
+        settings.TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[PACKAGE_TEMPLATES])]
+
+    def render(self, rf):
+        request = rf.get("/")
+        html = render_to_string("blocks/form_block.html", {"value": FormBlock().to_python(self.VALUE)}, request)
+        return request, html
+
+    def test_endpoint(self, client):
+        response = client.get(reverse("cmspage_csrf"))
+        assert response.json()["token"]
+        assert "no-cache" in response["Cache-Control"]
+        assert response.wsgi_request.META["CSRF_COOKIE_NEEDS_UPDATE"]
+
+    def test_form_fetches_token(self, rf):
+        request, html = self.render(rf)
+        assert f'data-csrf-url="{reverse("cmspage_csrf")}"' in html
+        assert not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+
+    def test_token_rendered_without_endpoint(self, rf, mocker):
+        mocker.patch("cmspage.templatetags.cmspage_tags.reverse", side_effect=NoReverseMatch)
+        request, html = self.render(rf)
+        assert 'data-csrf-url="' not in html
+        assert request.META["CSRF_COOKIE_NEEDS_UPDATE"]
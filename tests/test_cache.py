@@ -0,0 +1,145 @@
+import math
+
+import pytest
+from django.core.cache import cache
+
+from cmspage.cache import CMSCache, Compressed, cache_metrics, invalidate_tags
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def test_cache():
+    test_cache = CMSCache("test", "CMSPAGE_TEST_CACHE")
+    yield test_cache
+    test_cache.local.clear()
+    test_cache.reset_metrics()
+
+
+class Compute:
+    def __init__(self, value="value"):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestKeys:
+    def test_namespaced(self, test_cache):
+        assert test_cache.key(1, "a").startswith("cmspage:test:1:a:")
+
+    def test_tagged(self, test_cache):
+        key = test_cache.key(1, tags=["tag"])
+        assert test_cache.key(1, tags=["other"]) != key
+        invalidate_tags("tag")
+        assert test_cache.key(1, tags=["tag"]) != key
+
+    def test_in_process_only(self):
+        local_cache = CMSCache("test_local", alias=None, l1_timeout=math.inf)
+        assert local_cache.key(1) == "cmspage:test_local:1"
+
+
+class TestGetOrCompute:
+    def test_computed_once(self, test_cache):
+        compute = Compute()
+        for _ in range(2):
+            assert test_cache.get_or_compute(1, compute=compute, tags=["tag"]) == "value"
+        assert compute.calls == 1
+
+    def test_invalidated_by_tag(self, test_cache):
+        compute = Compute()
+        test_cache.get_or_compute(1, compute=compute, tags=["tag"])
+        test_cache.get_or_compute(2, compute=compute, tags=["other"])
+        invalidate_tags("tag")
+        test_cache.get_or_compute(1, compute=compute, tags=["tag"])
+        test_cache.get_or_compute(2, compute=compute, tags=["other"])
+        assert compute.calls == 3
+
+    def test_clear(self, test_cache):
+        compute = Compute()
+        test_cache.get_or_compute(1, compute=compute)
+        test_cache.clear()
+        test_cache.get_or_compute(1, compute=compute)
+        assert compute.calls == 2
+
+    def test_disabled(self, settings, test_cache):
+        settings.CMSPAGE_TEST_CACHE = None
+        compute = Compute()
+        for _ in range(2):
+            test_cache.get_or_compute(1, compute=compute)
+        assert compute.calls == 2
+
+
+class TestL1:
+    def test_read_in_process(self, settings, test_cache):
+        settings.CMSPAGE_CACHE_L1_TIMEOUT = 60
+        key = test_cache.key(1)
+        test_cache.set(key, "value")
+        cache.clear()
+        assert test_cache.get(key) == "value"
+        assert test_cache.metrics()["l1_hits"] == 1
+
+    def test_expired(self, settings, test_cache):
+        settings.CMSPAGE_CACHE_L1_TIMEOUT = 60
+        key = test_cache.key(1)
+        test_cache.local.set_many({key: "value"}, -1, 10)
+        assert test_cache.get(key) is None
+        assert test_cache.metrics()["l1_hits"] == 0
+
+    def test_least_recently_used_evicted(self):
+        local_cache = CMSCache("test_lru", alias=None, l1_timeout=math.inf, l1_size=2)
+        local_cache.set_many({"a": 1, "b": 2})
+        local_cache.get("a")
+        local_cache.set("c", 3)
+        assert local_cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+
+class TestCompression:
+    def test_compressed_above_threshold(self, settings, test_cache):
+        settings.CMSPAGE_CACHE_COMPRESS_THRESHOLD = 100
+        small, large = test_cache.key("small"), test_cache.key("large")
+        test_cache.set_many({small: "x", large: "x" * 1000})
+        assert cache.get(small) == "x"
+        assert isinstance(cache.get(large), Compressed)
+        assert test_cache.get(large) == "x" * 1000
+        assert test_cache.metrics()["compressed"] == 1
+
+
+class TestMetrics:
+    def test_counts(self, test_cache):
+        test_cache.get_or_compute(1, compute=Compute())
+        test_cache.get_or_compute(1, compute=Compute())
+        assert cache_metrics()["test"] == {"l1_hits": 0, "hits": 1, "misses": 1, "sets": 1, "compressed": 0}
+
+
+class TestMemoize:
+    def test_cached_by_arguments(self, test_cache):
+        calls = []
+
+        @test_cache.memoize
+        def find(name, style=None):
+            calls.append((name, style))
+
+        for _ in range(2):
+            assert find("a") is None
+            find("a", style="b")
+        assert calls == [("a", None), ("a", "b")]
+        find.cache_clear()
+        find("a")
+        assert len(calls) == 3
+
+    def test_condition(self, test_cache):
+        calls = []
+
+        @test_cache.memoize(condition=lambda: False)
+        def find(name):
+            calls.append(name)
+
+        find("a")
+        find("a")
+        assert calls == ["a", "a"]
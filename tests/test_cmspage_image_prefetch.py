@@ -1,9 +1,40 @@
-import pytest
-from unittest.mock import MagicMock
+import json
 
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from wagtail import blocks
+from wagtail.documents import get_document_model
+from wagtail.images.blocks import ImageChooserBlock
 from wagtail.images.tests.utils import get_test_image_file
+from wagtail.models import Page, Site
+
+from cmspage import references
+from cmspage.references import LIST, STREAM, STRUCT, image_paths, raw_image_ids, stream_image_ids
+from cmspage.models import CMSFooterPage, CMSPage, CMSPageImage
+from cmspage.templatetags.cmspage_tags import render_image
+
+
+class GalleryBlock(blocks.StructBlock):
+    """A custom block with images nested in lists, structs and streams"""
 
-from cmspage.models import CMSPage, CMSPageImage
+    title = blocks.CharBlock()
+    cover = ImageChooserBlock(required=False)
+    slides = blocks.ListBlock(
+        blocks.StructBlock([("picture", ImageChooserBlock()), ("caption", blocks.CharBlock())])
+    )
+    extras = blocks.StreamBlock(
+        [
+            ("thumbnail", ImageChooserBlock()),
+            ("thumbnails", blocks.ListBlock(ImageChooserBlock())),
+            ("text", blocks.CharBlock()),
+        ],
+        required=False,
+    )
+
+
+def body_stream(raw):
+    return CMSPage.body.field.stream_block.to_python(raw)
 
 
 @pytest.mark.django_db
@@ -12,268 +43,225 @@ class TestCMSPageImagePrefetch:
 
     def setup_method(self):
         """Set up test data for each test method"""
-        # Create test images
-        self.image1 = CMSPageImage.objects.create(
-            title="Test Image 1",
-            file=get_test_image_file(),
-        )
-        self.image2 = CMSPageImage.objects.create(
-            title="Test Image 2",
-            file=get_test_image_file(),
+        self.image1, self.image2, self.image3 = (
+            CMSPageImage.objects.create(title=f"Test Image {index}", file=get_test_image_file())
+            for index in range(1, 4)
         )
-        self.image3 = CMSPageImage.objects.create(
-            title="Test Image 3",
-            file=get_test_image_file(),
+
+    def test_image_paths_from_block_definitions(self):
+        paths = image_paths(GalleryBlock())
+        assert paths == (
+            ((STRUCT, "cover"),),
+            ((STRUCT, "slides"), (LIST,), (STRUCT, "picture")),
+            ((STRUCT, "extras"), (STREAM, "thumbnail")),
+            ((STRUCT, "extras"), (STREAM, "thumbnails"), (LIST,)),
         )
 
-    def test_extract_image_ids_from_cards_block(self):
-        # sourcery skip: class-extract-method
-        """Test extracting image IDs from a cards block"""
-        # Create a mock cards block
-        mock_block = MagicMock()
-        mock_block.block_type = "cards"
-        mock_block.value = {
-            "cards": [
-                {"image": self.image1},
-                {"image": self.image2},
-                {"text": "No image here"},
-            ]
+    def test_image_paths_computed_once(self, mocker):
+        block = GalleryBlock()
+        walk = mocker.spy(references, "_find_block_paths")
+        image_paths(block)
+        calls = walk.call_count
+        image_paths(block)
+        assert walk.call_count == calls
+
+    def test_image_paths_for_page_body(self):
+        paths = image_paths(CMSPage.body.field.stream_block)
+        assert ((STREAM, "hero"), (STRUCT, "image")) in paths
+        assert ((STREAM, "cards"), (STRUCT, "cards"), (LIST,), (STRUCT, "image")) in paths
+        assert ((STREAM, "carousel"), (STRUCT, "carousel"), (LIST,), (STRUCT, "carousel_image")) in paths
+        # blocks without images have no paths
+        assert not any(path[0] == (STREAM, "title") for path in paths)
+
+    def test_raw_image_ids_nested(self):
+        raw = {
+            "title": "Gallery",
+            "cover": self.image1.id,
+            "slides": [
+                {"type": "item", "id": "a", "value": {"picture": self.image2.id, "caption": "New format"}},
+                {"picture": self.image3.id, "caption": "Old format"},
+            ],
+            "extras": [
+                {"type": "thumbnail", "value": self.image3.id},
+                {"type": "text", "value": "not an image"},
+                {"type": "thumbnails", "value": [{"type": "item", "id": "b", "value": self.image1.id}, None]},
+            ],
         }
-
-        # Call the method
-        image_ids = CMSPage._extract_image_ids_from_block(mock_block)
-
-        # Assert
-        assert len(image_ids) == 2
-        assert self.image1.id in image_ids
-        assert self.image2.id in image_ids
-
-    def test_extract_image_ids_from_carousel_block(self):
-        """Test extracting image IDs from a carousel block"""
-        # Create a mock carousel block
-        mock_block = MagicMock()
-        mock_block.block_type = "carousel"
-        mock_block.value = {
-            "carousel": [
-                {"carousel_image": self.image1},
-                {"carousel_image": self.image2},
-                {"carousel_title": "No image here"},
+        assert raw_image_ids(GalleryBlock(), raw) == [
+            self.image1.id,
+            self.image2.id,
+            self.image3.id,
+            self.image3.id,
+            self.image1.id,
+        ]
+
+    def test_raw_image_ids_missing_values(self):
+        assert raw_image_ids(GalleryBlock(), {"title": "Empty", "cover": None, "slides": []}) == []
+        assert raw_image_ids(GalleryBlock(), None) == []
+
+    def test_stream_image_ids(self, django_assert_num_queries):
+        body = body_stream(
+            [
+                {"type": "hero", "value": {"image": self.image1.id}},
+                {"type": "title", "value": {"text": "A title"}},
+                {"type": "cards", "value": {"cards": [{"image": self.image2.id}, {"title": "No image"}]}},
+                {"type": "carousel", "value": {"carousel": [{"carousel_image": self.image3.id}]}},
+                {"type": "large_image", "value": {"image": self.image1.id}},
             ]
-        }
-
-        # Call the method
-        image_ids = CMSPage._extract_image_ids_from_block(mock_block)
-
-        # Assert
-        assert len(image_ids) == 2
-        assert self.image1.id in image_ids
-        assert self.image2.id in image_ids
-
-    def test_extract_image_ids_from_image_and_text_block(self):
-        """Test extracting image IDs from an image_and_text block"""
-        # Create a mock image_and_text block
-        mock_block = MagicMock()
-        mock_block.block_type = "image_and_text"
-        mock_block.value = {
-            "image": self.image1,
-            "text": "Some text",
-        }
-
-        # Call the method
-        image_ids = CMSPage._extract_image_ids_from_block(mock_block)
-
-        # Assert
-        assert len(image_ids) == 1
-        assert self.image1.id in image_ids
-
-    def test_extract_image_ids_from_large_image_block(self):
-        """Test extracting image IDs from a large_image block"""
-        # Create a mock large_image block
-        mock_block = MagicMock()
-        mock_block.block_type = "large_image"
-        mock_block.value = {
-            "image": self.image1,
-        }
-
-        # Call the method
-        image_ids = CMSPage._extract_image_ids_from_block(mock_block)
-
-        # Assert
-        assert len(image_ids) == 1
-        assert self.image1.id in image_ids
-
-    def test_extract_image_ids_from_generic_block(self):
-        """Test extracting image IDs from a generic block with an image"""
-        # Create a mock generic block
-        mock_block = MagicMock()
-        mock_block.block_type = "some_other_block"
-        mock_block.value = {
-            "image": self.image1,
-            "text": "Some text",
-        }
-
-        # Call the method
-        image_ids = CMSPage._extract_image_ids_from_block(mock_block)
-
-        # Assert
-        assert len(image_ids) == 1
-        assert self.image1.id in image_ids
-
-    def test_extract_image_ids_from_title_block(self):
-        """Test extracting image IDs from a title block (which has no images)"""
-        # Create a mock title block
-        mock_block = MagicMock()
-        mock_block.block_type = "title"
-        mock_block.value = {
-            "text": "This is a title",
-            "cursive": False,
-            "justify": "center",
-            "palette": "warning",
-            "inset": "small",
-        }
-
-        # Call the method
-        image_ids = CMSPage._extract_image_ids_from_block(mock_block)
-
-        # Assert that no image IDs were extracted
-        assert len(image_ids) == 0
-
-    def test_extract_image_ids_from_richtext_with_title_block(self):
-        """Test extracting image IDs from a richtext_with_title block (which has no images)"""
-        # Create a mock richtext_with_title block
-        mock_block = MagicMock()
-        mock_block.block_type = "richtext"
-        mock_block.value = {
-            "title": "This is a title",
-            "cursive": False,
-            "content": "<p>This is some rich text content</p>",
-            "justify": "left",
-            "palette": "warning",
-            "inset": "small",
-        }
-
-        # Call the method
-        image_ids = CMSPage._extract_image_ids_from_block(mock_block)
-
-        # Assert that no image IDs were extracted
-        assert len(image_ids) == 0
-
-    def test_extract_image_ids_from_copyright_block(self):
-        """Test extracting image IDs from a copyright block (which has no images)"""
-        # Create a mock copyright block
-        mock_block = MagicMock()
-        mock_block.block_type = "copy"
-        mock_block.value = {
-            "copyright": "© 2025 Example Company",
-            "palette": "warning",
-            "inset": "small",
-        }
-
-        # Call the method
-        image_ids = CMSPage._extract_image_ids_from_block(mock_block)
-
-        # Assert that no image IDs were extracted
-        assert len(image_ids) == 0
-
-    def test_extract_image_ids_from_call_to_action_block(self):
-        """Test extracting image IDs from a call_to_action block (which has no images)"""
-        # Create a mock call_to_action block
-        mock_block = MagicMock()
-        mock_block.block_type = "cta"
-        mock_block.value = {
-            "title": "Call to Action",
-            "cursive": False,
-            "text": "<p>Click here to learn more</p>",
-            "justify": "left",
-            "palette": "warning",
-            "inset": "small",
-            "link": {"button_title": "Learn More", "page_link": None, "doc_link": None, "extra_link": "/learn-more"},
-        }
-
-        # Call the method
-        image_ids = CMSPage._extract_image_ids_from_block(mock_block)
-
-        # Assert that no image IDs were extracted
-        assert len(image_ids) == 0
-
-    def test_extract_image_ids_from_new_section_block(self):
-        """Test extracting image IDs from a new_section block (which has no images)"""
-        # Create a mock new_section block
-        mock_block = MagicMock()
-        mock_block.block_type = "new_section"
-        mock_block.value = {
-            "height": "medium",
-            "palette": "warning",
-            "inset": "small",
-        }
-
-        # Call the method
-        image_ids = CMSPage._extract_image_ids_from_block(mock_block)
-
-        # Assert that no image IDs were extracted
-        assert len(image_ids) == 0
-
-    def test_image_id_deduplication(self):
-        # sourcery skip: extract-duplicate-method
-        """Test that image IDs are deduplicated when prefetching"""
-        # Create duplicate image IDs
-        duplicate_ids = [self.image1.id, self.image1.id, self.image2.id]
-        deduped_ids = list(set(duplicate_ids))
-
-        # Verify deduplication
-        assert len(duplicate_ids) == 3
-        assert len(deduped_ids) == 2
-        assert self.image1.id in deduped_ids
-        assert self.image2.id in deduped_ids
-
-        # Test that CMSPageImage.objects.filter works with the deduplicated IDs
-        images = CMSPageImage.objects.filter(id__in=deduped_ids)
-        assert images.count() == 2
-
-        # Create a dictionary mapping image IDs to images
-        image_dict = {img.id: img for img in images}
-        assert len(image_dict) == 2
-        assert self.image1.id in image_dict
-        assert self.image2.id in image_dict
-
-    def test_extract_and_prefetch_integration(self):
-        """Test the integration of image extraction and prefetching"""
-        # Test extraction from different block types
-        cards_ids = CMSPage._extract_image_ids_from_block(
-            MagicMock(block_type="cards", value={"cards": [{"image": self.image1}, {"image": self.image2}]})
         )
-
-        carousel_ids = CMSPage._extract_image_ids_from_block(
-            MagicMock(
-                block_type="carousel",
-                value={"carousel": [{"carousel_image": self.image2}, {"carousel_image": self.image3}]},
-            )
+        # read from the raw data, without converting block values
+        with django_assert_num_queries(0):
+            image_ids = stream_image_ids([body, None])
+        assert image_ids == [self.image1.id, self.image2.id, self.image3.id]
+
+    def test_stream_image_ids_from_converted_values(self):
+        body = body_stream([{"type": "image_and_text", "value": {"image": self.image2.id}}])
+        assert body[0].value["image"].pk == self.image2.id
+        assert stream_image_ids([body]) == [self.image2.id]
+
+    def test_prefetch_block_images(self, django_assert_num_queries):
+        page = CMSPage(
+            title="Images",
+            body=body_stream(
+                [
+                    {"type": "cards", "value": {"cards": [{"image": self.image1.id}, {"image": self.image2.id}]}},
+                    {"type": "carousel", "value": {"carousel": [{"carousel_image": self.image2.id}]}},
+                ]
+            ),
         )
+        with django_assert_num_queries(1):
+            page._prefetch_block_objects()
+        assert sorted(page._prefetched_images) == [self.image1.id, self.image2.id]
+        # the block values are converted from the prefetched images
+        with django_assert_num_queries(0):
+            cards = page.body[0].value["cards"]
+            carousel = page.body[1].value["carousel"]
+        assert cards[1]["image"] is carousel[0]["carousel_image"] is page._prefetched_images[self.image2.id]
 
-        image_text_ids = CMSPage._extract_image_ids_from_block(
-            MagicMock(block_type="image_and_text", value={"image": self.image1})
-        )
 
-        # Combine all IDs
-        all_ids = cards_ids + carousel_ids + image_text_ids
-
-        # Verify extraction worked correctly
-        assert len(cards_ids) == 2
-        assert len(carousel_ids) == 2
-        assert len(image_text_ids) == 1
-        assert len(all_ids) == 5  # Total with duplicates
-
-        # Deduplicate IDs
-        deduped_ids = list(set(all_ids))
-        assert len(deduped_ids) == 3  # Should be 3 unique IDs
-
-        # Fetch images using the deduplicated IDs
-        images = CMSPageImage.objects.filter(id__in=deduped_ids)
-        assert images.count() == 3
-
-        # Create a dictionary mapping image IDs to images (simulating _prefetched_images)
-        prefetched_images = {img.id: img for img in images}
-        assert len(prefetched_images) == 3
-        assert self.image1.id in prefetched_images
-        assert self.image2.id in prefetched_images
-        assert self.image3.id in prefetched_images
+@pytest.mark.django_db
+class TestPageImageQueries:
+    """A page's images, and their renditions, are fetched with a fixed number of queries"""
+
+    @pytest.fixture
+    def images(self):
+        return [CMSPageImage.objects.create(title=f"Image {index}", file=get_test_image_file()) for index in range(8)]
+
+    @staticmethod
+    def create_pages(images, cards):
+        def image(index):
+            return images[index % len(images)].pk
+
+        body = [
+            {"type": "hero", "value": {"image": image(0), "size": "small"}},
+            {"type": "cards", "value": {"cards": [{"image": image(i), "size": "small"} for i in range(cards)]}},
+            {"type": "image_and_text", "value": {"image": image(1), "size": "small"}},
+            {"type": "carousel", "value": {"carousel": [{"carousel_image": image(i)} for i in range(cards // 2)]}},
+            {"type": "large_image", "value": {"image": image(2), "size": "small"}},
+        ]
+        footer = [{"type": "info", "value": {"image": image(3), "size": "tiny"}}]
+        root = Page.objects.get(pk=1)
+        root.add_child(instance=CMSFooterPage(title="Footer", slug="footer", footer=json.dumps(footer)))
+        page = CMSPage(title="Images", slug="images", body=json.dumps(body))
+        root.add_child(instance=page)
+        return page
+
+    @staticmethod
+    def render_images(page, context):
+        streams = (page.body, context["page_footer"].footer)
+        return [
+            render_image(image, **options)
+            for stream in streams
+            for bound_block in stream
+            if hasattr(bound_block.block, "get_image_options")
+            for image, options in bound_block.block.get_image_options(bound_block.value)
+        ]
+
+    @pytest.mark.parametrize("cards", [6, 24])
+    def test_page_queries(self, rf, images, cards, django_assert_num_queries):
+        page = self.create_pages(images, cards)
+        # Generate the renditions on a first render
+        html = self.render_images(page, page.get_context(rf.get("/")))
+        assert len(html) == cards + cards // 2 + 4
+        cache.clear()
+        Site.get_site_root_paths()  # cached, as after the first request
+
+        page = CMSPage.objects.get(pk=page.pk)
+        # footer page, images and renditions
+        with django_assert_num_queries(3):
+            context = page.get_context(rf.get("/"))
+            assert self.render_images(page, context) == html
+
+    def test_page_without_images(self, rf, django_assert_num_queries):
+        page = CMSPage(title="Text", slug="text", body=json.dumps([{"type": "title", "value": {"text": "Title"}}]))
+        Page.objects.get(pk=1).add_child(instance=page)
+        page = CMSPage.objects.get(pk=page.pk)
+        with django_assert_num_queries(1):
+            page.get_context(rf.get("/"))
+
+
+@pytest.mark.django_db
+class TestPageLinkQueries:
+    """Pages and documents chosen in link blocks are fetched in bulk, with their URLs computed once"""
+
+    @pytest.fixture
+    def targets(self):
+        root = Site.objects.get(is_default_site=True).root_page
+        pages = []
+        for index in range(6):
+            pages.append(CMSPage(title=f"Target {index}", slug=f"target-{index}"))
+            root.add_child(instance=pages[-1])
+        documents = [
+            get_document_model().objects.create(title=f"Document {index}", file=ContentFile(b"data", f"doc{index}.txt"))
+            for index in range(3)
+        ]
+        return pages, documents
+
+    @staticmethod
+    def create_page(targets, cards):
+        pages, documents = targets
+
+        def link(index):
+            if index % 3 == 2:
+                return {"doc_link": documents[index % len(documents)].pk}
+            return {"page_link": pages[index % len(pages)].pk, "extra_link": "#top" if index % 2 else ""}
+
+        body = [
+            {"type": "cards", "value": {"cards": [{"title": f"Card {i}", "link": link(i)} for i in range(cards)]}},
+            {"type": "cta", "value": {"title": "Call", "link": link(0)}},
+        ]
+        footer = [{"type": "links", "value": {"links": [link(i) for i in range(4)]}}]
+        root = Site.objects.get(is_default_site=True).root_page
+        root.add_child(instance=CMSFooterPage(title="Footer", slug="footer", footer=json.dumps(footer)))
+        page = CMSPage(title="Links", slug="links", body=json.dumps(body))
+        root.add_child(instance=page)
+        return page
+
+    @staticmethod
+    def link_urls(page, context):
+        cards = [card["link"].link_url for card in page.body[0].value["cards"]]
+        footer_links = [link.link_url for link in context["page_footer"].footer[0].value["links"]]
+        return cards + [page.body[1].value["link"].link_url] + footer_links
+
+    @pytest.mark.parametrize("cards", [6, 24])
+    def test_link_queries(self, rf, targets, cards, django_assert_num_queries):
+        page = self.create_page(targets, cards)
+        pages, documents = targets
+        expected = self.link_urls(CMSPage.objects.get(pk=page.pk), {"page_footer": CMSFooterPage.objects.get()})
+        assert expected[:3] == [pages[0].url, f"{pages[1].url}#top", documents[2].url]
+
+        page = CMSPage.objects.get(pk=page.pk)
+        request = rf.get("/")
+        page.get_context(request)  # caches the site root paths
+        page = CMSPage.objects.get(pk=page.pk)
+        # footer page, pages and documents
+        with django_assert_num_queries(3):
+            context = page.get_context(request)
+            assert self.link_urls(page, context) == expected
+
+    def test_prefetched_urls(self, rf, targets):
+        page = self.create_page(targets, 3)
+        page._prefetch_block_objects(request=rf.get("/"))
+        card_links = [card["link"] for card in page.body[0].value["cards"]]
+        assert card_links[0]["page_link"].prefetched_url == targets[0][0].url
+        assert card_links[2]["doc_link"].prefetched_url == targets[1][2].url
@@ -0,0 +1,125 @@
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.template.response import TemplateResponse
+from django.utils.http import http_date
+from wagtail.models import Page
+
+from cmspage.conditional import page_etag, page_last_modified
+from cmspage.footer import invalidate_footer_cache
+from cmspage.models import CMSPage, MenuLink
+from cmspage.versions import SITES, bump_version, page_version
+
+pytestmark = pytest.mark.usefixtures("clear_cache")
+
+
+@pytest.fixture
+def serve(mocker):
+    """Page.serve, rendering a template response that counts its renders"""
+    renders = []
+
+    def render(page, request, *args, **kwargs):
+        renders.append(request)
+        return TemplateResponse(request, "cmspage/cms_page.html", {"page": page})
+
+    serve = mocker.patch.object(Page, "serve", autospec=True, side_effect=render)
+    mocker.patch.object(TemplateResponse, "rendered_content", "<p>rendered</p>")
+    serve.renders = renders
+    return serve
+
+
+def get(page, request):
+    response = page.serve(request)
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+@pytest.mark.django_db
+class TestValidators:
+    def test_headers(self, page, anonymous, serve):
+        response = get(page, anonymous())
+        assert response.status_code == 200
+        assert response["ETag"] == page_etag(page, anonymous())
+        assert response["Last-Modified"] == http_date(page_last_modified(page))
+
+    def test_strong_etag(self, page, anonymous):
+        assert page_etag(page, anonymous()).startswith('"')
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda page: page.save_revision().publish(),
+            lambda page: MenuLink.clear_cached_menu_links(),
+            lambda page: invalidate_footer_cache(),
+            lambda page: bump_version(SITES),
+            lambda page: bump_version(page_version(page.pk)),
+        ],
+        ids=["published", "menu", "footer", "sites", "dependencies"],
+    )
+    def test_etag_changes(self, page, anonymous, change):
+        etag = page_etag(page, anonymous())
+        change(page)
+        assert page_etag(CMSPage.objects.get(pk=page.pk), anonymous()) != etag
+
+    def test_etag_varies_by_audience_and_path(self, page, anonymous):
+        etag = page_etag(page, anonymous())
+        assert page_etag(page, anonymous("/page/?page=2")) != etag
+        request = anonymous()
+        request.user = User.objects.create_user("visitor")
+        assert page_etag(page, request) != etag
+
+    def test_unpublished_page(self, anonymous):
+        assert page_etag(CMSPage(title="Draft", slug="draft"), anonymous()) is None
+
+
+@pytest.mark.django_db
+class TestNotModified:
+    def test_etag_matches(self, page, anonymous, serve, django_assert_num_queries):
+        etag = get(page, anonymous())["ETag"]
+        request = anonymous(HTTP_IF_NONE_MATCH=etag)
+        page.get_url_parts(request)  # caches the site root paths
+        with django_assert_num_queries(0):
+            response = get(page, request)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        assert len(serve.renders) == 1
+
+    def test_etag_outdated(self, page, anonymous, serve):
+        etag = get(page, anonymous())["ETag"]
+        MenuLink.clear_cached_menu_links()
+        response = get(page, anonymous(HTTP_IF_NONE_MATCH=etag))
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_not_modified_since(self, page, anonymous, serve):
+        last_modified = get(page, anonymous())["Last-Modified"]
+        assert get(page, anonymous(HTTP_IF_MODIFIED_SINCE=last_modified)).status_code == 304
+
+    def test_etag_takes_precedence(self, page, anonymous, serve):
+        last_modified = get(page, anonymous())["Last-Modified"]
+        request = anonymous(HTTP_IF_NONE_MATCH='"outdated"', HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert get(page, request).status_code == 200
+
+    @pytest.mark.parametrize("attribute", ["is_preview", "in_preview_panel"])
+    def test_preview(self, page, anonymous, serve, attribute):
+        etag = get(page, anonymous())["ETag"]
+        request = anonymous(HTTP_IF_NONE_MATCH=etag)
+        setattr(request, attribute, True)
+        response = get(page, request)
+        assert response.status_code == 200
+        assert not response.has_header("ETag")
+
+    def test_pending_messages(self, page, anonymous, serve):
+        etag = get(page, anonymous())["ETag"]
+        request = anonymous(HTTP_IF_NONE_MATCH=etag)
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        request._messages.add(20, "Saved")
+        assert get(page, request).status_code == 200
+
+    def test_disabled(self, page, anonymous, serve, settings):
+        settings.CMSPAGE_CONDITIONAL_GET = False
+        response = get(page, anonymous())
+        assert not response.has_header("ETag")
+        assert not response.has_header("Last-Modified")
@@ -0,0 +1,189 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from taggit.models import Tag
+from wagtail.documents import get_document_model
+from wagtail.embeds.embeds import get_embed_hash
+from wagtail.embeds.models import Embed
+from wagtail.images import get_image_model
+from wagtail.images.tests.utils import get_test_image_file
+from wagtail.models import Page, Site
+
+from cmspage.dependencies import dependent_page_ids, page_dependencies
+from cmspage.footer import footer_cache_key
+from cmspage.models import CMSFooterPage, CMSPage, MenuLink, PageDependency
+from cmspage.versions import get_version, page_version
+
+VIDEO = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def site_root():
+    return Site.objects.get(is_default_site=True).root_page
+
+
+@pytest.fixture
+def image():
+    return get_image_model().objects.create(title="Image", file=get_test_image_file())
+
+
+@pytest.fixture
+def document():
+    return get_document_model().objects.create(title="Document", file=ContentFile(b"data", "document.txt"))
+
+
+@pytest.fixture
+def target(site_root):
+    page = CMSPage(title="Target", slug="target")
+    site_root.add_child(instance=page)
+    return page
+
+
+def body(image, document, target):
+    rich_text = (
+        f'<p><a linktype="page" id="{target.pk}">Target</a> <a linktype="document" id="{document.pk}">Doc</a></p>'
+        f'<embed embedtype="media" url="{VIDEO}"/>'
+    )
+    return json.dumps(
+        [
+            {"type": "hero", "value": {"image": image.pk, "size": "small"}},
+            {"type": "richtext", "value": {"title": "Text", "content": rich_text}},
+            {"type": "video", "value": VIDEO},
+        ]
+    )
+
+
+@pytest.fixture
+def page(site_root, image, document, target):
+    page = CMSPage(title="Page", slug="page", body=body(image, document, target))
+    site_root.add_child(instance=page)
+    page.tags.add("news")
+    page.save_revision().publish()
+    return CMSPage.objects.get(pk=page.pk)
+
+
+@pytest.mark.django_db
+class TestPageDependencies:
+    def test_dependencies(self, page, image, document, target):
+        assert page_dependencies(page) == {
+            (get_image_model(), str(image.pk)),
+            (get_document_model(), str(document.pk)),
+            (Page, str(target.pk)),
+            (Embed, get_embed_hash(VIDEO)),
+            (Tag, str(Tag.objects.get(name="news").pk)),
+        }
+
+    def test_recorded_on_publish(self, page):
+        dependencies = PageDependency.objects.filter(page=page)
+        assert dependencies.count() == 5
+        assert {dependency.revision_id for dependency in dependencies} == {page.live_revision_id}
+
+    def test_replaced_on_publish(self, page, image):
+        page.body = json.dumps([{"type": "hero", "value": {"image": image.pk, "size": "small"}}])
+        page.save_revision().publish()
+        dependencies = PageDependency.objects.filter(page=page)
+        assert {(d.content_type.model_class(), d.object_id) for d in dependencies} == {
+            (get_image_model(), str(image.pk)),
+            (Tag, str(Tag.objects.get(name="news").pk)),
+        }
+
+    def test_dependent_page_ids(self, page, image, target):
+        assert dependent_page_ids(get_image_model(), [image.pk]) == {page.pk}
+        assert dependent_page_ids(CMSPage, [target.pk]) == {page.pk}
+        assert dependent_page_ids(get_image_model(), [image.pk + 1]) == set()
+
+
+@pytest.mark.django_db
+class TestInvalidation:
+    @pytest.fixture
+    def version(self, page):
+        return lambda: get_version(page_version(page.pk))
+
+    def test_image_changed(self, page, image, version):
+        before = version()
+        image.title = "Changed"
+        image.save()
+        assert version() != before
+
+    def test_document_deleted(self, page, document, version):
+        before = version()
+        document.delete()
+        assert version() != before
+
+    def test_linked_page_published(self, page, target, version):
+        before = version()
+        target.title = "Changed"
+        target.save_revision().publish()
+        assert version() != before
+
+    def test_tag_renamed(self, page, version):
+        before = version()
+        tag = Tag.objects.get(name="news")
+        tag.name = "updates"
+        tag.save()
+        assert version() != before
+
+    def test_embed_changed(self, page, version):
+        before = version()
+        Embed.objects.create(url=VIDEO, hash=get_embed_hash(VIDEO, 1200), html="<iframe></iframe>", type="video")
+        assert version() != before
+
+    def test_parent_moved(self, site_root, target):
+        child = CMSPage(title="Child", slug="child")
+        target.add_child(instance=child)
+        link = [{"type": "cta", "value": {"title": "Child", "link": {"page_link": child.pk}}}]
+        page = CMSPage(title="Linking", slug="linking", body=json.dumps(link))
+        site_root.add_child(instance=page)
+        page.save_revision().publish()
+        other = CMSPage(title="Other", slug="other")
+        site_root.add_child(instance=other)
+
+        before = get_version(page_version(page.pk))
+        Page.objects.get(pk=target.pk).move(other, pos="last-child")
+        assert get_version(page_version(page.pk)) != before
+
+    def test_unrelated_change(self, page, version):
+        before = version()
+        get_image_model().objects.create(title="Other", file=get_test_image_file())
+        assert version() == before
+
+    def test_footer_dependency(self, site_root, image):
+        footer = CMSFooterPage(
+            title="Footer", slug="footer", footer=json.dumps([{"type": "info", "value": {"image": image.pk}}])
+        )
+        site_root.add_child(instance=footer)
+        footer.save_revision().publish()
+        site_id = Site.objects.get(is_default_site=True).pk
+        cache.set(footer_cache_key(site_id), {"html": ""})
+        image.save()
+        assert cache.get(footer_cache_key(site_id)) is None
+
+    def test_menu_link(self, target):
+        site = Site.objects.get(is_default_site=True)
+        MenuLink.objects.create(site=site, link_page=target, menu_order=1)
+        before = get_version("menu")
+        target.save_revision().publish()
+        assert get_version("menu") != before
+
+
+@pytest.mark.django_db
+class TestBackfillCommand:
+    def test_backfill(self, page, target):
+        PageDependency.objects.all().delete()
+        output = StringIO()
+        call_command("backfill_page_dependencies", workers=1, chunk_size=1, stdout=output)
+        assert PageDependency.objects.filter(page=page).count() == 5
+        assert "Recorded the dependencies of" in output.getvalue()
+
+    def test_invalid_options(self):
+        with pytest.raises(CommandError):
+            call_command("backfill_page_dependencies", workers=0)
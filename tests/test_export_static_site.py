@@ -0,0 +1,122 @@
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+from wagtail.models import Site
+
+from cmspage.management.commands import export_static_site
+from cmspage.models import CMSPage, MenuLink
+from cmspage.versions import bump_version, page_version
+from tests.conftest import PACKAGE_TEMPLATES, WAGTAIL_TEMPLATES
+
+pytestmark = pytest.mark.usefixtures("clear_cache")
+
+
+@pytest.fixture(autouse=True)
+def templates(settings, mocker):
+    # the package's page body, rather than the empty test templates
+    settings.TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[PACKAGE_TEMPLATES, WAGTAIL_TEMPLATES])]
+    settings.ALLOWED_HOSTS = ["*"]
+    mocker.patch.object(CMSPage, "get_template", return_value="cmspage/includes/main.html")
+
+
+@pytest.fixture
+def pages(make_page):
+    return make_page("first", "First title"), make_page("second", "Second title")
+
+
+@pytest.fixture
+def export(tmp_path, mocker):
+    """Run the command, returning the ids of the pages rendered"""
+    export_chunk = mocker.spy(export_static_site, "export_chunk")
+
+    def export(**options):
+        export_chunk.reset_mock()
+        call_command("export_static_site", str(tmp_path), workers=1, no_static=True, stdout=StringIO(), **options)
+        return [task[0] for call in export_chunk.call_args_list for task in call.args[1]]
+
+    return export
+
+
+def exported_file(tmp_path, page) -> Path:
+    site = Site.objects.get(is_default_site=True)
+    return tmp_path / export_static_site.site_directory(site) / page.slug / "index.html"
+
+
+@pytest.mark.django_db
+class TestExport:
+    def test_pages_written(self, tmp_path, pages, export):
+        first, second = pages
+        assert sorted(export()) == sorted([first.pk, second.pk])
+        assert "First title" in exported_file(tmp_path, first).read_text()
+        assert "Second title" in exported_file(tmp_path, second).read_text()
+
+    def test_unchanged_pages_skipped(self, pages, export):
+        export()
+        assert export() == []
+
+    def test_changed_pages_rendered(self, pages, export):
+        first, second = pages
+        export()
+        first.save_revision().publish()
+        assert export() == [first.pk]
+        bump_version(page_version(second.pk))
+        assert export() == [second.pk]
+
+    def test_shared_changes_render_every_page(self, pages, export):
+        export()
+        MenuLink.clear_cached_menu_links()
+        assert len(export()) == 2
+
+    def test_full(self, pages, export):
+        export()
+        assert len(export(full=True)) == 2
+
+    def test_missing_file_rendered(self, tmp_path, pages, export):
+        first, _ = pages
+        export()
+        exported_file(tmp_path, first).unlink()
+        assert export() == [first.pk]
+
+    def test_unpublished_removed(self, tmp_path, pages, export):
+        first, second = pages
+        export()
+        first.unpublish()
+        export()
+        assert not exported_file(tmp_path, first).exists()
+        assert exported_file(tmp_path, second).exists()
+
+    def test_failed_pages_retried(self, tmp_path, pages, export, mocker):
+        first, second = pages
+        mocker.patch.object(CMSPage, "get_template", return_value="missing.html")
+        assert len(export()) == 2
+        assert not exported_file(tmp_path, first).exists()
+        mocker.patch.object(CMSPage, "get_template", return_value="cmspage/includes/main.html")
+        assert len(export()) == 2
+
+    def test_failed_changed_page_kept(self, tmp_path, pages, export, mocker):
+        first, _ = pages
+        export()
+        first.save_revision().publish()
+        mocker.patch.object(CMSPage, "get_template", return_value="missing.html")
+        assert export() == [first.pk]
+        assert "First title" in exported_file(tmp_path, first).read_text()
+        mocker.patch.object(CMSPage, "get_template", return_value="cmspage/includes/main.html")
+        assert export() == [first.pk]
+        assert export() == []
+
+    def test_static_files(self, tmp_path, pages, settings):
+        static_root = tmp_path / "collected"
+        (static_root / "css").mkdir(parents=True)
+        (static_root / "css" / "site.css").write_text("body {}")
+        settings.STATIC_ROOT, settings.STATIC_URL = str(static_root), "/static/"
+        output = tmp_path / "export"
+        call_command("export_static_site", str(output), workers=1, stdout=StringIO())
+        site = Site.objects.get(is_default_site=True)
+        assert (output / export_static_site.site_directory(site) / "static" / "css" / "site.css").exists()
+        assert export_static_site.copy_static(output / export_static_site.site_directory(site) / "static") == 0
+
+    def test_invalid_options(self, tmp_path):
+        with pytest.raises(CommandError):
+            call_command("export_static_site", str(tmp_path), workers=0)
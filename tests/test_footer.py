@@ -0,0 +1,167 @@
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from django.core.cache import cache
+from django.template import Context, Template
+from wagtail.models import Page, Site
+
+from cmspage.footer import SiteFooter, footer_cache_key, invalidate_footer_cache
+from cmspage.icons import icons_in_use, render_icon
+from cmspage.models import CMSFooterPage, CMSPage
+
+PACKAGE_TEMPLATES = Path(__file__).parent.parent / "cmspage" / "templates"
+TEST_SPRITE = "cmspage/test_icon_sprite.svg"
+ICON = "cmspage/icons/test.svg"
+FOOTER = Template("{% load cmspage_tags %}{% cmspage_footer %}")
+
+
+@pytest.fixture
+def templates(settings):
+    settings.TEMPLATES = [
+        dict(settings.TEMPLATES[0], DIRS=[*settings.TEMPLATES[0]["DIRS"], PACKAGE_TEMPLATES]),
+    ]
+
+
+def copyright_footer(text):
+    return json.dumps([{"type": "copy", "value": {"copyright": text}}])
+
+
+@pytest.fixture
+def site_root():
+    return Site.objects.get(is_default_site=True).root_page
+
+
+@pytest.fixture
+def footer(site_root):
+    page = CMSFooterPage(title="Footer", slug="footer", footer=copyright_footer("Copyright One"))
+    site_root.add_child(instance=page)
+    cache.delete(footer_cache_key(Site.objects.get(is_default_site=True).pk))
+    return page
+
+
+@pytest.fixture
+def page(site_root):
+    page = CMSPage(title="Page", slug="page", body=json.dumps([{"type": "title", "value": {"text": "Title"}}]))
+    site_root.add_child(instance=page)
+    return CMSPage.objects.get(pk=page.pk)
+
+
+def render_footer(page, request):
+    return FOOTER.render(Context(page.get_context(request)))
+
+
+@pytest.mark.django_db
+class TestFooterForSite:
+    @pytest.fixture
+    def other_site(self):
+        root = Page.objects.get(pk=1).add_child(instance=CMSPage(title="Other", slug="other"))
+        return Site.objects.create(hostname="other.example.com", root_page=root)
+
+    def test_site_footer(self, footer, other_site):
+        other = CMSFooterPage(title="Other footer", slug="footer", footer=copyright_footer("Copyright Two"))
+        other_site.root_page.add_child(instance=other)
+        default_site = Site.objects.get(is_default_site=True)
+
+        assert CMSFooterPage.for_site(default_site.pk) == footer
+        assert CMSFooterPage.for_site(other_site.pk) == other
+
+    def test_shared_footer(self, footer, other_site):
+        assert CMSFooterPage.for_site(other_site.pk) == footer
+        assert CMSFooterPage.for_site(None) == footer
+
+    def test_live_only(self, footer):
+        footer.unpublish()
+        assert CMSFooterPage.for_site(Site.objects.get(is_default_site=True).pk) is None
+
+    def test_one_footer_per_parent(self, footer, site_root):
+        assert not CMSFooterPage.can_create_at(site_root)
+        assert CMSFooterPage.can_create_at(Page.objects.get(pk=1))
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("templates")
+class TestCachedFooter:
+    def test_rendered_once(self, rf, footer, page, django_assert_num_queries):
+        html = render_footer(page, rf.get("/"))
+        assert "Copyright One" in html
+
+        page = CMSPage.objects.get(pk=page.pk)
+        request = rf.get("/")
+        page.get_url_parts(request)  # caches the site root paths
+        # a single cache read for the footer, without loading the footer page
+        with django_assert_num_queries(0):
+            assert render_footer(page, request) == html
+
+    def test_page_footer_loaded_when_used(self, rf, footer, page):
+        render_footer(page, rf.get("/"))
+        context = page.get_context(rf.get("/"))
+        assert context["site_footer"].cached is not None
+        assert context["page_footer"].pk == footer.pk
+
+    def test_cached_with_revision(self, rf, footer, page):
+        render_footer(page, rf.get("/"))
+        cached = cache.get(footer_cache_key(Site.objects.get(is_default_site=True).pk))
+        assert cached["page"] == footer.pk
+        assert cached["revision"] == footer.live_revision_id
+
+    def test_invalidated_on_publish(self, rf, footer, page):
+        render_footer(page, rf.get("/"))
+        footer = CMSFooterPage.objects.get(pk=footer.pk)
+        footer.footer = copyright_footer("Copyright Changed")
+        footer.save_revision().publish()
+
+        html = render_footer(CMSPage.objects.get(pk=page.pk), rf.get("/"))
+        assert "Copyright Changed" in html
+
+    def test_invalidate(self, rf, footer, page):
+        render_footer(page, rf.get("/"))
+        invalidate_footer_cache()
+        assert cache.get(footer_cache_key(Site.objects.get(is_default_site=True).pk)) is None
+
+    def test_preview_not_cached(self, rf, footer, page):
+        request = rf.get("/")
+        request.is_preview = True
+        assert "Copyright One" in render_footer(page, request)
+        assert cache.get(footer_cache_key(Site.objects.get(is_default_site=True).pk)) is None
+
+    def test_disabled(self, rf, settings, footer, page):
+        settings.CMSPAGE_FOOTER_CACHE = None
+        assert "Copyright One" in render_footer(page, rf.get("/"))
+        assert cache.get(footer_cache_key(Site.objects.get(is_default_site=True).pk)) is None
+
+    def test_no_footer(self, rf, page):
+        assert render_footer(page, rf.get("/")) == ""
+
+    def test_page_footer_without_site_footer(self, rf, footer):
+        context = Context({"request": rf.get("/"), "page_footer": footer})
+        assert "Copyright One" in FOOTER.render(context)
+
+
+class TestFooterIcons:
+    @pytest.fixture(autouse=True)
+    def test_sprite(self, settings):
+        settings.CMSPAGE_ICON_SPRITE = TEST_SPRITE
+
+    def render(self, site_footer, request):
+        context = Context({"request": request})
+        before = render_icon(context, ICON, css_class="before")
+        return before, site_footer.render(context), render_icon(context, ICON)
+
+    def test_cached_fragment_defines_its_symbols(self, mocker):
+        render = mocker.patch("cmspage.footer.render_footer_page")
+        render.side_effect = lambda page, context, template_name: render_icon(context, ICON)
+        site_footer = SiteFooter(cacheable=False)
+        site_footer.page = Mock()
+
+        before, footer_html, after = self.render(site_footer, Mock(spec=[]))
+        assert "<symbol" in before
+        assert "<symbol" in footer_html  # the fragment is self contained
+        assert "<symbol" not in after
+
+        # reusing the fragment marks its icons in use for the page
+        request = Mock(spec=[])
+        assert site_footer.render(Context({"request": request})) == footer_html
+        assert "<symbol" not in render_icon(Context({"request": request}), ICON)
+        assert icons_in_use({"request": request})["cmspage-icons-test"] is True
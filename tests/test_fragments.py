@@ -0,0 +1,170 @@
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+import wagtail
+from django.core.cache import cache
+from django.template import Context, Template
+from wagtail import blocks
+from wagtail.models import Site
+
+from cmspage.blocks.form import FormBlock
+from cmspage.blocks.title import TitleBlock
+from cmspage.fragments import fragment_key_prefix, is_cacheable, render_blocks
+from cmspage.models import CMSPage
+from cmspage.versions import REFERENCES, SITES, bump_version, page_version
+
+PACKAGE_TEMPLATES = Path(__file__).parent.parent / "cmspage" / "templates"
+WAGTAIL_TEMPLATES = Path(wagtail.__file__).parent / "templates"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+class CachedBlock(blocks.CharBlock):
+    class Meta:
+        cache_fragment = True
+
+
+class IndexBlock(blocks.CharBlock):
+    """Renders its value with its block index"""
+
+    class Meta:
+        cache_fragment = True
+
+    def render(self, value, context=None):
+        return f"<p>{value} {context.get('block_index')}</p>"
+
+
+STREAM_BLOCK = blocks.StreamBlock(
+    [("cached", CachedBlock()), ("uncached", blocks.CharBlock()), ("indexed", IndexBlock())]
+)
+
+
+def stream(*items):
+    return STREAM_BLOCK.to_python([{"type": kind, "value": value, "id": f"id-{kind}-{value}"} for kind, value in items])
+
+
+def mock_page(revision=5):
+    return Mock(pk=1, live_revision_id=revision, get_url_parts=Mock(return_value=(1, "http://localhost", "/")))
+
+
+class TestCacheableBlocks:
+    def test_body_blocks(self):
+        body_blocks = dict(CMSPage.body.field.stream_block.child_blocks)
+        uncacheable = [name for name, block in body_blocks.items() if not is_cacheable(block)]
+        assert uncacheable == ["video"]
+
+    def test_form_opts_out(self):
+        assert not is_cacheable(FormBlock())
+
+
+@pytest.mark.django_db
+class TestRenderBlocks:
+    def test_renders_as_include_block(self):
+        value = stream(("cached", "a"), ("uncached", "b"), ("indexed", "c"))
+        assert render_blocks(value, Context(), mock_page()) == "ab<p>c 2</p>"
+
+    def test_cached_blocks_rendered_once(self, mocker):
+        page = mock_page()
+        cached = mocker.spy(CachedBlock, "render")
+        uncached = mocker.spy(blocks.CharBlock, "render")
+        value = stream(("cached", "a"), ("uncached", "b"))
+
+        assert render_blocks(value, Context(), page) == "ab"
+        assert render_blocks(value, Context(), page) == "ab"
+        assert cached.call_count == 1
+        assert uncached.call_count == 2
+
+    @pytest.mark.parametrize("version", [page_version(1), SITES])
+    def test_keyed_by_revision_block_and_version(self, mocker, version):
+        render = mocker.spy(CachedBlock, "render")
+        value = stream(("cached", "a"))
+        render_blocks(value, Context(), mock_page(5))
+        render_blocks(value, Context(), mock_page(6))
+        render_blocks(stream(("cached", "b")), Context(), mock_page(6))
+        bump_version(version)
+        render_blocks(value, Context(), mock_page(6))
+        assert render.call_count == 4
+
+    def test_other_dependencies(self, mocker):
+        render = mocker.spy(CachedBlock, "render")
+        value = stream(("cached", "a"))
+        render_blocks(value, Context(), mock_page())
+        bump_version(page_version(2), REFERENCES)
+        render_blocks(value, Context(), mock_page())
+        assert render.call_count == 1
+
+    def test_keyed_by_site(self):
+        page = mock_page()
+        prefix = fragment_key_prefix(page)
+        page.get_url_parts.return_value = (2, "http://other", "/")
+        assert fragment_key_prefix(page) != prefix
+
+    @pytest.mark.parametrize("attribute", ["is_preview", "in_preview_panel"])
+    def test_previews_not_cached(self, attribute):
+        request = Mock(spec=[attribute], **{attribute: True})
+        assert fragment_key_prefix(mock_page(), request) is None
+
+    def test_without_live_revision(self):
+        assert fragment_key_prefix(mock_page(None)) is None
+
+    def test_disabled(self, settings, mocker):
+        settings.CMSPAGE_FRAGMENT_CACHE = None
+        render = mocker.spy(CachedBlock, "render")
+        for _ in range(2):
+            assert render_blocks(stream(("cached", "a")), Context(), mock_page()) == "a"
+        assert render.call_count == 2
+
+    def test_empty(self):
+        assert render_blocks(None, Context(), mock_page()) == ""
+
+
+@pytest.mark.django_db
+class TestPageBody:
+    @pytest.fixture(autouse=True)
+    def templates(self, settings):
+        settings.TEMPLATES = [
+            dict(settings.TEMPLATES[0], DIRS=[*settings.TEMPLATES[0]["DIRS"], PACKAGE_TEMPLATES, WAGTAIL_TEMPLATES]),
+        ]
+
+    @pytest.fixture
+    def page(self):
+        body = [
+            {"type": "title", "value": {"text": "A title"}},
+            {"type": "new_section", "value": {}},
+            {"type": "lines", "value": {"lines": [{"title": "Line", "content": "<p>Text</p>"}]}},
+        ]
+        page = CMSPage(title="Body", slug="body", body=json.dumps(body))
+        Site.objects.get(is_default_site=True).root_page.add_child(instance=page)
+        page.save_revision().publish()
+        return CMSPage.objects.get(pk=page.pk)
+
+    def test_matches_include_block(self, rf, page):
+        context = page.get_context(rf.get("/"))
+        expected = Template(
+            "{% load wagtailcore_tags %}"
+            "{% for block in page.body %}{% include_block block with block_index=forloop.counter0 %}{% endfor %}"
+        ).render(Context(context))
+        template = Template("{% load cmspage_tags %}{% cmspage_blocks page.body %}")
+        assert template.render(Context(context)) == expected
+        assert "A title" in expected
+
+    def test_cached_body(self, rf, page, mocker):
+        template = Template("{% load cmspage_tags %}{% cmspage_blocks page.body %}")
+        html = template.render(Context(page.get_context(rf.get("/"))))
+        render = mocker.spy(TitleBlock, "render")
+        page = CMSPage.objects.get(pk=page.pk)
+        assert template.render(Context(page.get_context(rf.get("/")))) == html
+        render.assert_not_called()
+
+    def test_republished(self, rf, page):
+        template = Template("{% load cmspage_tags %}{% cmspage_blocks page.body %}")
+        template.render(Context(page.get_context(rf.get("/"))))
+        page.body[0].value["text"] = "New title"
+        page.save_revision().publish()
+        page = CMSPage.objects.get(pk=page.pk)
+        assert "New title" in template.render(Context(page.get_context(rf.get("/"))))
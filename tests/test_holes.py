@@ -0,0 +1,200 @@
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.middleware.csrf import get_token
+from django.template import Context, Template, engines
+from django.template.response import TemplateResponse
+from wagtail.models import Page, Site
+
+from cmspage.context_processors import cmspage_context
+from cmspage.holes import fill_holes, punch_hole, punched_holes, register_hole, serve_with_holes
+from cmspage.models import MenuLink
+from tests.conftest import PACKAGE_TEMPLATES
+
+SHELL = (
+    "{% load cmspage_tags %}<p>{{ page.title }}</p>"
+    '{% cmspage_hole "csrf_token" %}{% csrf_token %}{% endcmspage_hole %}'
+    '{% cmspage_hole "messages" template="cmspage/includes/messages.html" %}inline{% endcmspage_hole %}'
+)
+
+pytestmark = pytest.mark.usefixtures("clear_cache")
+
+
+@pytest.fixture
+def templates(settings):
+    # the package's includes, rather than the empty test templates
+    settings.TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[PACKAGE_TEMPLATES])]
+
+
+@pytest.fixture
+def page_slug():
+    return "holes"
+
+
+@pytest.fixture
+def serve(mocker):
+    """Page.serve, rendering the SHELL template and counting its renders"""
+    renders = []
+
+    def render(page, request, *args, **kwargs):
+        renders.append(request)
+        return TemplateResponse(request, engines["django"].from_string(SHELL), {"page": page})
+
+    serve = mocker.patch.object(Page, "serve", autospec=True, side_effect=render)
+    serve.renders = renders
+    return serve
+
+
+def get(page, request):
+    response = page.serve(request)
+    if hasattr(response, "render"):
+        response.render()
+    return response.content.decode()
+
+
+def with_message(request, message="Saved"):
+    request.session = {}
+    request._messages = FallbackStorage(request)
+    request._messages.add(20, message)
+    return request
+
+
+class TestHoleTag:
+    def test_rendered_in_place(self, rf):
+        template = Template('{% load cmspage_tags %}{% cmspage_hole "test" %}in {{ place }}{% endcmspage_hole %}')
+        assert template.render(Context({"request": rf.get("/"), "place": "place"})) == "in place"
+
+    def test_punched(self, rf):
+        request = rf.get("/")
+        request.cmspage_holes = set()
+        template = Template('{% load cmspage_tags %}{% cmspage_hole "test" value=1 %}in place{% endcmspage_hole %}')
+        html = template.render(Context({"request": request}))
+        assert html.startswith("<!--cmspage-hole:")
+        assert punched_holes(request) == {"test"}
+
+
+class TestFillHoles:
+    @pytest.fixture
+    def renderer(self):
+        register_hole("test", lambda request, value=None: f"<b>{value}</b>")
+
+    def test_filled(self, rf, renderer):
+        request = rf.get("/")
+        request.cmspage_holes = set()
+        html = f"<p>{punch_hole(request, 'test', {'value': 1})}</p>"
+        assert fill_holes(request, html) == "<p><b>1</b></p>"
+
+    def test_forged(self, rf, renderer):
+        assert fill_holes(rf.get("/"), "<p><!--cmspage-hole:test:forged--></p>") == "<p></p>"
+
+    def test_without_holes(self, rf):
+        assert fill_holes(rf.get("/"), "<p>text</p>") == "<p>text</p>"
+
+    def test_disabled(self, rf, settings):
+        settings.CMSPAGE_HOLES = False
+        request = rf.get("/")
+        serve_with_holes(request, lambda: None)
+        assert not hasattr(request, "cmspage_holes")
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("templates")
+class TestHolePunchedPages:
+    def test_csrf_token_filled(self, page, anonymous, serve):
+        request = anonymous()
+        html = get(page, request)
+        assert f'value="{get_token(request)}"' not in html  # masked differently for each use
+        assert 'name="csrfmiddlewaretoken"' in html
+        assert request.META["CSRF_COOKIE_NEEDS_UPDATE"]
+
+    def test_shell_cached(self, page, anonymous, serve):
+        first, second = get(page, anonymous()), get(page, anonymous())
+        assert len(serve.renders) == 1
+        assert "<p>Holes</p>" in second
+        assert "<!--cmspage-hole:" not in second
+        # each visitor has a token of their own
+        assert first != second
+
+    def test_messages_filled(self, page, anonymous, serve):
+        get(page, anonymous())
+        html = get(page, with_message(anonymous()))
+        assert "Saved" in html
+        assert len(serve.renders) == 1
+
+    def test_messages_without_hole(self, page, anonymous, serve, mocker):
+        mocker.patch(f"{__name__}.SHELL", "<p>{{ page.title }}</p>")
+        get(page, anonymous())
+        get(page, with_message(anonymous()))
+        assert len(serve.renders) == 2
+
+    def test_authenticated(self, page, anonymous, serve, settings):
+        settings.CMSPAGE_PAGE_CACHE_AUTHENTICATED = True
+        user = User.objects.create_user("visitor")
+        for _ in range(2):
+            request = anonymous()
+            request.user = user
+            get(page, request)
+        get(page, anonymous())
+        assert len(serve.renders) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("templates")
+class TestNavigationHole:
+    TEMPLATE = (
+        '{% load cmspage_tags %}{% cmspage_hole "navigation" %}'
+        "<h1>{{ page.title }}</h1>{% cmspage_navigation navigation %}{% endcmspage_hole %}"
+    )
+
+    @pytest.fixture
+    def site(self):
+        site = Site.objects.get(is_default_site=True)
+        MenuLink.objects.create(site=site, menu_title="Public", link_url="https://example.com/public", menu_order=1)
+        return site
+
+    @pytest.fixture
+    def staff_link(self, site):
+        MenuLink.objects.create(
+            site=site, menu_title="Staff", link_url="https://example.com/staff", menu_order=2, staff_only=True
+        )
+
+    def render(self, request):
+        request.cmspage_holes = set()
+        context = Context({"request": request, "page": {"title": "In place"}} | cmspage_context(request))
+        return fill_holes(request, Template(self.TEMPLATE).render(context))
+
+    def test_staff_links(self, anonymous, staff_link, settings):
+        request = anonymous()
+        assert "Public" in (html := self.render(request))
+        assert "Staff" not in html
+        assert punched_holes(request) == {"navigation"}
+
+        settings.CMSPAGE_PAGE_CACHE_AUTHENTICATED = True
+        request = anonymous()
+        request.user = User.objects.create_user("staff", is_staff=True)
+        assert "Staff" in self.render(request)
+        assert punched_holes(request) == {"navigation"}
+
+    def test_reduced_context(self, anonymous, staff_link):
+        # the page is not in the context the hole is filled with
+        assert "In place" not in self.render(anonymous())
+
+    def test_in_place_without_staff_links(self, anonymous, site):
+        request = anonymous()
+        assert "<h1>In place</h1>" in (html := self.render(request))
+        assert "Public" in html
+        assert not punched_holes(request)
+
+    def test_in_place_when_not_cached(self, anonymous, staff_link, settings):
+        settings.CMSPAGE_PAGE_CACHE = None
+        request = anonymous()
+        assert "<h1>In place</h1>" in self.render(request)
+        assert not punched_holes(request)
+
+        # nor for a staff user whose pages are not cached
+        del settings.CMSPAGE_PAGE_CACHE
+        request = anonymous()
+        request.user = User.objects.create_user("staff", is_staff=True)
+        assert "Staff" in (html := self.render(request))
+        assert "<h1>In place</h1>" in html
+        assert not punched_holes(request)
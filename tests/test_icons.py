@@ -0,0 +1,267 @@
+import pytest
+from unittest.mock import Mock
+from django.template import Context, Template
+
+from cmspage.icons import icon_id, icon_sprite, icons_in_use, render_icon
+from cmspage.scripts import mkicons
+
+ICON = "cmspage/icons/test.svg"
+TEST_SPRITE = "cmspage/test_icon_sprite.svg"
+
+STYLED_SVG = """<?xml version="1.0" encoding="utf-8"?>
+<!-- Generator: Adobe Illustrator -->
+<svg version="1.1" id="Layer_1" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+     width="800px" height="800px" viewBox="0 0 32 32" xml:space="preserve" style="enable-background:new 0 0 32 32;">
+  <metadata>editor data</metadata>
+  <style type="text/css">
+    .st0{fill:currentColor;}
+    .st1{clip-path:url(#clip_1);}
+  </style>
+  <defs><clipPath id="clip_1"><rect width="32" height="32"/></clipPath></defs>
+  <g class="st1">
+    <path class="st0"    d="M10,14V8
+       c0-3.866,3.134-7,7-7z"/>
+    <use xlink:href="#clip_1"/>
+  </g>
+</svg>
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_sprite():
+    icon_sprite.cache_clear()
+    yield
+    icon_sprite.cache_clear()
+
+
+class TestMkIconsSprite:
+    """Test suite for sprite generation in mkicons"""
+
+    def test_icon_id(self):
+        assert mkicons.icon_id("cmspage/icons/tech/cloud.svg") == "cmspage-icons-tech-cloud"
+        assert mkicons.icon_id("cmspage/icons/social/X.svg") == icon_id("cmspage/icons/social/X.svg")
+
+    def test_svg_symbol(self, tmp_path):
+        icon_file = tmp_path / "styled.svg"
+        icon_file.write_text(STYLED_SVG)
+        symbol = mkicons.svg_symbol(icon_file, "icon-styled")
+
+        assert symbol.startswith('<symbol id="icon-styled" viewBox="0 0 32 32">')
+        for dropped in ("version=", "xml:space", "enable-background", "metadata", "xmlns", "Layer_1", "<!--"):
+            assert dropped not in symbol
+        # class names and ids are scoped to the symbol
+        assert ".icon-styled-st0{fill:currentColor;}" in symbol
+        assert "url(#icon-styled-clip_1)" in symbol
+        assert 'class="icon-styled-st0"' in symbol
+        assert 'id="icon-styled-clip_1"' in symbol
+        assert 'href="#icon-styled-clip_1"' in symbol
+        # whitespace is collapsed
+        assert 'd="M10,14V8 c0-3.866,3.134-7,7-7z"' in symbol
+
+    def test_svg_symbol_viewbox_from_dimensions(self, tmp_path):
+        icon_file = tmp_path / "sized.svg"
+        icon_file.write_text(
+            '<svg xmlns="http://www.w3.org/2000/svg" width="24px" height="16px"><path d="M0 0"/></svg>'
+        )
+        assert 'viewBox="0 0 24 16"' in mkicons.svg_symbol(icon_file, "sized")
+
+    def test_generate_sprite_and_subset(self, tmp_path):
+        icons_dir = tmp_path / "templates" / "cmspage" / "icons"
+        (icons_dir / "tech").mkdir(parents=True)
+        (icons_dir / "tech" / "cloud.svg").write_text(STYLED_SVG)
+        (icons_dir / "home.svg").write_text(STYLED_SVG)
+
+        icon_files = mkicons.find_icons([str(icons_dir)], recursive=True)
+        assert sorted(icon_files) == ["cmspage/icons/home.svg", "cmspage/icons/tech/cloud.svg"]
+
+        count, sprite = mkicons.generate_sprite(sorted(icon_files), icon_files)
+        assert count == 2
+        assert sprite.startswith('<svg xmlns="http://www.w3.org/2000/svg" style="display:none">')
+        assert '<symbol id="cmspage-icons-home"' in sprite
+        assert '<symbol id="cmspage-icons-tech-cloud"' in sprite
+
+        assert mkicons.subset_icons(sorted(icon_files), ["cloud"]) == ["cmspage/icons/tech/cloud.svg"]
+        assert mkicons.subset_icons(sorted(icon_files), ["home.svg", "cmspage/icons/tech/cloud.svg"]) == sorted(
+            icon_files
+        )
+        assert mkicons.subset_icons(sorted(icon_files), None) == sorted(icon_files)
+
+
+class TestMkIconsOptimize:
+    """Test suite for the icon optimisation stage in mkicons"""
+
+    def test_strips_metadata_and_inlines_styles(self):
+        optimized = mkicons.optimize_svg(STYLED_SVG)
+
+        assert optimized.startswith('<svg xmlns="http://www.w3.org/2000/svg" width="800px" height="800px"')
+        dropped_markup = ("version=", "xml:space", "enable-background", "metadata", "Layer_1", "<!--", "<style", "class=")
+        for dropped in dropped_markup:
+            assert dropped not in optimized
+        # class based rules become attributes, references are kept
+        assert 'clip-path="url(#clip_1)"' in optimized
+        assert '<path d="M10 14V8c0-3.866 3.134-7 7-7z" fill="currentColor" />' in optimized
+        assert '<use href="#clip_1" />' in optimized
+        # the group only held the class, so it remains with the inlined clip path
+        assert "<g " in optimized
+
+    def test_inline_style_wins(self):
+        source = (
+            '<svg xmlns="http://www.w3.org/2000/svg"><style>.a{fill:#FF0000;opacity:.5;cursor:pointer}</style>'
+            '<path class="a" style="opacity:1" d="M0 0"/><path class="a" d="M1 1"/></svg>'
+        )
+        optimized = mkicons.optimize_svg(source)
+        assert '<path style="cursor:pointer;opacity:1" d="M0 0" fill="#FF0000" />' in optimized
+        assert '<path d="M1 1" fill="#FF0000" opacity=".5" style="cursor:pointer" />' in optimized
+
+    def test_complex_stylesheet_kept(self):
+        source = (
+            '<svg xmlns="http://www.w3.org/2000/svg"><style>path .a { fill: red } .b{fill:blue}</style>'
+            '<path class="a b unused" d="M0 0"/></svg>'
+        )
+        optimized = mkicons.optimize_svg(source)
+        assert "<style>path .a { fill: red } .b{fill:blue}</style>" in optimized
+        assert 'class="a b"' in optimized
+
+    @pytest.mark.parametrize(
+        "source, expected",
+        [
+            # implicitly black
+            ('<svg xmlns="http://www.w3.org/2000/svg"><path d="M0 0"/></svg>', '<svg xmlns="{}" fill="currentColor">'),
+            # black, however it is written
+            (
+                '<svg xmlns="http://www.w3.org/2000/svg"><path fill="#000" stroke="black"/></svg>',
+                'fill="currentColor" stroke="currentColor"',
+            ),
+            # no fill is not a colour
+            ('<svg xmlns="http://www.w3.org/2000/svg"><path fill="none" style="stroke:#000000"/></svg>',
+             'fill="none" style="stroke:currentColor"'),
+            # any other colour, such as a brand colour, is left as is
+            ('<svg xmlns="http://www.w3.org/2000/svg"><path style="fill:#1777f2"/></svg>', 'style="fill:#1777f2"'),
+            ('<svg xmlns="http://www.w3.org/2000/svg"><path fill="none" stroke="#333"/></svg>', 'stroke="#333"'),
+            # as is black used alongside another colour
+            ('<svg xmlns="http://www.w3.org/2000/svg"><path fill="#000"/><path fill="red"/></svg>', 'fill="#000"'),
+        ],
+    )
+    def test_current_color(self, source, expected):
+        assert expected.format(mkicons.SVG_NS) in mkicons.optimize_svg(source)
+
+    def test_minify_path(self):
+        assert mkicons._minify_path("M 0.259 135.758.858 L-0.5,1.0004.5 z m10 20 -3e2 1.2345") == (
+            "M.259 135.758.858L-.5 1 .5zm10 20-300 1.234"
+        )
+        # arc flags may be written without separators, so arcs are only collapsed
+        assert mkicons._minify_path("M1  1\n a1 1 0 00 1 1") == "M1 1 a1 1 0 00 1 1"
+
+    def test_unwraps_plain_groups(self):
+        source = '<svg xmlns="http://www.w3.org/2000/svg" fill="red"><g><g><path d="M0 0"/></g></g></svg>'
+        assert mkicons.optimize_svg(source).endswith('fill="red"><path d="M0 0" /></svg>')
+
+    def test_optimize_icons_and_report(self, tmp_path):
+        source_dir, output_dir = tmp_path / "sources", tmp_path / "icons"
+        (source_dir / "tech").mkdir(parents=True)
+        (source_dir / "tech" / "styled.svg").write_text(STYLED_SVG)
+        (source_dir / "plain.svg").write_text('<svg xmlns="http://www.w3.org/2000/svg"><path d="M0 0"/></svg>')
+
+        results = mkicons.optimize_icons(str(source_dir), str(output_dir), jobs=1)
+
+        assert sorted(path.relative_to(output_dir).as_posix() for path, _, _ in results) == [
+            "plain.svg",
+            "tech/styled.svg",
+        ]
+        for path, original, optimized in results:
+            assert path.stat().st_size == optimized
+        styled = next(result for result in results if result[0].name == "styled.svg")
+        assert styled[2] < styled[1]
+
+        report = mkicons.size_report(results, str(output_dir)).splitlines()
+        assert report[0].split() == ["Icon", "Original", "Optimised", "Saving"]
+        assert report[2].startswith("tech/styled.svg")
+        assert report[-1].startswith("Total (2 icons)")
+
+    def test_optimize_icons_process_pool(self, tmp_path):
+        source_dir, output_dir = tmp_path / "sources", tmp_path / "icons"
+        source_dir.mkdir()
+        for index in range(3):
+            (source_dir / f"icon{index}.svg").write_text(STYLED_SVG)
+
+        results = mkicons.optimize_icons(str(source_dir), str(output_dir), jobs=2)
+
+        assert [path.name for path, _, _ in results] == ["icon0.svg", "icon1.svg", "icon2.svg"]
+        assert all((output_dir / f"icon{index}.svg").exists() for index in range(3))
+
+
+class TestRenderIcon:
+    """Test suite for rendering icons from the sprite"""
+
+    @pytest.fixture(autouse=True)
+    def test_sprite(self, settings):
+        settings.CMSPAGE_ICON_SPRITE = TEST_SPRITE
+
+    def test_icon_sprite(self):
+        sprite = icon_sprite()
+        assert list(sprite) == ["cmspage-icons-test"]
+        viewbox, symbol = sprite["cmspage-icons-test"]
+        assert viewbox == "0 0 24 24"
+        assert symbol.startswith('<symbol id="cmspage-icons-test"') and symbol.endswith("</symbol>")
+
+    def test_first_use_defines_symbol(self):
+        context = Context()
+        first = render_icon(context, ICON)
+        second = render_icon(context, ICON)
+
+        assert first.count("<symbol") == 1
+        assert '<use href="#cmspage-icons-test"></use>' in first
+        assert second == (
+            '<svg class="cmspage-icon" viewBox="0 0 24 24" aria-hidden="true">'
+            '<use href="#cmspage-icons-test"></use></svg>'
+        )
+
+    def test_symbol_defined_once_per_request(self):
+        """Icons rendered in separate templates for the same request share the definitions"""
+        request = Mock(spec=[])
+        first = render_icon(Context({"request": request}), ICON)
+        second = render_icon(Context({"request": request}), ICON, css_class="large")
+
+        assert "<symbol" in first
+        assert "<symbol" not in second
+        assert 'class="cmspage-icon large"' in second
+        assert icons_in_use({"request": request}) is request.cmspage_icons
+
+        assert "<symbol" in render_icon(Context({"request": Mock(spec=[])}), ICON)
+
+    def test_template_tag(self):
+        template = Template(
+            "{% load cmspage_tags %}{% cmspage_icon icon %}{% cmspage_icon icon %}{% cmspage_icon '' %}"
+        )
+        html = template.render(Context({"icon": ICON}))
+        assert html.count("<svg") == 2
+        assert html.count("<symbol") == 1
+
+    def test_icon_not_in_sprite_is_included(self):
+        from django.template import engines
+
+        context = Context()
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            included = Mock(return_value=engines["django"].from_string("<svg>custom</svg>"))
+            monkeypatch.setattr("cmspage.icons.get_template", included)
+            monkeypatch.setattr("cmspage.icons.icon_sprite", lambda: {})
+            assert render_icon(context, "myapp/icons/custom.svg") == "<svg>custom</svg>"
+            assert render_icon(context, "myapp/icons/custom.svg") == "<svg>custom</svg>"
+        included.assert_called_once_with("myapp/icons/custom.svg")
+
+    def test_sprite_disabled(self, settings):
+        settings.CMSPAGE_ICON_SPRITE = False
+        assert icon_sprite() == {}
+        assert render_icon(Context(), ICON).strip().startswith('<svg viewBox="0 0 24 24"><path')
+
+    def test_sprite_missing(self, settings):
+        settings.CMSPAGE_ICON_SPRITE = "cmspage/missing_sprite.svg"
+        assert icon_sprite() == {}
+
+    def test_navigation_uses_sprite(self):
+        from cmspage.navigation import NavigationFormatter
+
+        items = [{"title": "A", "url": "/a/", "icon": ICON, "children": [{"title": "B", "url": "/b/", "icon": ICON}]}]
+        html = NavigationFormatter(Context()).render(items)
+        assert html.count("<symbol") == 1
+        assert html.count('<use href="#cmspage-icons-test">') == 2
@@ -0,0 +1,169 @@
+import re
+
+import pytest
+from unittest.mock import patch
+from django.template import Context, Template
+from django.test import override_settings
+from django.utils.safestring import mark_safe
+
+from cmspage.navigation import NavigationFormatter, get_navigation_formatter, is_bundled_template
+from cmspage.performance import build_benchmark_menu
+from tests.conftest import PACKAGE_TEMPLATES
+
+NAVIGATION_ITEM = "cmspage/includes/navigation_item.html"
+ICON = "cmspage/icons/test.svg"
+
+
+def normalise(html):
+    """Collapse whitespace between and within tags, which the formatter does not reproduce"""
+    return re.sub(r"\s+", " ", re.sub(r">\s+", ">", re.sub(r"\s+<", "<", html))).strip()
+
+
+def include_render(navigation):
+    """Render navigation the previous way, with a recursive include per item"""
+    template = Template(
+        "{% load cmspage_tags %}{% for item in navigation %}"
+        "{% cmspage_include include.navigation_item with item=item level=0 %}{% endfor %}"
+    )
+    return template.render(Context({"navigation": navigation, "include": {"navigation_item": NAVIGATION_ITEM}}))
+
+
+def tag_render(navigation, arguments=""):
+    template = Template(f"{{% load cmspage_tags %}}{{% cmspage_navigation navigation {arguments} %}}")
+    return template.render(Context({"navigation": navigation, "include": {"navigation_item": NAVIGATION_ITEM}}))
+
+
+class UpperFormatter(NavigationFormatter):
+    def format_label(self, item):
+        return mark_safe(super().format_label(item).upper())
+
+
+@pytest.fixture
+def navigation():
+    return [
+        {"title": "Home", "url": "/", "icon": ICON, "icon_color": "text-primary", "children": []},
+        {
+            "title": "About <us>",
+            "url": "/about/?a=1&b=2",
+            "icon": None,
+            "icon_color": None,
+            "children": [
+                {"title": "Team", "url": "/about/team/", "icon": ICON, "icon_color": "text-info", "children": []},
+                {
+                    "title": "History",
+                    "url": "/about/history/",
+                    "icon": "",
+                    "icon_color": "",
+                    "children": [{"title": "1990s", "url": "/about/history/1990s/", "children": []}],
+                },
+            ],
+        },
+    ]
+
+
+class TestNavigationFormatter:
+    """Test suite for single pass navigation rendering"""
+
+    def test_same_markup_as_navigation_item(self, navigation):
+        """The formatter reproduces navigation_item.html, apart from whitespace"""
+        assert normalise(tag_render(navigation)) == normalise(include_render(navigation))
+
+    def test_level_classes_and_escaping(self, navigation):
+        html = tag_render(navigation)
+        assert 'class="menu-link level-0 align-top"' in html
+        assert 'class="menu-link level-1 align-top"' in html
+        assert 'class="menu-link level-2 align-top"' in html
+        assert "About &lt;us&gt;" in html
+        assert 'href="/about/?a=1&amp;b=2"' in html
+        assert html.count('<ul class="list-unstyled">') == 2
+
+    def test_object_items(self):
+        class Item:
+            title = "Object"
+            url = "/object/"
+            icon = None
+            icon_color = None
+            children = ()
+
+        assert 'href="/object/"' in tag_render([Item()])
+
+    def test_empty_navigation(self):
+        assert tag_render([]) == ""
+        assert tag_render(None) == ""
+
+    def test_navigation_defaults_to_context(self, navigation):
+        template = Template("{% load cmspage_tags %}{% cmspage_navigation %}")
+        assert normalise(template.render(Context({"navigation": navigation}))) == normalise(tag_render(navigation))
+
+    def test_icon_rendered_once(self, navigation):
+        from django.template.loader import get_template
+
+        with patch("cmspage.icons.get_template", side_effect=get_template) as mock_get_template:
+            html = tag_render(navigation)
+        assert [call.args for call in mock_get_template.call_args_list].count((ICON,)) == 1
+        assert html.count("<svg") == 2
+
+    def test_formatter_argument(self, navigation):
+        html = tag_render(navigation, "formatter='tests.test_navigation.UpperFormatter'")
+        assert "HOME" in html
+        assert 'SPAN CLASS="FW-BOLDER"' in html
+
+    @override_settings(CMSPAGE_NAVIGATION_FORMATTER="tests.test_navigation.UpperFormatter")
+    def test_formatter_setting(self, navigation):
+        assert get_navigation_formatter() is UpperFormatter
+        assert "HOME" in tag_render(navigation)
+
+    def test_formatter_class(self):
+        assert get_navigation_formatter(UpperFormatter) is UpperFormatter
+        assert get_navigation_formatter() is NavigationFormatter
+
+    def test_custom_item_template_is_included(self, navigation):
+        """An overridden navigation_item template is still rendered per item"""
+        from django.template import engines
+
+        item_template = engines["django"].from_string("[{{ item.title }}:{{ level }}:{{ extra }}]")
+        with patch("cmspage.navigation.get_template", return_value=item_template) as mock_get_template:
+            template = Template(
+                "{% load cmspage_tags %}{% cmspage_navigation navigation item_template='custom/item.html' %}"
+            )
+            context = Context({"navigation": navigation, "extra": "x"})
+            assert template.render(context) == "[Home:0:x][About &lt;us&gt;:0:x]"
+        mock_get_template.assert_called_with("custom/item.html")
+        assert "item" not in context
+
+    @pytest.fixture
+    def bundled_templates(self, settings):
+        settings.TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[PACKAGE_TEMPLATES, *settings.TEMPLATES[0]["DIRS"]])]
+        is_bundled_template.cache_clear()
+        yield
+        is_bundled_template.cache_clear()
+
+    def test_bundled_item_template_uses_formatter(self, navigation, bundled_templates):
+        with patch("cmspage.templatetags.cmspage_tags.render_navigation_items") as mock_render_items:
+            html = tag_render(navigation, "item_template=include.navigation_item")
+        mock_render_items.assert_not_called()
+        assert "menu-item" in html
+
+    def test_overridden_item_template_is_included(self, navigation, settings, tmp_path):
+        """An override at the bundled template's path is included"""
+        override = tmp_path / NAVIGATION_ITEM
+        override.parent.mkdir(parents=True)
+        override.write_text("[{{ item.title }}]")
+        settings.TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[tmp_path, *settings.TEMPLATES[0]["DIRS"]])]
+        is_bundled_template.cache_clear()
+        try:
+            assert tag_render(navigation, "item_template=include.navigation_item") == "[Home][About &lt;us&gt;]"
+        finally:
+            is_bundled_template.cache_clear()
+
+    @override_settings(CMSPAGE_NAVIGATION_FORMATTER="tests.test_navigation.UpperFormatter")
+    def test_configured_formatter_ignores_item_template(self, navigation):
+        with patch("cmspage.templatetags.cmspage_tags.render_navigation_items") as mock_render_items:
+            html = tag_render(navigation, "item_template=include.navigation_item")
+        mock_render_items.assert_not_called()
+        assert "HOME" in html
+
+    def test_large_menu_matches_include(self):
+        """A 500 node menu renders the same markup as recursive includes"""
+        navigation = build_benchmark_menu(500, children=4, depth=4)
+        assert normalise(tag_render(navigation)) == normalise(include_render(navigation))
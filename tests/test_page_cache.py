@@ -0,0 +1,226 @@
+import gzip
+
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template.response import TemplateResponse
+from wagtail.models import Page
+
+from cmspage import page_cache
+from cmspage.footer import invalidate_footer_cache
+from cmspage.models import CMSPage, MenuLink
+from cmspage.page_cache import page_cache_key
+from cmspage.versions import SITES, bump_version, page_version
+from tests.conftest import PACKAGE_TEMPLATES, WAGTAIL_TEMPLATES
+
+pytestmark = pytest.mark.usefixtures("clear_cache")
+
+
+@pytest.fixture
+def page_slug():
+    return "cached"
+
+
+@pytest.fixture
+def serve(mocker):
+    """Page.serve, rendering a template response that counts its renders"""
+    renders = []
+
+    def render(page, request, *args, **kwargs):
+        renders.append(request)
+        return TemplateResponse(request, "cmspage/cms_page.html", {"page": page})
+
+    serve = mocker.patch.object(Page, "serve", autospec=True, side_effect=render)
+    mocker.patch.object(TemplateResponse, "rendered_content", "<p>rendered</p>")
+    serve.renders = renders
+    return serve
+
+
+def get(page, request):
+    response = page.serve(request)
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+@pytest.mark.django_db
+class TestServeCached:
+    def test_served_from_cache(self, page, anonymous, serve):
+        assert get(page, anonymous()).content == b"<p>rendered</p>"
+        response = get(page, anonymous())
+        assert response.content == b"<p>rendered</p>"
+        assert response["Content-Type"].startswith("text/html")
+        assert len(serve.renders) == 1
+
+    def test_head(self, page, anonymous, serve):
+        get(page, anonymous())
+        assert get(page, anonymous(method="head")).content == b"<p>rendered</p>"
+        assert len(serve.renders) == 1
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda page: page.save_revision().publish(),
+            lambda page: MenuLink.clear_cached_menu_links(),
+            lambda page: invalidate_footer_cache(),
+            lambda page: bump_version(SITES),
+            lambda page: bump_version(page_version(page.pk)),
+        ],
+        ids=["published", "menu", "footer", "sites", "dependencies"],
+    )
+    def test_invalidated(self, page, anonymous, serve, change):
+        get(page, anonymous())
+        change(page)
+        get(CMSPage.objects.get(pk=page.pk), anonymous())
+        assert len(serve.renders) == 2
+
+    def test_keyed_by_site_and_path(self, page, anonymous, mocker):
+        key = page_cache_key(page, anonymous())
+        assert page_cache_key(page, anonymous("/other/")) != key
+        mocker.patch.object(CMSPage, "get_url_parts", return_value=(99, "http://other", "/cached/"))
+        assert page_cache_key(page, anonymous()) != key
+
+    def test_authenticated(self, page, anonymous, serve):
+        user = User.objects.create_user("visitor")
+        for _ in range(2):
+            request = anonymous()
+            request.user = user
+            get(page, request)
+        assert len(serve.renders) == 2
+
+    @pytest.mark.parametrize("attribute", ["is_preview", "in_preview_panel"])
+    def test_preview(self, page, anonymous, serve, attribute):
+        for _ in range(2):
+            request = anonymous()
+            setattr(request, attribute, True)
+            get(page, request)
+        assert len(serve.renders) == 2
+
+    @pytest.mark.parametrize("request_args", [{"path": "/cached/?q=1"}, {"method": "post"}])
+    def test_uncached_requests(self, page, anonymous, serve, request_args):
+        for _ in range(2):
+            get(page, anonymous(**request_args))
+        assert len(serve.renders) == 2
+
+    def test_pending_messages(self, page, anonymous, serve):
+        request = anonymous()
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        request._messages.add(20, "Thank you")
+        get(page, request)
+        get(page, anonymous())
+        assert len(serve.renders) == 2
+
+    def test_csrf_token_not_cached(self, page, anonymous, serve):
+        serve.side_effect = lambda page, request: HttpResponse(get_token(request))
+        get(page, anonymous())
+        get(page, anonymous())
+        assert serve.call_count == 2
+
+    @pytest.mark.parametrize("status", [404, 500])
+    def test_errors_not_cached(self, page, anonymous, serve, status):
+        serve.side_effect = lambda page, request: HttpResponse("error", status=status)
+        get(page, anonymous())
+        get(page, anonymous())
+        assert serve.call_count == 2
+
+    def test_cookies_not_cached(self, page, anonymous, serve):
+        def set_cookie(page, request):
+            response = HttpResponse("<p>cookie</p>")
+            response.set_cookie("visited", "1")
+            return response
+
+        serve.side_effect = set_cookie
+        get(page, anonymous())
+        get(page, anonymous())
+        assert serve.call_count == 2
+
+    def test_disabled(self, page, anonymous, serve, settings):
+        settings.CMSPAGE_PAGE_CACHE = None
+        get(page, anonymous())
+        get(page, anonymous())
+        assert len(serve.renders) == 2
+
+    def test_unpublished_page(self, anonymous):
+        assert page_cache_key(CMSPage(title="Draft", slug="draft"), anonymous()) is None
+
+
+@pytest.mark.django_db
+class TestCachedPage:
+    @pytest.fixture(autouse=True)
+    def templates(self, settings, mocker):
+        # the package's page body, rather than the empty test templates
+        settings.TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[PACKAGE_TEMPLATES, WAGTAIL_TEMPLATES])]
+        mocker.patch.object(CMSPage, "get_template", return_value="cmspage/includes/main.html")
+
+    def test_rendered_page(self, page, anonymous, django_assert_num_queries):
+        html = get(page, anonymous()).content
+        assert b"A title" in html
+
+        request = anonymous()
+        page.get_url_parts(request)  # caches the site root paths
+        with django_assert_num_queries(0):
+            assert get(page, request).content == html
+
+
+@pytest.mark.django_db
+class TestPrecompressed:
+    CONTENT = "<p>rendered</p>" * 100
+
+    @pytest.fixture(autouse=True)
+    def content(self, serve, mocker):
+        mocker.patch.object(TemplateResponse, "rendered_content", self.CONTENT)
+
+    def test_gzip(self, page, anonymous, serve, mocker):
+        compress = mocker.spy(page_cache, "compress")
+        get(page, anonymous())
+        for _ in range(2):
+            response = get(page, anonymous(HTTP_ACCEPT_ENCODING="gzip, deflate"))
+            assert response["Content-Encoding"] == "gzip"
+            assert response["Vary"] == "Accept-Encoding"
+            assert gzip.decompress(response.content) == self.CONTENT.encode()
+        assert compress.call_count == 1
+        assert len(serve.renders) == 1
+
+    def test_brotli(self, page, anonymous, serve):
+        brotli = pytest.importorskip("brotli")
+        get(page, anonymous())
+        response = get(page, anonymous(HTTP_ACCEPT_ENCODING="gzip, br"))
+        assert response["Content-Encoding"] == "br"
+        assert brotli.decompress(response.content) == self.CONTENT.encode()
+
+    @pytest.mark.parametrize("accept_encoding", ["", "identity", "gzip;q=0", "compress"])
+    def test_not_accepted(self, page, anonymous, serve, accept_encoding):
+        get(page, anonymous())
+        response = get(page, anonymous(HTTP_ACCEPT_ENCODING=accept_encoding))
+        assert not response.has_header("Content-Encoding")
+        assert response.content == self.CONTENT.encode()
+
+    def test_weak_etag(self, page, anonymous, serve):
+        etag = get(page, anonymous())["ETag"]
+        assert get(page, anonymous(HTTP_ACCEPT_ENCODING="gzip"))["ETag"] == f"W/{etag}"
+        assert get(page, anonymous(HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=f"W/{etag}")).status_code == 304
+
+    def test_authenticated(self, page, anonymous, serve, settings):
+        settings.CMSPAGE_PAGE_CACHE_AUTHENTICATED = True
+        user = User.objects.create_user("visitor")
+        for _ in range(2):
+            request = anonymous(HTTP_ACCEPT_ENCODING="gzip")
+            request.user = user
+            response = get(page, request)
+        assert len(serve.renders) == 1
+        assert not response.has_header("Content-Encoding")
+
+    def test_visitor_specific_holes(self, page, anonymous, serve, mocker):
+        mocker.patch.object(page_cache, "fill_response", side_effect=lambda request, response: get_token(request))
+        get(page, anonymous())
+        assert not get(page, anonymous(HTTP_ACCEPT_ENCODING="gzip")).has_header("Content-Encoding")
+
+    def test_disabled(self, page, anonymous, serve, settings):
+        settings.CMSPAGE_PAGE_CACHE_ENCODINGS = []
+        get(page, anonymous())
+        response = get(page, anonymous(HTTP_ACCEPT_ENCODING="gzip"))
+        assert not response.has_header("Content-Encoding")
+        assert not response.has_header("Vary")
@@ -6,7 +6,12 @@ from django.test.utils import override_settings
 from wagtail.models import Site
 
 from cmspage.models import MenuLink
-from cmspage.performance import query_monitor, analyze_menu_performance
+from cmspage.performance import (
+    query_monitor,
+    analyze_menu_performance,
+    analyze_navigation_rendering,
+    build_benchmark_menu,
+)
 
 
 @pytest.mark.django_db
@@ -230,3 +235,30 @@ class TestPerformanceAnalysis(TestCase):
 
         # Cached should be fastest (may be 0 queries on second call)
         assert metrics["cached"]["query_count"] <= metrics["optimized"]["query_count"]
+
+
+class TestNavigationRenderingBenchmark:
+    """Test the navigation rendering benchmark"""
+
+    def count(self, nodes):
+        return sum(1 + self.count(node["children"]) for node in nodes)
+
+    def test_build_benchmark_menu(self):
+        menu = build_benchmark_menu(300, children=9, depth=2)
+        assert len(menu) == 30
+        assert all(len(node["children"]) == 9 for node in menu)
+        assert self.count(menu) == 300
+
+        deep_menu = build_benchmark_menu(100, children=3, depth=4)
+        assert self.count(deep_menu) == 100
+        assert deep_menu[0]["children"][0]["children"][0]["children"]
+
+    def test_analyze_navigation_rendering(self):
+        """A 300 item menu renders every item through the recursive navigation_item include"""
+        menu = build_benchmark_menu(300)
+        metrics = analyze_navigation_rendering(menu, context={"page": None}, iterations=1)
+
+        assert metrics["items"] == 300
+        assert metrics["time"] > 0
+        assert metrics["peak_allocated"] > 0
+        assert metrics["size"] > 0
@@ -0,0 +1,124 @@
+import json
+from pathlib import Path
+
+import pytest
+import wagtail.embeds
+from django.core.cache import cache
+from wagtail.embeds.embeds import get_embed_hash
+from wagtail.embeds.models import Embed
+from wagtail.images import get_image_model
+from wagtail.images.tests.utils import get_test_image_file
+from wagtail.models import Site
+
+from cmspage.blocks.embed import PrefetchedEmbedValue
+from cmspage.models import CMSPage, RenderManifest
+from cmspage.render_manifest import build_render_manifest, load_render_manifest, manifest_key
+
+EMBED_TEMPLATES = Path(wagtail.embeds.__file__).parent / "templates"
+VIDEO = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def images():
+    return [get_image_model().objects.create(title=f"Image {index}", file=get_test_image_file()) for index in range(3)]
+
+
+@pytest.fixture
+def page(images):
+    body = [
+        {"type": "hero", "value": {"image": images[0].pk, "size": "small"}},
+        {"type": "cards", "value": {"cards": [{"image": image.pk, "size": "small"} for image in images]}},
+        {"type": "video", "value": VIDEO},
+    ]
+    page = CMSPage(title="Manifest", slug="manifest", body=json.dumps(body))
+    Site.objects.get(is_default_site=True).root_page.add_child(instance=page)
+    page.save_revision().publish()
+    return CMSPage.objects.get(pk=page.pk)
+
+
+@pytest.fixture
+def embed():
+    return Embed.objects.create(url=VIDEO, hash=get_embed_hash(VIDEO), html="<iframe></iframe>", type="video")
+
+
+def get_context(page, request):
+    page.get_url_parts(request)  # caches the site root paths
+    return page.get_context(request)
+
+
+@pytest.mark.django_db
+class TestRenderManifest:
+    def test_saved_on_publish(self, page, images):
+        manifest = RenderManifest.objects.get(revision_id=page.live_revision_id).manifest
+        assert manifest["objects"] == {get_image_model()._meta.label_lower: [image.pk for image in images]}
+        assert sorted(manifest["renditions"]) == sorted(str(image.pk) for image in images)
+        assert all(specs for specs in manifest["renditions"].values())
+        assert manifest["embeds"] == [[VIDEO, None, None]]
+        assert manifest["priority_index"] == 0
+
+    def test_matches_stream(self, page):
+        manifest = load_render_manifest(page)
+        assert build_render_manifest(CMSPage.objects.get(pk=page.pk)) == manifest
+
+    def test_cached_by_revision(self, page, django_assert_num_queries):
+        load_render_manifest(page)
+        with django_assert_num_queries(0):
+            assert load_render_manifest(page) == cache.get(manifest_key(page.live_revision_id))
+
+    def test_outdated_settings(self, page, settings):
+        settings.CMSPAGE_IMAGE_SRCSET_WIDTHS = [320, 640]
+        assert load_render_manifest(page) is None
+
+    def test_without_live_revision(self):
+        assert load_render_manifest(CMSPage(title="Draft")) is None
+
+
+@pytest.mark.django_db
+class TestManifestContext:
+    def test_no_stream_walking(self, rf, page, mocker):
+        chooser_ids = mocker.patch("cmspage.models.cms_page.stream_chooser_ids")
+        rendition_specs = mocker.patch("cmspage.models.cms_page.stream_rendition_specs")
+        priority = mocker.patch("cmspage.models.cms_page.priority_block_index")
+
+        context = get_context(page, rf.get("/"))
+        assert context["image_priority_index"] == 0
+        chooser_ids.assert_not_called()
+        rendition_specs.assert_not_called()
+        priority.assert_not_called()
+
+    def test_fixed_queries(self, rf, page, embed, django_assert_num_queries):
+        request = rf.get("/")
+        get_context(CMSPage.objects.get(pk=page.pk), request)
+        page = CMSPage.objects.get(pk=page.pk)
+        # the (missing) footer page, images, embeds and renditions
+        with django_assert_num_queries(4):
+            get_context(page, request)
+            images = [card["image"] for card in page.body[1].value["cards"]]
+            assert all(hasattr(image, "prefetched_renditions") for image in images)
+
+    def test_prefetched_embed(self, rf, page, embed, settings, django_assert_num_queries):
+        settings.TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[*settings.TEMPLATES[0]["DIRS"], EMBED_TEMPLATES])]
+        get_context(page, rf.get("/"))
+        value = page.body[2].value
+        assert isinstance(value, PrefetchedEmbedValue)
+        with django_assert_num_queries(0):
+            assert "<iframe></iframe>" in value.html
+
+    def test_saved_when_missing(self, rf, page):
+        RenderManifest.objects.all().delete()
+        cache.clear()
+        get_context(page, rf.get("/"))
+        assert RenderManifest.objects.filter(revision_id=page.live_revision_id).exists()
+
+    def test_preview(self, rf, page, mocker):
+        load = mocker.patch("cmspage.models.cms_page.load_render_manifest")
+        request = rf.get("/")
+        request.is_preview = True
+        context = get_context(page, request)
+        load.assert_not_called()
+        assert context["image_priority_index"] == 0
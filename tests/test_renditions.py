@@ -0,0 +1,249 @@
+import json
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from wagtail.images.tests.utils import get_test_image_file
+from wagtail.models import Page
+
+from cmspage.blocks import CardsBlock, CarouselImageBlock, HeroImageBlock, LargeImageBlock
+from cmspage.models import CMSPage, CMSPageImage
+from cmspage.renditions import (
+    image_ladder,
+    image_loading,
+    image_specs,
+    prefetch_renditions,
+    priority_block_index,
+    stream_rendition_specs,
+)
+from cmspage.templatetags.cmspage_tags import render_image
+
+
+class TestImageSpecs:
+    """Test suite for rendition spec generation"""
+
+    def test_default_ladder(self):
+        assert image_ladder() == [(160, "fill-160x107"), (320, "fill-320x213"), (480, "fill-480x320")]
+
+    def test_ladder_widths_setting(self, settings):
+        settings.CMSPAGE_IMAGE_SRCSET_WIDTHS = [300, 100]
+        assert image_ladder("square", "medium", crop=50) == [
+            (100, "fill-100x100-c50"),
+            (300, "fill-300x300-c50"),
+            (480, "fill-480x480-c50"),
+        ]
+
+    def test_ladder_from_dimensions(self):
+        assert image_ladder(size="320x180")[-1] == (320, "fill-320x180")
+
+    def test_crop_only_applies_to_fill(self):
+        assert image_ladder("portrait", "small", "max", 100) == [(160, "max-160x240"), (200, "max-200x300")]
+
+    def test_default_specs(self):
+        assert image_specs() == (
+            "fill-160x107|format-webp",
+            "fill-320x213|format-webp",
+            "fill-480x320|format-webp",
+            "fill-160x107",
+            "fill-320x213",
+            "fill-480x320",
+        )
+
+    def test_formats_setting(self, settings):
+        settings.CMSPAGE_IMAGE_FORMATS = "avif webp"
+        assert image_specs("landscape", "tiny") == (
+            "fill-150x100|format-avif",
+            "fill-150x100|format-webp",
+            "fill-150x100",
+        )
+
+    def test_original_is_not_cropped(self):
+        assert image_specs("square", "original", crop=50) == ("original|format-webp", "original")
+
+    def test_unknown_size_is_used_as_spec(self):
+        assert image_specs("landscape", "width-400") == ("width-400|format-webp", "width-400")
+
+
+class TestBlockRenditionSpecs:
+    """Test suite for image blocks declaring their renditions"""
+
+    def test_struct_block_specs(self):
+        block = HeroImageBlock()
+        image = object()
+        value = block.to_python({"image": None, "orientation": "square", "size": "small", "crop": "50"})
+        value["image"] = image
+        assert list(block.get_rendition_specs(value)) == [(image, image_specs("square", "small", crop="50"))]
+
+    def test_struct_block_without_image(self):
+        block = HeroImageBlock()
+        value = block.to_python({"image": None})
+        assert list(block.get_rendition_specs(value)) == []
+
+    def test_cards_block_specs(self):
+        block = CardsBlock()
+        value = block.to_python({"cards": [{"size": "tiny"}, {"size": "large"}]})
+        images = [object(), object()]
+        for card, image in zip(value["cards"], images):
+            card["image"] = image
+        specs = list(block.get_rendition_specs(value))
+        assert [image for image, _ in specs] == images
+        assert specs[0][1] == image_specs("landscape", "tiny", crop="100")
+        assert specs[1][1] == image_specs("landscape", "large", crop="100")
+
+    def test_carousel_block_specs(self):
+        block = CarouselImageBlock()
+        value = block.to_python({"carousel": [{"carousel_image": None}]})
+        image = object()
+        value["carousel"][0]["carousel_image"] = image
+        assert list(block.get_rendition_specs(value)) == [(image, image_specs(size="800x450", crop=75))]
+
+
+class TestImageLoading:
+    """Test suite for the image loading strategy"""
+
+    def test_auto_loading_by_position(self):
+        assert image_loading(None, 0) == {}
+        assert image_loading("auto", 1) == {}
+        assert image_loading("auto", 2) == {"loading": "lazy", "decoding": "async"}
+
+    def test_outside_page_body_is_lazy(self):
+        assert image_loading() == {"loading": "lazy", "decoding": "async"}
+
+    def test_priority(self):
+        assert image_loading("auto", 0, priority=True) == {"fetchpriority": "high"}
+        assert image_loading("priority", 5) == {"fetchpriority": "high"}
+
+    def test_explicit_loading(self):
+        assert image_loading("lazy", 0) == {"loading": "lazy", "decoding": "async"}
+        assert image_loading("eager", 10) == {}
+
+    def test_eager_blocks_setting(self, settings):
+        settings.CMSPAGE_IMAGE_EAGER_BLOCKS = 0
+        assert image_loading("auto", 0) == {"loading": "lazy", "decoding": "async"}
+
+    @staticmethod
+    def stream(*blocks):
+        """Build a list of bound blocks as StreamValue iteration yields them"""
+        bound_blocks = []
+        for block, value in blocks:
+            bound_block = block.bind(block.to_python(value))
+            if "image" in value:
+                bound_block.value["image"] = object()
+            bound_blocks.append(bound_block)
+        return bound_blocks
+
+    def test_priority_block_is_first_candidate(self):
+        stream = self.stream((CardsBlock(), {"cards": []}), (LargeImageBlock(), {"image": None}))
+        assert priority_block_index(stream) == 1
+
+    def test_priority_block_needs_an_image(self):
+        stream = self.stream((CardsBlock(), {"cards": []}), (HeroImageBlock(), {"loading": "auto"}))
+        assert priority_block_index(stream) is None
+
+    def test_priority_block_within_eager_blocks(self, settings):
+        settings.CMSPAGE_IMAGE_EAGER_BLOCKS = 1
+        stream = self.stream((CardsBlock(), {"cards": []}), (LargeImageBlock(), {"image": None}))
+        assert priority_block_index(stream) is None
+
+    def test_explicit_priority_block(self):
+        stream = self.stream(
+            (HeroImageBlock(), {"image": None}),
+            (CardsBlock(), {"cards": []}),
+            (LargeImageBlock(), {"image": None, "loading": "priority"}),
+        )
+        assert priority_block_index(stream) == 2
+
+    def test_block_context(self):
+        block = HeroImageBlock()
+        value = block.to_python({})
+        assert block.get_context(value, {"block_index": 0, "image_priority_index": 0})["image_loading"] == {
+            "fetchpriority": "high"
+        }
+        assert block.get_context(value, {"block_index": 1, "image_priority_index": 0})["image_loading"] == {}
+        assert block.get_context(value)["image_loading"] == {"loading": "lazy", "decoding": "async"}
+
+
+@pytest.mark.django_db
+class TestPrefetchRenditions:
+    """Test suite for page-wide rendition prefetching"""
+
+    NUM_CARDS = 12
+
+    @pytest.fixture
+    def images(self):
+        return [CMSPageImage.objects.create(title=f"Image {i}", file=get_test_image_file()) for i in range(self.NUM_CARDS)]
+
+    @pytest.fixture
+    def page(self, images):
+        cards = [
+            {
+                "title": f"Card {i}",
+                "image": images[i].pk,
+                "orientation": "landscape",
+                "size": "small" if i % 2 else "medium",
+                "crop": "50",
+            }
+            for i in range(self.NUM_CARDS)
+        ]
+        page = CMSPage(title="Cards", slug="cards", body=json.dumps([{"type": "cards", "value": {"cards": cards}}]))
+        Page.objects.get(pk=1).add_child(instance=page)
+        return page
+
+    @staticmethod
+    def render_cards(page):
+        return [
+            render_image(card["image"], orientation=card["orientation"], size=card["size"], crop=card["crop"])
+            for block in page.body
+            for card in block.value["cards"]
+        ]
+
+    @staticmethod
+    def rendition_queries(queries):
+        return [query for query in queries if "rendition" in query["sql"]]
+
+    def test_stream_rendition_specs(self, page):
+        specs = list(stream_rendition_specs(page.body))
+        assert len(specs) == self.NUM_CARDS
+        assert specs[0][1] == image_specs("landscape", "medium", crop="50")
+
+    def test_prefetch_skips_missing_images(self):
+        assert prefetch_renditions([(None, ("original",))]) == 0
+
+    def test_page_renders_with_one_rendition_query(self, rf, page):
+        # Generate the renditions on a first render
+        html = self.render_cards(CMSPage.objects.get(pk=page.pk))
+        cache.clear()
+
+        page = CMSPage.objects.get(pk=page.pk)
+        with CaptureQueriesContext(connection) as queries:
+            page.get_context(rf.get("/"))
+            assert self.render_cards(page) == html
+        assert len(self.rendition_queries(queries.captured_queries)) == 1
+
+    def test_unprefetched_page_queries_per_image(self, page):
+        self.render_cards(CMSPage.objects.get(pk=page.pk))
+        cache.clear()
+
+        page = CMSPage.objects.get(pk=page.pk)
+        with CaptureQueriesContext(connection) as queries:
+            self.render_cards(page)
+        # one query per image per render_image call
+        assert len(self.rendition_queries(queries.captured_queries)) == self.NUM_CARDS
+
+    def test_page_context_priority_and_preload(self, rf, settings, page, images):
+        page = CMSPage.objects.get(pk=page.pk)
+        context = page.get_context(rf.get("/"))
+        # cards are not a priority candidate
+        assert context["image_priority_index"] is None
+        assert "image_preload" not in context
+
+        page.body = json.dumps(
+            [{"type": "large_image", "value": {"image": images[0].pk, "size": "small"}}]
+        )
+        settings.CMSPAGE_IMAGE_PRELOAD = True
+        context = page.get_context(rf.get("/"))
+        assert context["image_priority_index"] == 0
+        image, options = context["image_preload"]
+        assert image.pk == images[0].pk
+        assert options["size"] == "small"
@@ -0,0 +1,202 @@
+import json
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from wagtail.documents import get_document_model
+from wagtail.images.formats import get_image_format
+from wagtail.images.tests.utils import get_test_image_file
+from wagtail.models import Site
+from wagtail.rich_text import RichText, expand_db_html
+
+from cmspage.blocks import RichTextBlock
+from cmspage.blocks.rich_text import (
+    PrefetchedRichText,
+    expand_rich_text,
+    invalidate_rich_text_cache,
+    rich_text_cache_key,
+)
+from cmspage.versions import REFERENCES, version_key
+from cmspage.models import CMSFooterPage, CMSPage, CMSPageImage
+
+
+@pytest.fixture
+def targets(db):
+    root = Site.objects.get(is_default_site=True).root_page
+    pages = []
+    for index in range(4):
+        pages.append(CMSPage(title=f"Target {index}", slug=f"target-{index}"))
+        root.add_child(instance=pages[-1])
+    documents = [
+        get_document_model().objects.create(title=f"Document {index}", file=ContentFile(b"data", f"doc{index}.txt"))
+        for index in range(2)
+    ]
+    images = [CMSPageImage.objects.create(title=f"Image {index}", file=get_test_image_file()) for index in range(2)]
+    return pages, documents, images
+
+
+def rich_text_source(targets, index):
+    pages, documents, images = targets
+    return (
+        f'<p>Text {index} <a linktype="page" id="{pages[index % len(pages)].pk}">a page</a>'
+        f' and <a linktype="document" id="{documents[index % len(documents)].pk}">a document</a></p>'
+        f'<embed embedtype="image" id="{images[index % len(images)].pk}" format="left" alt="Image {index}"/>'
+    )
+
+
+class TestRichTextBlock:
+    def test_deconstructs_as_wagtail_block(self):
+        assert RichTextBlock().deconstruct()[0] == "wagtail.blocks.RichTextBlock"
+
+    def test_values(self):
+        block = RichTextBlock()
+        assert isinstance(block.to_python("<p>text</p>"), PrefetchedRichText)
+        assert isinstance(block.normalize(RichText("<p>text</p>")), PrefetchedRichText)
+        assert block.normalize("<p>text</p>").source == "<p>text</p>"
+        assert block.get_prep_value(block.to_python("<p>text</p>")) == "<p>text</p>"
+
+    def test_renders_expanded_html(self, mocker):
+        render = mocker.patch("cmspage.blocks.rich_text.render_to_string", return_value="rendered")
+        value = PrefetchedRichText('<p><a linktype="page" id="1">link</a></p>')
+        value.expanded = '<p><a href="/expanded/">link</a></p>'
+        assert value.__html__() == "rendered"
+        render.assert_called_once_with("wagtailcore/shared/richtext.html", {"html": value.expanded})
+
+    def test_renders_unexpanded_source(self, mocker):
+        expand = mocker.patch("cmspage.blocks.rich_text.RichText.__html__", return_value="expanded")
+        assert PrefetchedRichText("<p>text</p>").__html__() == "expanded"
+        expand.assert_called_once()
+
+
+@pytest.mark.django_db
+class TestExpandRichText:
+    def test_matches_individual_expansion(self, targets):
+        values = [PrefetchedRichText(rich_text_source(targets, index)) for index in range(6)]
+        expected = [expand_db_html(value.source) for value in values]
+
+        assert expand_rich_text(values) == 6
+        assert [value.expanded for value in values] == expected
+        assert f'href="{targets[1][0].url}"' in expected[0]
+
+    @pytest.mark.parametrize("count", [4, 16])
+    def test_one_pass(self, targets, count, settings, django_assert_num_queries):
+        settings.CMSPAGE_RICH_TEXT_CACHE = None
+        cache.clear()
+        # the embeds' renditions and the site root paths exist (and are cached) already
+        for image in targets[2]:
+            get_image_format("left").image_to_html(image, "")
+        Site.get_site_root_paths()
+        values = [PrefetchedRichText(rich_text_source(targets, index)) for index in range(count)]
+        # pages (with the specific pages of one type), documents and images
+        with django_assert_num_queries(4):
+            expand_rich_text(values)
+
+    def test_skips_plain_and_expanded_values(self, targets):
+        expanded = PrefetchedRichText("<p>done</p>")
+        expanded.expanded = "<p>already</p>"
+        values = [RichText("<p>plain</p>"), PrefetchedRichText(""), expanded, None, "<p>string</p>"]
+        assert expand_rich_text(values) == 0
+        assert expanded.expanded == "<p>already</p>"
+
+    def test_separator_in_source(self):
+        value = PrefetchedRichText("<p>a\x00b</p>")
+        assert expand_rich_text([value]) == 0
+        assert value.expanded is None
+
+    def test_page_context(self, rf, targets):
+        cards = [{"title": f"Card {index}", "text": rich_text_source(targets, index)} for index in range(12)]
+        body = [
+            {"type": "cards", "value": {"cards": cards}},
+            {"type": "richtext", "value": {"title": "Text", "content": rich_text_source(targets, 1)}},
+            {"type": "lines", "value": {"lines": [{"title": "Line", "content": rich_text_source(targets, 2)}]}},
+        ]
+        footer = [{"type": "info", "value": {"text": rich_text_source(targets, 3)}}]
+        root = Site.objects.get(is_default_site=True).root_page
+        root.add_child(instance=CMSFooterPage(title="Footer", slug="footer", footer=json.dumps(footer)))
+        page = CMSPage(title="Rich text", slug="rich-text", body=json.dumps(body))
+        root.add_child(instance=page)
+
+        page = CMSPage.objects.get(pk=page.pk)
+        context = page.get_context(rf.get("/"))
+        values = [card["text"] for card in page.body[0].value["cards"]] + [
+            page.body[1].value["content"],
+            page.body[2].value["lines"][0]["content"],
+            context["page_footer"].footer[0].value["text"],
+        ]
+        assert all(value.expanded == expand_db_html(value.source) for value in values)
+
+
+@pytest.mark.django_db
+class TestRichTextCache:
+    VERSION_KEY = version_key(REFERENCES)
+
+    @staticmethod
+    def expand(targets, count=4):
+        values = [PrefetchedRichText(rich_text_source(targets, index)) for index in range(count)]
+        assert expand_rich_text(values) == count
+        return [value.expanded for value in values]
+
+    def test_cached(self, targets, django_assert_num_queries):
+        expected = self.expand(targets)
+        with django_assert_num_queries(0):
+            assert self.expand(targets) == expected
+
+    def test_shared_between_pages(self, rf, targets, django_assert_num_queries):
+        text = rich_text_source(targets, 0)
+        root = Site.objects.get(is_default_site=True).root_page
+        pages = []
+        for index in range(2):
+            body = [{"type": "richtext", "value": {"title": "Text", "content": text}}]
+            pages.append(CMSPage(title=f"Page {index}", slug=f"page-{index}", body=json.dumps(body)))
+            root.add_child(instance=pages[-1])
+        first, second = (CMSPage.objects.get(pk=page.pk) for page in pages)
+        first.get_context(rf.get("/"))
+        with django_assert_num_queries(0):
+            assert second._prefetch_rich_text() == 1
+        assert second.body[0].value["content"].expanded == first.body[0].value["content"].expanded
+
+    def test_repeated_sources_expanded_once(self, targets, mocker):
+        expand = mocker.patch("cmspage.blocks.rich_text.expand_db_html", side_effect=lambda html: html.upper())
+        values = [PrefetchedRichText("<p>same</p>") for _ in range(3)] + [PrefetchedRichText("<p>other</p>")]
+        assert expand_rich_text(values) == 4
+        expand.assert_called_once_with("<p>same</p>\x00<p>other</p>")
+        assert [value.expanded for value in values] == ["<P>SAME</P>"] * 3 + ["<P>OTHER</P>"]
+
+    def test_keyed_by_source_and_version(self):
+        assert rich_text_cache_key("1", "<p>a</p>") != rich_text_cache_key("1", "<p>b</p>")
+        assert rich_text_cache_key("1", "<p>a</p>") != rich_text_cache_key("2", "<p>a</p>")
+
+    def test_invalidated_by_referenced_changes(self, targets):
+        pages, documents, images = targets
+        expected = self.expand(targets)
+        pages[0].title = "Renamed"
+        pages[0].slug = "renamed"
+        pages[0].save()
+        renamed = self.expand(targets)
+        assert renamed != expected
+        assert f'href="{pages[0].url}"' in renamed[0]
+
+        version = cache.get(self.VERSION_KEY)
+        documents[0].title = "Changed"
+        documents[0].save()
+        assert cache.get(self.VERSION_KEY) != version
+
+    def test_version_replaced_when_evicted(self, targets, django_assert_num_queries):
+        expected = self.expand(targets)
+        version = cache.get(self.VERSION_KEY)
+        cache.delete(self.VERSION_KEY)
+        with django_assert_num_queries(4):
+            assert self.expand(targets) == expected
+        assert cache.get(self.VERSION_KEY) not in (None, version)
+
+    def test_invalidate(self, targets, django_assert_num_queries):
+        self.expand(targets)
+        invalidate_rich_text_cache()
+        with django_assert_num_queries(4):
+            self.expand(targets)
+
+    def test_disabled(self, settings, targets, django_assert_num_queries):
+        settings.CMSPAGE_RICH_TEXT_CACHE = None
+        self.expand(targets)
+        with django_assert_num_queries(4):
+            self.expand(targets)
@@ -0,0 +1,136 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from cmspage import template_manifest
+from cmspage.mixins import CMSTemplateMixin
+from cmspage.models.functional import set_functional_cache
+from cmspage.template_manifest import (
+    build_manifest,
+    clear_manifest,
+    configuration_checksum,
+    load_manifest,
+    lookup_template,
+    write_manifest,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_manifest():
+    clear_manifest()
+    yield
+    clear_manifest()
+
+
+class TestTemplateManifest:
+    """Test suite for the build-time template resolution manifest"""
+
+    def test_build_manifest_resolves_page_and_include_templates(self, settings):
+        settings.CMSPAGE_TEMPLATE_STYLES = "bootstrap5"
+        manifest = build_manifest()
+
+        assert manifest["version"] == template_manifest.MANIFEST_VERSION
+        assert manifest["styles"] == ["bootstrap5"]
+        assert manifest["checksum"] == configuration_checksum(["bootstrap5"])
+        templates = manifest["templates"]
+        assert templates["cmspage/cms_page.html"] == "cmspage/bootstrap5/cms_page.html"
+        assert templates["cmspage/includes/header.html"] == "cmspage/includes/header.html"
+
+    def test_build_manifest_records_missing_templates(self, settings):
+        settings.CMSPAGE_TEMPLATE_STYLES = None
+        templates = build_manifest()["templates"]
+        assert "cmspage/cms_form_page.html" in templates
+        assert templates["cmspage/cms_form_page.html"] is None
+
+    def test_checksum_changes_with_configuration(self, settings):
+        checksum = configuration_checksum(["bootstrap5"])
+        assert checksum != configuration_checksum(["tailwind"])
+        settings.CMSPAGE_TEMPLATE_BASE_DIR = "othersite"
+        assert checksum != configuration_checksum(["bootstrap5"])
+
+    def test_no_manifest_configured(self, settings):
+        settings.CMSPAGE_TEMPLATE_MANIFEST = None
+        assert load_manifest() is None
+        assert lookup_template("cmspage/cms_page.html") == (False, None)
+
+    def test_lookup_from_manifest(self, settings, tmp_path):
+        settings.CMSPAGE_TEMPLATE_STYLES = "bootstrap5"
+        manifest = build_manifest()
+        manifest["templates"]["cmspage/cms_page.html"] = "cmspage/from_manifest.html"
+        settings.CMSPAGE_TEMPLATE_MANIFEST = str(write_manifest(manifest, tmp_path / "manifest.json"))
+
+        assert lookup_template("cmspage/cms_page.html", "bootstrap5") == (True, "cmspage/from_manifest.html")
+        # a different style combination, or an unknown template, falls back to probing
+        assert lookup_template("cmspage/cms_page.html", "tailwind") == (False, None)
+        assert lookup_template("cmspage/unknown.html", "bootstrap5") == (False, None)
+
+    def test_find_existing_template_skips_probing(self, settings, tmp_path):
+        settings.CMSPAGE_TEMPLATE_STYLES = "bootstrap5"
+        manifest = build_manifest()
+        settings.CMSPAGE_TEMPLATE_MANIFEST = str(write_manifest(manifest, tmp_path / "manifest.json"))
+
+        set_functional_cache(False)
+        try:
+            with pytest.MonkeyPatch.context() as mp:
+                def fail(*args):
+                    raise AssertionError("template engines probed")
+
+                mp.setattr(CMSTemplateMixin, "probe_template", staticmethod(fail))
+                result = CMSTemplateMixin.find_existing_template("cmspage/cms_page.html", "bootstrap5")
+        finally:
+            set_functional_cache(True)
+        assert result == "cmspage/bootstrap5/cms_page.html"
+
+    def test_stale_manifest_is_ignored(self, settings, tmp_path, caplog):
+        settings.CMSPAGE_TEMPLATE_STYLES = "bootstrap5"
+        manifest = build_manifest()
+        manifest["checksum"] = "stale"
+        settings.CMSPAGE_TEMPLATE_MANIFEST = str(write_manifest(manifest, tmp_path / "manifest.json"))
+
+        assert load_manifest() is None
+        assert "does not match" in caplog.text
+        assert lookup_template("cmspage/cms_page.html", "bootstrap5") == (False, None)
+
+    def test_unreadable_manifest_is_ignored(self, settings, tmp_path, caplog):
+        path = tmp_path / "manifest.json"
+        path.write_text("{not json")
+        settings.CMSPAGE_TEMPLATE_MANIFEST = str(path)
+        assert load_manifest() is None
+        settings.CMSPAGE_TEMPLATE_MANIFEST = str(tmp_path / "missing.json")
+        assert load_manifest() is None
+        assert "not found" in caplog.text
+
+
+class TestBuildTemplateManifestCommand:
+    """Test suite for the build_template_manifest management command"""
+
+    def test_writes_manifest(self, settings, tmp_path):
+        settings.CMSPAGE_TEMPLATE_STYLES = "bootstrap5"
+        output = tmp_path / "manifest.json"
+        call_command("build_template_manifest", output=str(output))
+
+        manifest = json.loads(output.read_text())
+        assert manifest == build_manifest()
+
+    def test_styles_option(self, settings, tmp_path):
+        settings.CMSPAGE_TEMPLATE_STYLES = None
+        output = tmp_path / "manifest.json"
+        call_command("build_template_manifest", output=str(output), styles="tailwind")
+        assert json.loads(output.read_text())["styles"] == ["tailwind"]
+
+    def test_requires_output(self, settings):
+        settings.CMSPAGE_TEMPLATE_MANIFEST = None
+        with pytest.raises(CommandError):
+            call_command("build_template_manifest")
+
+    def test_check(self, settings, tmp_path):
+        settings.CMSPAGE_TEMPLATE_STYLES = "bootstrap5"
+        output = tmp_path / "manifest.json"
+        call_command("build_template_manifest", output=str(output))
+        call_command("build_template_manifest", output=str(output), check=True)
+
+        settings.CMSPAGE_TEMPLATE_STYLES = "tailwind"
+        with pytest.raises(CommandError):
+            call_command("build_template_manifest", output=str(output), check=True)
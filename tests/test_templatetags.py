@@ -2,8 +2,17 @@ import pytest
 from unittest.mock import Mock, patch
 from django.template import Context, Template, TemplateSyntaxError, TemplateDoesNotExist
 from wagtail.images.models import Image
+from wagtail.images.tests.utils import get_test_image_file
 
-from cmspage.templatetags.cmspage_tags import render_image, get_embed_url_with_parameters, IMAGE_SIZES, ORIENTATIONS
+from cmspage.models import CMSPageImage
+
+from cmspage.templatetags.cmspage_tags import (
+    render_image,
+    cmspage_image_preload,
+    get_embed_url_with_parameters,
+    IMAGE_SIZES,
+    ORIENTATIONS,
+)
 
 
 class TestCMSPageTags:
@@ -65,39 +74,53 @@ class TestCMSPageTags:
         """Test that 'original' size is 'original' for all orientations"""
         assert IMAGE_SIZES[orientation]["original"] == "original"
 
-    @patch("cmspage.templatetags.cmspage_tags.Template")
-    def test_render_image_basic(self, mock_template_class):
+    @staticmethod
+    def mock_renditions(image, specs):
+        """Stand-in for get_renditions_or_not_found returning a rendition per spec"""
+        return {spec: Mock(url=f"/media/{spec.replace('|', '.')}.jpg", width=480, height=320) for spec in specs}
+
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_basic(self, mock_get_renditions):
         """Test render_image with basic parameters"""
+        mock_get_renditions.side_effect = self.mock_renditions
         # Create mock image
         mock_image = Mock(spec=Image)
         mock_image.title = "Test Image"
         mock_image.description = "Test Description"
 
-        # Mock template
-        mock_template = Mock()
-        mock_template.render.return_value = '<img src="/test.jpg" alt="Test Image">'
-        mock_template_class.return_value = mock_template
-
         # Call the function
         result = render_image(mock_image)
 
-        # Verify template was created and rendered
-        mock_template_class.assert_called_once()
-        mock_template.render.assert_called_once()
-        assert result == '<img src="/test.jpg" alt="Test Image">'
+        # The whole ladder is requested together, webp first
+        mock_get_renditions.assert_called_once_with(
+            mock_image,
+            [
+                "fill-160x107|format-webp",
+                "fill-320x213|format-webp",
+                "fill-480x320|format-webp",
+                "fill-160x107",
+                "fill-320x213",
+                "fill-480x320",
+            ],
+        )
+        sizes = "(max-width: 480px) 100vw, 480px"
+        assert result == (
+            '<source type="image/webp" srcset="/media/fill-160x107.format-webp.jpg 160w, '
+            '/media/fill-320x213.format-webp.jpg 320w, /media/fill-480x320.format-webp.jpg 480w" '
+            f'sizes="{sizes}">\n'
+            '<img src="/media/fill-480x320.jpg" srcset="/media/fill-160x107.jpg 160w, /media/fill-320x213.jpg 320w, '
+            f'/media/fill-480x320.jpg 480w" sizes="{sizes}" width="480" height="320" alt="Test Image" class="img-fluid">'
+        )
 
-    @patch("cmspage.templatetags.cmspage_tags.Template")
-    def test_render_image_with_custom_params(self, mock_template_class):
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_with_custom_params(self, mock_get_renditions):
         """Test render_image with custom parameters"""
+        mock_get_renditions.side_effect = self.mock_renditions
         mock_image = Mock(spec=Image)
         mock_image.title = "Test Image"
 
-        mock_template = Mock()
-        mock_template.render.return_value = "<img>"
-        mock_template_class.return_value = mock_template
-
         # Call with custom parameters
-        _ = render_image(
+        result = render_image(
             mock_image,
             orientation="portrait",
             size="large",
@@ -106,92 +129,150 @@ class TestCMSPageTags:
             crop=100,
             rounded=3,
             responsive=False,
+            css_class="shadow",
         )
 
-        # Verify template creation
-        mock_template_class.assert_called_once()
-        template_string = mock_template_class.call_args[0][0]
+        # portrait large size, crop only applies to fill
+        specs = mock_get_renditions.call_args[0][1]
+        assert specs[-1] == "max-400x600"
+        assert "max-400x600|format-webp" in specs
+        assert 'alt="Custom Alt"' in result
+        assert 'class="rounded-3 shadow"' in result
+
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_dimensions_size(self, mock_get_renditions):
+        """Test render_image with the size given as dimensions"""
+        mock_get_renditions.side_effect = self.mock_renditions
+        mock_image = Mock(spec=Image)
+        mock_image.title = "Test Image"
+
+        result = render_image(mock_image, size="800x450", crop=75, sizes="100vw")
+
+        specs = mock_get_renditions.call_args[0][1]
+        assert specs[-1] == "fill-800x450-c75"
+        assert "fill-640x360-c75" in specs
+        assert 'sizes="100vw"' in result
+        assert '/media/fill-800x450-c75.jpg 800w"' in result
+
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_formats(self, mock_get_renditions, settings):
+        """Test render_image offers a source per configured format"""
+        mock_get_renditions.side_effect = self.mock_renditions
+        mock_image = Mock(spec=Image)
+        mock_image.title = "Test Image"
+
+        settings.CMSPAGE_IMAGE_FORMATS = ["avif", "webp"]
+        result = render_image(mock_image, size="tiny")
+        mock_get_renditions.assert_called_once_with(
+            mock_image, ["fill-150x100|format-avif", "fill-150x100|format-webp", "fill-150x100"]
+        )
+        assert result.index('type="image/avif"') < result.index('type="image/webp"')
 
-        # Check that template string contains expected elements
-        assert "max-400x600" in template_string  # portrait large size
-        assert "-c100" in template_string  # crop parameter
-        assert 'alt="Custom Alt"' in template_string
-        assert "rounded-3" in template_string
+        settings.CMSPAGE_IMAGE_FORMATS = []
+        result = render_image(mock_image, size="tiny")
+        assert "<source" not in result
+        assert result.startswith('<img src="/media/fill-150x100.jpg"')
 
-    @patch("cmspage.templatetags.cmspage_tags.Template")
-    def test_render_image_alt_text_fallback(self, mock_template_class):
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_alt_text_fallback(self, mock_get_renditions):
         """Test render_image alt text fallback logic"""
+        mock_get_renditions.side_effect = self.mock_renditions
         mock_image = Mock(spec=Image)
         mock_image.title = "Image Title"
         mock_image.description = "Image Description"
 
-        mock_template = Mock()
-        mock_template_class.return_value = mock_template
-
         # Test with no alt_text provided - should use title
-        render_image(mock_image)
-        template_string = mock_template_class.call_args[0][0]
-        assert 'alt="Image Title"' in template_string
-
-        # Reset mock
-        mock_template_class.reset_mock()
+        assert 'alt="Image Title"' in render_image(mock_image)
 
         # Test with custom alt_text
-        render_image(mock_image, alt_text="Custom Alt")
-        template_string = mock_template_class.call_args[0][0]
-        assert 'alt="Custom Alt"' in template_string
+        assert 'alt="Custom Alt"' in render_image(mock_image, alt_text="Custom Alt")
+
+        # Test falling back to the description
+        mock_image.title = ""
+        assert 'alt="Image Description"' in render_image(mock_image)
+
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_alt_text_escaped(self, mock_get_renditions):
+        """Test render_image escapes alt text"""
+        mock_get_renditions.side_effect = self.mock_renditions
+        mock_image = Mock(spec=Image)
+        mock_image.title = 'Fish & "Chips" <b>'
+
+        result = render_image(mock_image)
+        assert 'alt="Fish &amp; &quot;Chips&quot; &lt;b&gt;"' in result
 
-    @patch("cmspage.templatetags.cmspage_tags.Template")
-    def test_render_image_no_alt_text(self, mock_template_class):
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_no_alt_text(self, mock_get_renditions):
         """Test render_image when no alt text is available"""
+        mock_get_renditions.side_effect = self.mock_renditions
         mock_image = Mock(spec=Image)
         mock_image.title = ""
         mock_image.description = ""
 
-        mock_template = Mock()
-        mock_template_class.return_value = mock_template
-
-        render_image(mock_image)
-        template_string = mock_template_class.call_args[0][0]
+        result = render_image(mock_image)
 
         # Should not have alt attribute when no text available
-        assert 'alt=""' not in template_string or "alt=" not in template_string
+        assert "alt=" not in result
 
-    @patch("cmspage.templatetags.cmspage_tags.Template")
-    def test_render_image_responsive_classes(self, mock_template_class):
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_responsive_classes(self, mock_get_renditions):
         """Test render_image CSS class handling"""
+        mock_get_renditions.side_effect = self.mock_renditions
         mock_image = Mock(spec=Image)
         mock_image.title = "Test"
 
-        mock_template = Mock()
-        mock_template_class.return_value = mock_template
-
         # Test with responsive=True (default)
-        render_image(mock_image, responsive=True)
-        template_string = mock_template_class.call_args[0][0]
-        assert 'class="img-fluid"' in template_string
-
-        # Reset and test with responsive=False
-        mock_template_class.reset_mock()
-        render_image(mock_image, responsive=False)
-        template_string = mock_template_class.call_args[0][0]
-        assert "img-fluid" not in template_string
-
-    @patch("cmspage.templatetags.cmspage_tags.Template")
-    def test_render_image_original_size(self, mock_template_class):
+        assert 'class="img-fluid"' in render_image(mock_image, responsive=True)
+
+        # Test with responsive=False
+        result = render_image(mock_image, responsive=False)
+        assert "img-fluid" not in result
+        assert "class=" not in result
+
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_original_size(self, mock_get_renditions):
         """Test render_image with original size"""
+        mock_get_renditions.side_effect = self.mock_renditions
         mock_image = Mock(spec=Image)
         mock_image.title = "Test"
 
-        mock_template = Mock()
-        mock_template_class.return_value = mock_template
+        result = render_image(mock_image, size="original", crop=50)
+
+        # Should use "original" size spec, not dimensions, and no cropping or ladder for original
+        mock_get_renditions.assert_called_once_with(mock_image, ["original|format-webp", "original"])
+        assert 'srcset="/media/original.format-webp.jpg"' in result
+        assert "sizes=" not in result
+
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_loading(self, mock_get_renditions):
+        """Test render_image loading attributes"""
+        mock_get_renditions.side_effect = self.mock_renditions
+        mock_image = Mock(spec=Image)
+        mock_image.title = "Test"
+
+        result = render_image(mock_image, loading="lazy", decoding="async")
+        assert result.endswith('class="img-fluid" loading="lazy" decoding="async">')
+
+        result = render_image(mock_image, loading="", decoding="", fetchpriority="high")
+        assert result.endswith('class="img-fluid" fetchpriority="high">')
 
-        render_image(mock_image, size="original")
-        template_string = mock_template_class.call_args[0][0]
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_image_preload(self, mock_get_renditions):
+        """Test the priority image preload hint"""
+        mock_get_renditions.side_effect = self.mock_renditions
+        mock_image = Mock(spec=Image)
+
+        assert cmspage_image_preload(Context()) == ""
+
+        context = Context({"image_preload": (mock_image, {"size": "tiny", "sizes": "100vw"})})
+        assert cmspage_image_preload(context) == (
+            '<link rel="preload" as="image" type="image/webp" '
+            'imagesrcset="/media/fill-150x100.format-webp.jpg 150w" imagesizes="100vw" fetchpriority="high">'
+        )
 
-        # Should use "original" size spec, not dimensions
-        assert "original" in template_string
-        assert "-c" not in template_string  # No cropping for original
+    def test_render_image_no_image(self):
+        """Test render_image renders nothing without an image"""
+        assert render_image(None) == ""
 
     def test_orientations_constant(self):
         """Test ORIENTATIONS constant"""
@@ -213,22 +294,27 @@ class TestCMSPageTagsIntegration:
         expected = "https://www.youtube.com/embed/test123?rel=0"
         assert result == expected
 
-    def test_render_image_tag_in_template(self):
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_tag_in_template(self, mock_get_renditions):
         """Test render_image tag usage in Django template"""
+        mock_get_renditions.side_effect = TestCMSPageTags.mock_renditions
         # Create a mock image
         mock_image = Mock(spec=Image)
         mock_image.title = "Test Image"
+        mock_image.do_not_call_in_templates = True
 
         template = Template("{% load cmspage_tags %}{% render_image image %}")
 
         context = Context({"image": mock_image})
 
-        # This should render without error
+        # This should render without error, and without escaping the markup
         result = template.render(context)
-        assert result is not None
+        assert 'width="480" height="320" alt="Test Image" class="img-fluid">' in result
 
-    def test_render_image_with_parameters_in_template(self):
+    @patch("cmspage.templatetags.cmspage_tags.get_renditions_or_not_found")
+    def test_render_image_with_parameters_in_template(self, mock_get_renditions):
         """Test render_image with parameters in template"""
+        mock_get_renditions.side_effect = TestCMSPageTags.mock_renditions
         mock_image = Mock(spec=Image)
         mock_image.title = "Test Image"
 
@@ -239,7 +325,26 @@ class TestCMSPageTagsIntegration:
 
         context = Context({"image": mock_image})
         result = template.render(context)
-        assert result is not None
+        assert '<img src="/media/fill-400x600.jpg"' in result
+        assert 'alt="Custom Alt"' in result
+
+    def test_render_image_real_renditions(self):
+        """Test render_image creates real renditions for a CMSPageImage, whose specs Wagtail accepts"""
+        image = CMSPageImage.objects.create(title="Real Image", file=get_test_image_file(size=(640, 480)))
+
+        result = render_image(image)
+
+        assert '<source type="image/webp" srcset="' in result
+        assert ".format-webp." in result
+        assert 'alt="Real Image"' in result
+        assert {rendition.filter_spec for rendition in image.renditions.all()} == {
+            "fill-160x107|format-webp",
+            "fill-320x213|format-webp",
+            "fill-480x320|format-webp",
+            "fill-160x107",
+            "fill-320x213",
+            "fill-480x320",
+        }
 
 
 class TestCMSPageIncludeTag:
@@ -790,3 +895,61 @@ class TestCMSPageIncludeTag:
         """Test cmspage_include with no arguments raises TemplateSyntaxError"""
         with pytest.raises(TemplateSyntaxError, match="requires at least one argument"):
             Template("{% load cmspage_tags %}{% cmspage_include %}")
+
+    # === CONTEXT PUSH AND TEMPLATE CACHING TESTS ===
+
+    @staticmethod
+    def django_template(source):
+        from django.template import engines
+
+        return engines["django"].from_string(source)
+
+    @pytest.mark.django_db
+    def test_cmspage_include_pushes_context_layer(self):
+        """Test that the included template renders in a pushed layer of the current context"""
+        template = Template(
+            "{% load cmspage_tags %}{% cmspage_include template_name with var1=value1 %}|{{ var1 }}|{{ outer }}"
+        )
+        context = Context({"template_name": "test.html", "value1": "inner", "outer": "outer"})
+        included = self.django_template("{{ var1 }}-{{ outer }}")
+
+        with patch("cmspage.templatetags.cmspage_tags.get_template", return_value=included):
+            with patch.object(Context, "flatten", side_effect=AssertionError("context flattened")):
+                result = template.render(context)
+
+        # 'with' variables are visible to the include only, and the layer is popped afterwards
+        assert result == "inner-outer||outer"
+        assert "var1" not in context
+
+    @pytest.mark.django_db
+    def test_cmspage_include_caches_template_per_render(self):
+        """Test that each template name is resolved once per render, however often it is included"""
+        template = Template(
+            "{% load cmspage_tags %}{% for item in items %}{% cmspage_include template_name with item=item %}{% endfor %}"
+        )
+        context = Context({"template_name": "item.html", "items": ["a", "b", "c"]})
+        included = self.django_template("[{{ item }}]")
+
+        with patch("cmspage.templatetags.cmspage_tags.get_template", return_value=included) as mock_get_template:
+            assert template.render(context) == "[a][b][c]"
+            mock_get_template.assert_called_once_with("item.html")
+
+            # A new render resolves the template again, so template changes are picked up
+            template.render(Context({"template_name": "item.html", "items": ["d"]}))
+            assert mock_get_template.call_count == 2
+
+    @pytest.mark.django_db
+    def test_cmspage_include_recursive(self):
+        """Test recursive includes, as used by navigation_item.html"""
+        template = Template("{% load cmspage_tags %}{% cmspage_include template_name with node=tree %}")
+        tree = {"name": "root", "children": [{"name": "a", "children": [{"name": "b", "children": []}]}]}
+        context = Context({"template_name": "node.html", "tree": tree})
+        included = self.django_template(
+            "{% load cmspage_tags %}{{ node.name }}({% for child in node.children %}"
+            "{% cmspage_include template_name with node=child %}{% endfor %})"
+        )
+
+        with patch("cmspage.templatetags.cmspage_tags.get_template", return_value=included) as mock_get_template:
+            assert template.render(context) == "root(a(b()))"
+            mock_get_template.assert_called_once_with("node.html")
+        assert "node" not in context